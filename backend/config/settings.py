@@ -19,6 +19,11 @@ def get_list(name: str, default: str = "") -> list[str]:
     return [item.strip() for item in raw.split(",") if item.strip()]
 
 
+def get_int(name: str, default: int) -> int:
+    raw = os.environ.get(name, "").strip()
+    return int(raw) if raw else default
+
+
 SECRET_KEY = get_required("SECRET_KEY")
 
 DEBUG = get_bool("DEBUG", default=False)
@@ -32,6 +37,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "corsheaders",
     "rest_framework",
     "core",
@@ -105,21 +111,122 @@ DEFAULT_CHARSET = "utf-8"
 
 REST_FRAMEWORK = {
     "UNICODE_JSON": True,
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Proxies in front of Django (nginx in compose) whose X-Forwarded-For
+    # entries are trusted to find the client address for throttling.
+    "NUM_PROXIES": get_int("NUM_PROXIES", 0),
+    "DEFAULT_THROTTLE_RATES": {
+        "seat_holds": os.environ.get("SEAT_HOLD_RATE", "20/hour"),
+    },
 }
 
+# Serve the hot list endpoints through core.fast_serializers instead of DRF serializers.
+FAST_SERIALIZERS = get_bool("FAST_SERIALIZERS", default=False)
+
 CORS_ALLOWED_ORIGINS = get_list("CORS_ALLOWED_ORIGINS")
 
 CORS_ALLOW_CREDENTIALS = True
 
 BASE_URL = os.environ.get("BASE_URL", "")
 TELEGRAM_TOKEN = os.environ.get("TELEGRAM_TOKEN", "")
+TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "")
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+# Lead notifications are queued in the leads outbox with the lead itself and
+# delivered by `manage.py send_lead_notifications` (see leads.outbox).
+LEADS_NOTIFY_POLL = get_int("LEADS_NOTIFY_POLL", 5)
+LEADS_NOTIFY_MAX_ATTEMPTS = get_int("LEADS_NOTIFY_MAX_ATTEMPTS", 10)
 JWT_SECRET = os.environ.get("JWT_SECRET", "")
 API_KEY = os.environ.get("API_KEY", "")
 
+# Default /api/schedule/ window: the current month plus the following ones.
+SCHEDULE_WINDOW_MONTHS = get_int("SCHEDULE_WINDOW_MONTHS", 6)
+SCHEDULE_MAX_WINDOW_DAYS = get_int("SCHEDULE_MAX_WINDOW_DAYS", 366)
+# Build the grouped schedule JSON inside PostgreSQL instead of DRF serializers.
+SCHEDULE_SQL_JSON = get_bool("SCHEDULE_SQL_JSON", default=False)
+# Recurring events are materialized this many days ahead by
+# `manage.py expand_schedule` (run it daily) and on every rule save.
+SCHEDULE_RECURRENCE_HORIZON_DAYS = get_int("SCHEDULE_RECURRENCE_HORIZON_DAYS", 365)
+# Seconds held event seats stay reserved before `manage.py release_seat_holds`
+# returns them (see core.booking).
+SEAT_HOLD_TTL = get_int("SEAT_HOLD_TTL", 15 * 60)
+# Most seats one hold may take; holds per client are throttled by
+# SEAT_HOLD_RATE (see REST_FRAMEWORK).
+SEAT_HOLD_MAX_SEATS = get_int("SEAT_HOLD_MAX_SEATS", 10)
+
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "static"
 
-MEDIA_URL = "/media/"
+# An absolute MEDIA_URL (e.g. https://cdn.example.org/media/) serves API
+# image URLs from that host instead of the request's.
+MEDIA_URL = os.environ.get("MEDIA_URL", "/media/")
 MEDIA_ROOT = BASE_DIR / "media"
+# Uploads are stored once per distinct content under content-hashed names
+# (see core.storage), so media responses are served with an immutable
+# Cache-Control.
+STORAGES = {
+    "default": {"BACKEND": "core.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+# Let nginx send media files: the media view only checks the request and
+# answers with X-Accel-Redirect to this internal location.
+MEDIA_ACCEL_REDIRECT = get_bool("MEDIA_ACCEL_REDIRECT", default=False)
+MEDIA_ACCEL_PREFIX = os.environ.get("MEDIA_ACCEL_PREFIX", "/protected-media/")
+MEDIA_MAX_AGE = get_int("MEDIA_MAX_AGE", 365 * 24 * 60 * 60)
+
+# Uploads are streamed to a temporary file instead of being buffered in
+# memory; new images are checked from their header and stored with EXIF
+# orientation applied and the longest edge capped (see core.ingest).
+FILE_UPLOAD_HANDLERS = ["django.core.files.uploadhandler.TemporaryFileUploadHandler"]
+IMAGE_UPLOAD_FORMATS = get_list("IMAGE_UPLOAD_FORMATS", "JPEG,MPO,PNG,WEBP,AVIF")
+IMAGE_UPLOAD_MAX_PIXELS = get_int("IMAGE_UPLOAD_MAX_PIXELS", 100_000_000)
+IMAGE_MAX_EDGE = get_int("IMAGE_MAX_EDGE", 2560)
+IMAGE_UPLOAD_QUALITY = get_int("IMAGE_UPLOAD_QUALITY", 85)
+
+# Renditions of each uploaded image, stored as content-addressed blobs
+# under blobs/ like the originals (see core.renditions and core.storage).
+# AVIF falls back to JPEG when Pillow is built without it.
+IMAGE_RENDITION_WIDTHS = [int(width) for width in get_list("IMAGE_RENDITION_WIDTHS", "320,640,1280,1920")]
+IMAGE_RENDITION_FORMATS = get_list("IMAGE_RENDITION_FORMATS", "webp,avif")
+IMAGE_RENDITION_QUALITY = get_int("IMAGE_RENDITION_QUALITY", 80)
+# Build renditions inside the saving request instead of queueing them for
+# `manage.py process_images`.
+IMAGE_RENDITIONS_INLINE = get_bool("IMAGE_RENDITIONS_INLINE", default=False)
+
+# Response cache backend: "locmem", "file" or "redis" (any Redis-protocol
+# server). The cache also holds the namespace versions that invalidate cached
+# responses, so every process that writes content must share it: locmem only
+# works for a single process, e.g. runserver or the test suite.
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "konakovo"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "cache")),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+}
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem").strip().lower()
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise RuntimeError(f"Unsupported CACHE_BACKEND: {CACHE_BACKEND}")
+# Gunicorn reads WEB_CONCURRENCY for its worker count; BACKGROUND_WORKERS is
+# set where process_images, release_seat_holds or cron commands write content
+# from processes of their own.
+WEB_CONCURRENCY = get_int("WEB_CONCURRENCY", 1)
+BACKGROUND_WORKERS = get_bool("BACKGROUND_WORKERS", default=False)
+if CACHE_BACKEND == "locmem" and (WEB_CONCURRENCY > 1 or BACKGROUND_WORKERS):
+    raise RuntimeError("CACHE_BACKEND=locmem cannot be shared between processes; use file or redis.")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND][0],
+        "LOCATION": os.environ.get("CACHE_LOCATION") or CACHE_BACKENDS[CACHE_BACKEND][1],
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = get_int("RESPONSE_CACHE_TIMEOUT", 60 * 60 * 24)
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -1,7 +1,11 @@
+import re
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import serve_media
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -10,6 +14,11 @@ urlpatterns = [
     path("api/", include("core.urls")),
 ]
 
+# Media on this host goes through serve_media (nginx sends the file in
+# production); an absolute MEDIA_URL points at another host.
+if "://" not in settings.MEDIA_URL and not settings.MEDIA_URL.startswith("//"):
+    media_prefix = re.escape(settings.MEDIA_URL.lstrip("/"))
+    urlpatterns.append(re_path(rf"^{media_prefix}(?P<path>.+)$", serve_media, name="media"))
+
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
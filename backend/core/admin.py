@@ -11,6 +11,7 @@ from .models import (
     Review,
     ScheduleDay,
     ScheduleEvent,
+    ScheduleRecurrence,
     Service,
     Tariff,
 )
@@ -154,6 +155,7 @@ class ScheduleEventInline(admin.TabularInline):
         "image",
         "service",
         "price",
+        "capacity",
         "color",
         "order",
     )
@@ -171,7 +173,18 @@ class ScheduleDayAdmin(admin.ModelAdmin):
 
 @admin.register(ScheduleEvent)
 class ScheduleEventAdmin(admin.ModelAdmin):
-    list_display = ("day", "time_start", "time_end", "title", "category", "service", "price", "order")
+    list_display = (
+        "day",
+        "time_start",
+        "time_end",
+        "title",
+        "category",
+        "service",
+        "price",
+        "capacity",
+        "booked",
+        "order",
+    )
     list_filter = ("category", "day__is_published")
     search_fields = ("title", "category", "description")
     autocomplete_fields = ("day", "service")
@@ -185,6 +198,30 @@ class ScheduleEventAdmin(admin.ModelAdmin):
         "image",
         "service",
         "price",
+        "capacity",
         "color",
         "order",
     )
+
+
+class ScheduleRecurrenceAdminForm(forms.ModelForm):
+    weekdays = forms.TypedMultipleChoiceField(
+        label="Дни недели",
+        choices=ScheduleRecurrence.WEEKDAY_CHOICES,
+        coerce=int,
+        widget=forms.CheckboxSelectMultiple,
+    )
+
+    class Meta:
+        model = ScheduleRecurrence
+        fields = "__all__"
+        help_texts = {"exceptions": "Даты через запятую в формате YYYY-MM-DD."}
+
+
+@admin.register(ScheduleRecurrence)
+class ScheduleRecurrenceAdmin(admin.ModelAdmin):
+    form = ScheduleRecurrenceAdminForm
+    list_display = ("title", "category", "time_start", "time_end", "starts_on", "until", "is_active")
+    list_filter = ("is_active", "category")
+    search_fields = ("title", "category", "description")
+    autocomplete_fields = ("service",)
@@ -0,0 +1,22 @@
+from django.db import models
+
+from .renditions import meta_field_name, rendition_fields, rendition_names
+
+
+def reference_columns(model):
+    """Columns of ``model`` that name media files: file fields and rendition meta."""
+    files = [field.name for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+    return files + [meta_field_name(name) for name in rendition_fields(model)]
+
+
+def referenced_names(model, values):
+    """Media names in ``values`` (``{column: value}``): files plus their renditions."""
+    names = set()
+    for column in reference_columns(model):
+        value = values.get(column)
+        if isinstance(value, dict):
+            names.update(rendition_names(value))
+        elif value:
+            names.add(getattr(value, "name", value))
+    names.discard("")
+    return names
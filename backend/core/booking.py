@@ -0,0 +1,142 @@
+import datetime as dt
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+
+from .cache import invalidate_on_commit
+from .models import ContentGeneration, ScheduleDay, ScheduleEvent, SeatHold
+
+
+class SoldOut(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Недостаточно свободных мест."
+    default_code = "sold_out"
+
+
+class HoldExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Бронь истекла, выберите места заново."
+    default_code = "hold_expired"
+
+
+def bookable_events():
+    # ``day__in`` keeps the UPDATE on core_scheduleevent itself. Filtering
+    # through ``day__...`` would make Django wrap it in ``id IN (subquery)``,
+    # where the capacity check reads a snapshot instead of the locked row.
+    days = ScheduleDay.objects.filter(is_published=True, date__gte=timezone.localdate())
+    return ScheduleEvent.objects.filter(day__in=days)
+
+
+def seats_changed():
+    """Invalidate schedule responses; seat counts change through ``update()``, which sends no signals.
+
+    The generation row is bumped after commit: bumping it inside the hold's
+    transaction would keep it locked and serialize concurrent holds.
+    """
+    transaction.on_commit(lambda: ContentGeneration.bump("schedule"))
+    invalidate_on_commit("schedule")
+
+
+def reserve_seats(event_id, seats):
+    """Take ``seats`` out of an event in one conditional UPDATE; return whether they fit.
+
+    ``booked + seats <= capacity`` is checked by PostgreSQL against the
+    locked row, so concurrent reservations can never overbook.
+    """
+    return bool(
+        bookable_events()
+        .filter(pk=event_id)
+        .filter(Q(capacity__isnull=True) | Q(capacity__gte=F("booked") + seats))
+        .update(booked=F("booked") + seats)
+    )
+
+
+def release_seats(seats_by_event):
+    """Return ``{event_id: seats}`` to their events, locking rows in id order."""
+    for event_id in sorted(seats_by_event):
+        ScheduleEvent.objects.filter(pk=event_id).update(booked=F("booked") - seats_by_event[event_id])
+
+
+def hold_seats(event_id, seats, ttl=None):
+    """Reserve seats for ``ttl`` seconds (``SEAT_HOLD_TTL`` by default) and return the hold."""
+    ttl = settings.SEAT_HOLD_TTL if ttl is None else ttl
+    with transaction.atomic():
+        if not reserve_seats(event_id, seats):
+            if not bookable_events().filter(pk=event_id).exists():
+                raise NotFound("Событие не найдено.")
+            raise SoldOut()
+        hold = SeatHold.objects.create(
+            event_id=event_id,
+            seats=seats,
+            expires_at=timezone.now() + dt.timedelta(seconds=ttl),
+        )
+        seats_changed()
+    return hold
+
+
+def confirm_hold(token, service_id, seats):
+    """Make an unexpired hold permanent; call inside the transaction of the request it belongs to.
+
+    The request must be for the service of the held event and for exactly
+    the held number of seats.
+    """
+    now = timezone.now()
+    pending = SeatHold.objects.filter(token=token, confirmed_at__isnull=True, expires_at__gt=now)
+    held = pending.values_list("event__service_id", "seats").first()
+    if held is not None:
+        if held[0] != service_id:
+            raise ValidationError({"hold": "Бронь сделана на событие другой услуги."})
+        if held[1] != seats:
+            raise ValidationError({"quantity": f"Количество должно совпадать с бронью: {held[1]}."})
+    confirmed = pending.filter(event__service_id=service_id, seats=seats).update(
+        confirmed_at=now,
+        expires_at=None,
+    )
+    if not confirmed:
+        raise HoldExpired()
+    return SeatHold.objects.select_related("event__day").get(token=token)
+
+
+def cancel_hold(token):
+    """Drop an unconfirmed hold and give its seats back."""
+    with transaction.atomic():
+        hold = SeatHold.objects.select_for_update().filter(token=token, confirmed_at__isnull=True).first()
+        if hold is None:
+            raise NotFound("Бронь не найдена.")
+        hold.delete()
+        release_seats({hold.event_id: hold.seats})
+        seats_changed()
+
+
+def release_expired_holds(batch=500, now=None):
+    """Delete expired unconfirmed holds and return their seats; return how many were released.
+
+    Rows locked by a concurrent confirmation or sweeper are skipped and
+    picked up on the next run if they are still unconfirmed.
+    """
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            holds = list(
+                SeatHold.objects.select_for_update(skip_locked=True)
+                .filter(confirmed_at__isnull=True, expires_at__lte=now)
+                .order_by("expires_at")
+                .values_list("pk", "event_id", "seats")[:batch]
+            )
+            if not holds:
+                return released
+            SeatHold.objects.filter(pk__in=[pk for pk, _, _ in holds]).delete()
+            seats_by_event = Counter()
+            for _, event_id, seats in holds:
+                seats_by_event[event_id] += seats
+            release_seats(seats_by_event)
+            seats_changed()
+        released += len(holds)
+        if len(holds) < batch:
+            return released
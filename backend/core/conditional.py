@@ -0,0 +1,49 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import response_variant
+from .models import ContentGeneration
+
+
+class ConditionalGetMixin:
+    """Answer ``If-None-Match``/``If-Modified-Since`` from content generations.
+
+    The ETag hashes the generation counters of ``cache_namespaces`` together
+    with the response variant, so validating a request costs one primary-key
+    lookup and a matching client gets a 304 before anything is serialized.
+    """
+
+    cache_namespaces = ()
+
+    def get_cache_key_extra(self, request):
+        return ""
+
+    def get_validators(self, request):
+        rows = ContentGeneration.objects.filter(name__in=self.cache_namespaces).values_list(
+            "name", "value", "updated_at"
+        )
+        generations = {name: (value, updated_at) for name, value, updated_at in rows}
+        state = ".".join(f"{name}{generations.get(name, (0,))[0]}" for name in self.cache_namespaces)
+        variant = response_variant(request, self.get_cache_key_extra(request))
+        etag = quote_etag(hashlib.sha1(f"{state}|{variant}".encode("utf-8")).hexdigest())
+        modified = [updated_at for _, updated_at in generations.values()]
+        last_modified = int(max(modified).timestamp()) if modified else None
+        return etag, last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or not self.cache_namespaces:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -0,0 +1,25 @@
+from django.contrib.postgres.search import SearchVectorCombinable, SearchVectorField
+from django.db.models import Func
+
+
+class JSONStringsSearchVector(SearchVectorCombinable, Func):
+    """Weighted ``tsvector`` of the string values of a jsonb column.
+
+    ``jsonb_to_tsvector`` skips keys and punctuation, unlike ``to_tsvector``
+    over the column cast to text, and is immutable, so it can back a
+    generated column.
+    """
+
+    output_field = SearchVectorField()
+
+    def __init__(self, expression, config, weight):
+        self.config = config
+        self.weight = weight
+        super().__init__(expression)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return (
+            f"setweight(jsonb_to_tsvector(%s::regconfig, {sql}, '[\"string\"]'::jsonb), %s)",
+            [self.config, *params, self.weight],
+        )
@@ -0,0 +1,207 @@
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import relations, serializers
+from rest_framework.fields import ISO_8601
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .media import ImageMetaField, MediaURLField, get_media_resolver
+from .renditions import image_info
+
+
+def _format_datetime(output_format):
+    if output_format is None:
+        return None
+
+    def factory(request):
+        # DRF's DateTimeField.enforce_timezone: render aware values in the active zone.
+        zone = timezone.get_current_timezone() if settings.USE_TZ else None
+
+        def format_datetime(value):
+            if isinstance(value, str):
+                return value
+            if zone is not None and timezone.is_aware(value):
+                value = value.astimezone(zone)
+            if output_format.lower() == ISO_8601:
+                value = value.isoformat()
+                return value[:-6] + "Z" if value.endswith("+00:00") else value
+            return value.strftime(output_format)
+
+        return format_datetime
+
+    return factory
+
+
+def _format_date_or_time(output_format):
+    if output_format is None:
+        return None
+
+    def format_value(value):
+        if isinstance(value, str):
+            return value
+        if output_format.lower() == ISO_8601:
+            return value.isoformat()
+        return value.strftime(output_format)
+
+    return lambda request: format_value
+
+
+def media_url(absolute_only=False):
+    """Formatter factory turning a stored file name into its URL, like ``MediaURLField``."""
+
+    def factory(request):
+        resolver = get_media_resolver(request)
+        if absolute_only and not resolver.is_absolute:
+            return lambda name: None
+        return resolver.url
+
+    return factory
+
+
+def image_meta(request):
+    """Formatter for ``ImageMetaField``, fed the ``(meta, width, height)`` columns."""
+    resolver = get_media_resolver(request)
+    return lambda columns: image_info(*columns, resolver)
+
+
+def _formatter_for(field):
+    if isinstance(field, MediaURLField):
+        return media_url(field.absolute_only)
+    if isinstance(field, serializers.DateTimeField):
+        return _format_datetime(getattr(field, "format", api_settings.DATETIME_FORMAT))
+    if isinstance(field, serializers.DateField):
+        return _format_date_or_time(getattr(field, "format", api_settings.DATE_FORMAT))
+    if isinstance(field, serializers.TimeField):
+        return _format_date_or_time(getattr(field, "format", api_settings.TIME_FORMAT))
+    if isinstance(field, serializers.FileField):
+        if not getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL):
+            return lambda request: lambda name: name or None
+        # Files in the default storage, which is served under MEDIA_URL.
+        return media_url()
+    if isinstance(field, serializers.ChoiceField):
+        choices = field.choice_strings_to_values
+        return lambda request: lambda value: value if value == "" else choices.get(str(value), value)
+    if isinstance(field, serializers.CharField):
+        return lambda request: str
+    if isinstance(field, serializers.IntegerField):
+        return lambda request: int
+    if isinstance(field, (serializers.BooleanField, serializers.JSONField, serializers.ReadOnlyField)):
+        return lambda request: None
+    if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+        return lambda request: None
+    if isinstance(
+        field,
+        (
+            serializers.BaseSerializer,
+            serializers.SerializerMethodField,
+            relations.RelatedField,
+            relations.ManyRelatedField,
+        ),
+    ):
+        raise ImproperlyConfigured(f"Field {field.field_name!r} needs an override to be compiled.")
+    return lambda request: field.to_representation
+
+
+class CompiledSerializer:
+    """Read-only fast path equivalent to a DRF serializer's output.
+
+    Rows come from ``.values()`` and are mapped to dicts by formatters
+    resolved once per field, instead of per-object field lookups and
+    ``to_representation`` dispatch. The output is the same as
+    ``serializer_class(..., many=True).data`` for the supported field types;
+    method and nested fields must be given in ``overrides`` as
+    ``{name: (column, formatter_factory)}``, where the factory takes the
+    request and returns a one-argument callable (``None`` passes values
+    through). A tuple of columns hands the formatter a tuple of values. An
+    override of ``None`` emits ``row[name]`` as the caller put it.
+    """
+
+    def __init__(self, serializer_class, overrides=None):
+        self.serializer_class = serializer_class
+        self.overrides = overrides or {}
+        self._plan = None
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            plan = []
+            for name, field in self.serializer_class().fields.items():
+                if field.write_only:
+                    continue
+                if name in self.overrides:
+                    column, factory = self.overrides[name] or (None, None)
+                elif isinstance(field, ImageMetaField):
+                    column, factory = field.attrs, image_meta
+                else:
+                    if field.source == "*":
+                        raise ImproperlyConfigured(f"Field {name!r} needs an override to be compiled.")
+                    column, factory = "__".join(field.source_attrs), _formatter_for(field)
+                plan.append((name, column, factory))
+            self._plan = plan
+        return self._plan
+
+    @property
+    def columns(self):
+        columns = []
+        for _, column, _ in self.plan:
+            if isinstance(column, tuple):
+                columns.extend(column)
+            elif column is not None:
+                columns.append(column)
+        return columns
+
+    def values(self, queryset, *extra):
+        """``queryset.values()`` with the serialized columns and any ``extra`` ones."""
+        return queryset.values(*dict.fromkeys((*self.columns, *extra)))
+
+    def bind(self, request=None):
+        """Return a function mapping one row to its serialized dict."""
+        steps = []
+        for name, column, factory in self.plan:
+            get_value = itemgetter(*column) if isinstance(column, tuple) else itemgetter(column or name)
+            steps.append((name, get_value, factory(request) if factory else None))
+
+        def serialize(row):
+            item = {}
+            for name, get_value, format_value in steps:
+                value = get_value(row)
+                item[name] = value if value is None or format_value is None else format_value(value)
+            return item
+
+        return serialize
+
+    def many(self, rows, request=None):
+        serialize = self.bind(request)
+        return [serialize(row) for row in rows]
+
+
+class CompiledListMixin:
+    """Serve ``list`` through ``compiled_serializer`` when ``FAST_SERIALIZERS`` is on.
+
+    Paginators receive plain rows; the ordering columns they key on are
+    fetched alongside the serialized ones.
+    """
+
+    compiled_serializer = None
+
+    def use_compiled_serializer(self):
+        return settings.FAST_SERIALIZERS and self.compiled_serializer is not None
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_compiled_serializer():
+            return super().list(request, *args, **kwargs)
+
+        ordering = getattr(self.paginator, "ordering", None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        queryset = self.compiled_serializer.values(
+            self.filter_queryset(self.get_queryset()),
+            *(field.lstrip("-") for field in ordering),
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.compiled_serializer.many(page, request))
+        return Response(self.compiled_serializer.many(queryset, request))
@@ -0,0 +1,116 @@
+import datetime as dt
+
+import django
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ImageJob
+from .renditions import (
+    build_renditions,
+    height_field_name,
+    meta_field_name,
+    read_image_info,
+    remember_image_info,
+    width_field_name,
+)
+
+
+def init_worker():
+    # Needed with the "spawn" start method; a forked worker is already set up.
+    if not apps.ready:
+        django.setup()
+
+
+def _storage(model_label, field_name):
+    return apps.get_model(model_label)._meta.get_field(field_name).storage
+
+
+def render_job(model_label, field_name, source):
+    """Build the renditions of one image in a worker process."""
+    return build_renditions(_storage(model_label, field_name), source)
+
+
+def read_info_job(model_label, field_name, source):
+    """Read size, color and placeholder of one image in a worker process; touches storage only."""
+    return read_image_info(_storage(model_label, field_name), source)
+
+
+def requeue_stale_jobs(older_than=dt.timedelta(minutes=15)):
+    """Return jobs left running by a worker that died to the queue."""
+    return ImageJob.objects.filter(
+        status=ImageJob.StatusChoices.RUNNING,
+        updated_at__lt=timezone.now() - older_than,
+    ).update(status=ImageJob.StatusChoices.PENDING)
+
+
+def retry_failed_jobs():
+    return ImageJob.objects.filter(status=ImageJob.StatusChoices.FAILED).update(
+        status=ImageJob.StatusChoices.PENDING,
+        attempts=0,
+    )
+
+
+def claim_jobs(limit):
+    """Mark up to ``limit`` pending jobs running; concurrent workers skip each other's rows."""
+    with transaction.atomic():
+        jobs = list(
+            ImageJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ImageJob.StatusChoices.PENDING)
+            .order_by("id")[:limit]
+        )
+        if jobs:
+            ImageJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=ImageJob.StatusChoices.RUNNING,
+                attempts=F("attempts") + 1,
+                updated_at=timezone.now(),
+            )
+    for job in jobs:
+        job.attempts += 1
+    return jobs
+
+
+def complete_job(job, renditions):
+    """Store ``renditions`` if the object still has the job's file, then drop the job.
+
+    The object is saved normally so cached responses are invalidated. A job
+    re-pointed at a newer upload in the meantime stays queued.
+    """
+    model = apps.get_model(job.model)
+    meta_name = meta_field_name(job.field_name)
+    with transaction.atomic():
+        instance = model._default_manager.select_for_update().filter(pk=job.object_id).first()
+        if instance is not None and getattr(instance, job.field_name).name == job.source:
+            meta = {**getattr(instance, meta_name), "renditions": renditions}
+            meta.pop("pending", None)
+            setattr(instance, meta_name, meta)
+            instance.save(update_fields=[meta_name])
+            remember_image_info(
+                meta,
+                getattr(instance, width_field_name(job.field_name)),
+                getattr(instance, height_field_name(job.field_name)),
+            )
+        ImageJob.objects.filter(pk=job.pk, status=ImageJob.StatusChoices.RUNNING, source=job.source).delete()
+
+
+def release_jobs(jobs):
+    """Return running jobs to the queue without counting the attempt.
+
+    For renders lost with a pool that one of several concurrent renders
+    crashed; a crash while rendering a single image counts (see ``fail_job``).
+    """
+    for job in jobs:
+        ImageJob.objects.filter(pk=job.pk, status=ImageJob.StatusChoices.RUNNING, source=job.source).update(
+            status=ImageJob.StatusChoices.PENDING,
+            attempts=F("attempts") - 1,
+        )
+
+
+def fail_job(job, error, max_attempts):
+    status = ImageJob.StatusChoices.FAILED if job.attempts >= max_attempts else ImageJob.StatusChoices.PENDING
+    ImageJob.objects.filter(pk=job.pk, status=ImageJob.StatusChoices.RUNNING, source=job.source).update(
+        status=status,
+        error=error,
+    )
+    return status
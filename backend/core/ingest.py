@@ -0,0 +1,97 @@
+import tempfile
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import models
+from PIL import Image, ImageOps
+
+# EXIF tag holding the camera orientation.
+ORIENTATION = 0x0112
+# Re-encoded uploads are kept in memory up to this size, then spill to disk.
+SPOOL_SIZE = 2 * 1024 * 1024
+# Formats kept as they are when re-encoding; others become JPEG or, with
+# transparency, PNG.
+KEPT_FORMATS = {"JPEG": ".jpg", "WEBP": ".webp"}
+
+
+def _is_new_upload(field_file):
+    return bool(field_file) and not getattr(field_file, "_committed", True)
+
+
+def validate_image_upload(value):
+    """Check a new upload from its header only: a known format within the pixel limit."""
+    if not _is_new_upload(value):
+        return
+    try:
+        value.seek(0)
+        with Image.open(value) as image:
+            image_format = image.format
+            width, height = image.size
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ValidationError("Загрузите корректное изображение.", code="invalid_image") from exc
+    finally:
+        value.seek(0)
+    if image_format not in settings.IMAGE_UPLOAD_FORMATS:
+        raise ValidationError(f"Формат {image_format} не поддерживается.", code="invalid_image_format")
+    if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise ValidationError("Изображение слишком большое.", code="image_too_large")
+
+
+def downscale_upload(upload):
+    """Oriented copy of ``upload`` with its longest edge capped, or ``None`` if it is fine as is.
+
+    JPEGs are decoded at the smallest scale still covering the target size,
+    so a 40 MP photo never exists at full resolution in memory.
+    """
+    max_edge = settings.IMAGE_MAX_EDGE
+    upload.seek(0)
+    with Image.open(upload) as image:
+        orientation = image.getexif().get(ORIENTATION, 1)
+        width, height = image.size
+        if max(width, height) <= max_edge and orientation == 1:
+            return None
+
+        scale = min(max_edge / max(width, height), 1)
+        image.draft("RGB", (round(width * scale), round(height * scale)))
+        icc_profile = image.info.get("icc_profile")
+        # Camera JPEGs with embedded previews open as MPO.
+        image_format = "JPEG" if image.format == "MPO" else image.format
+        result = ImageOps.exif_transpose(image)
+        result.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+    has_alpha = "A" in result.getbands() or "transparency" in result.info
+    if image_format in KEPT_FORMATS:
+        target_format, suffix = image_format, KEPT_FORMATS[image_format]
+    elif has_alpha:
+        target_format, suffix = "PNG", ".png"
+    else:
+        target_format, suffix = "JPEG", ".jpg"
+    if target_format == "JPEG" and result.mode != "RGB":
+        result = result.convert("RGB")
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    options = {"optimize": True}
+    if target_format != "PNG":
+        options["quality"] = settings.IMAGE_UPLOAD_QUALITY
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    result.save(output, target_format, **options)
+    output.seek(0)
+    return File(output, name=PurePosixPath(upload.name).with_suffix(suffix).name)
+
+
+def ingest_uploaded_images(sender, instance, raw=False, **kwargs):
+    """pre_save: replace new image uploads by their downscaled, oriented copy before they are stored."""
+    if raw:
+        return
+    for field in sender._meta.concrete_fields:
+        if not isinstance(field, models.ImageField):
+            continue
+        field_file = getattr(instance, field.name)
+        if not _is_new_upload(field_file):
+            continue
+        replacement = downscale_upload(field_file)
+        if replacement is not None:
+            setattr(instance, field.name, replacement)
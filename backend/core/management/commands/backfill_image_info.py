@@ -0,0 +1,108 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.image_jobs import init_worker, read_info_job
+from core.models import ImageJob
+from core.renditions import (
+    meta_field_name,
+    queue_image_jobs,
+    remember_image_info,
+    rendition_fields,
+    rendition_models,
+    set_image_info,
+    width_field_name,
+)
+
+
+class Command(BaseCommand):
+    help = "Fill in size, dominant color and placeholder of existing images in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            default=[],
+            help="Limit to app_label.Model (repeatable).",
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument("--batch", type=int, default=200, help="Images read before saving results.")
+        parser.add_argument("--force", action="store_true", help="Read images that already have a size.")
+
+    def pending_images(self, model, force):
+        """``(pk, field_name, name)`` of every stored image still missing its info."""
+        images = []
+        for field_name in rendition_fields(model):
+            queryset = model._default_manager.exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True})
+            if not force:
+                queryset = queryset.filter(**{f"{width_field_name(field_name)}__isnull": True})
+            images += [(pk, field_name, name) for pk, name in queryset.order_by("pk").values_list("pk", field_name)]
+        return images
+
+    def save_batch(self, model, results):
+        """Store read info on the objects that still point at the same files.
+
+        Meta records ``source``, so the save does not read the image again.
+        Images without renditions get them queued for ``process_images``.
+        """
+        instances = model._default_manager.in_bulk({pk for pk, _, _, _ in results})
+        changed_by_pk = {}
+        jobs = []
+        for pk, field_name, name, info in results:
+            instance = instances.get(pk)
+            if instance is None or getattr(instance, field_name).name != name:
+                continue
+            info = dict(info)
+            width, height = info.pop("width"), info.pop("height")
+            meta = getattr(instance, meta_field_name(field_name)) or {}
+            # Renditions of another file are dropped; legacy meta has no source.
+            if meta.get("source", name) != name:
+                meta = {}
+            meta = {**meta, "source": name, **info}
+            remember_image_info(meta, width, height)
+            if "renditions" not in meta:
+                meta["pending"] = True
+                jobs.append(ImageJob(model=model._meta.label, object_id=pk, field_name=field_name, source=name))
+            changed_by_pk.setdefault(pk, []).extend(set_image_info(instance, field_name, meta, width, height))
+        for pk, changed in changed_by_pk.items():
+            # A regular save so cached responses are invalidated.
+            instances[pk].save(update_fields=changed)
+        queue_image_jobs(jobs)
+        return len(changed_by_pk)
+
+    def handle(self, *args, **options):
+        workers = max(options["workers"], 1)
+        batch = max(options["batch"], 1)
+        started = time.monotonic()
+        total = failed = 0
+        for model in rendition_models(options["model"]):
+            label = model._meta.label
+            images = self.pending_images(model, options["force"])
+            updated = 0
+            # Worker processes must not inherit open database sockets.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+                for offset in range(0, len(images), batch):
+                    futures = {
+                        pool.submit(read_info_job, label, field_name, name): (pk, field_name, name)
+                        for pk, field_name, name in images[offset : offset + batch]
+                    }
+                    results = []
+                    for future in as_completed(futures):
+                        pk, field_name, name = futures[future]
+                        try:
+                            results.append((pk, field_name, name, future.result()))
+                        except Exception as exc:
+                            failed += 1
+                            self.stderr.write(f"{label} #{pk} {name}: {exc}")
+                    updated += self.save_batch(model, results)
+            total += updated
+            self.stdout.write(f"{label}: {updated} updated")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Image info stored for {total} objects ({failed} failed) in {elapsed:.1f}s.")
+        )
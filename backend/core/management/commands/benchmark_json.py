@@ -0,0 +1,134 @@
+import datetime as dt
+import decimal
+import io
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.management.commands.seed_schedule import EVENT_TEMPLATES
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from core.schedule import MONTH_LABELS, WEEKDAY_LABELS
+
+
+def schedule_payload(months, rng):
+    start = dt.date.today().replace(day=1)
+    payload = []
+    for offset in range(months):
+        first = (start + dt.timedelta(days=31 * offset)).replace(day=1)
+        days = []
+        for day_number in sorted(rng.sample(range(1, 29), 15)):
+            date = first.replace(day=day_number)
+            events = []
+            for index in range(rng.randint(1, 3)):
+                template = rng.choice(EVENT_TEMPLATES)
+                events.append(
+                    {
+                        "id": rng.randint(1, 10**6),
+                        "time_start": f"{9 + index * 2:02d}:00",
+                        "time_end": f"{10 + index * 2:02d}:30",
+                        "title": template["title"],
+                        "category": template["category"],
+                        "description": template["description"],
+                        "price": rng.randint(template["price_min"], template["price_max"]),
+                        "color": template["color"],
+                        "image": f"https://example.org/media/schedule_events/{template['service_slug'] or 'event'}.jpg",
+                    }
+                )
+            days.append({"date": date.isoformat(), "weekday": WEEKDAY_LABELS[date.weekday()], "events": events})
+        payload.append(
+            {
+                "month": f"{MONTH_LABELS[first.month - 1]} {first.year}",
+                "year": first.year,
+                "month_number": first.month,
+                "days": days,
+            }
+        )
+    return payload
+
+
+def services_payload(copies):
+    seed_path = Path(__file__).resolve().parents[2] / "data" / "services_seed.json"
+    tree = json.loads(seed_path.read_text(encoding="utf-8"))
+    return tree * copies
+
+
+def feed_payload(items, rng):
+    # Rows as a .values() fast path would hand them over, with native types.
+    now = dt.datetime.now(dt.timezone.utc)
+    return {
+        "next": "https://example.org/api/news/?cursor=cD0lNUIlMjIyMDI2",
+        "previous": None,
+        "results": [
+            {
+                "id": index,
+                "title": f"Новость сезона №{index}",
+                "slug": f"news-{index}",
+                "description": "Короткий анонс события у воды с фотографиями и маршрутом.",
+                "published_date": now.date() - dt.timedelta(days=index),
+                "created_at": now - dt.timedelta(hours=index),
+                "time_start": dt.time(10, 30),
+                "price": decimal.Decimal(rng.randint(900, 5400)) / 100,
+            }
+            for index in range(items)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare render/parse time and allocations of the stdlib and orjson JSON backends."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=200, help="Timed runs per payload.")
+        parser.add_argument("--scale", type=int, default=1, help="Multiply payload sizes.")
+
+    def measure(self, func, repeat):
+        func()
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return best * 1000, peak / 1024
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        scale = max(options["scale"], 1)
+        repeat = max(options["repeat"], 1)
+        payloads = {
+            "schedule": schedule_payload(6 * scale, rng),
+            "services": services_payload(10 * scale),
+            "feed": feed_payload(100 * scale, rng),
+        }
+        backends = [
+            ("stdlib", JSONRenderer(), JSONParser()),
+            ("orjson", ORJSONRenderer(), ORJSONParser()),
+        ]
+
+        header = f"{'payload':<10} {'op':<7} {'backend':<8} {'size KB':>9} {'best ms':>9} {'peak KB':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            for label, renderer, parser in backends:
+                rendered = renderer.render(data)
+                timings = (
+                    ("render", lambda: renderer.render(data)),
+                    ("parse", lambda: parser.parse(io.BytesIO(body))),
+                )
+                for op, func in timings:
+                    best, peak = self.measure(func, repeat)
+                    self.stdout.write(
+                        f"{name:<10} {op:<7} {label:<8} {len(rendered) / 1024:>9.1f} {best:>9.3f} {peak:>9.1f}"
+                    )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.renditions import refresh_renditions, rendition_models
+
+
+class Command(BaseCommand):
+    help = "Build missing or stale image renditions for existing media."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            default=[],
+            help="Limit to app_label.Model (repeatable).",
+        )
+        parser.add_argument("--force", action="store_true", help="Rebuild renditions that look up to date.")
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in rendition_models(options["model"]):
+            updated = 0
+            for instance in model._default_manager.order_by("pk").iterator(chunk_size=200):
+                changed = refresh_renditions(instance, force=options["force"])
+                if changed:
+                    # A regular save so cached responses are invalidated.
+                    instance.save(update_fields=changed)
+                    updated += 1
+            total += updated
+            self.stdout.write(f"{model._meta.label}: {updated} updated")
+
+        self.stdout.write(self.style.SUCCESS(f"Renditions built for {total} objects."))
@@ -0,0 +1,144 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.blobs import reference_columns, referenced_names
+from core.models import MediaBlob
+from core.storage import MEDIA_LOCK_CLASS
+
+
+class Command(BaseCommand):
+    help = "Report or delete media files that no object references, renditions included."
+
+    # Files locked, re-checked and deleted per transaction.
+    DELETE_BATCH = 200
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report unreferenced files.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=min(32, (os.cpu_count() or 1) + 4),
+            help="Threads scanning directories.",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help="Hours a file must be untouched; protects uploads whose object is not saved yet.",
+        )
+
+    def referenced(self):
+        """Every media name stored in a file field or rendition meta, streamed from the database."""
+        names = set()
+        for model in apps.get_models():
+            columns = reference_columns(model)
+            if not columns:
+                continue
+            for row in model._base_manager.values_list(*columns).iterator(chunk_size=2000):
+                names.update(referenced_names(model, dict(zip(columns, row))))
+        return names
+
+    def scan(self, directory, referenced, cutoff):
+        """Old unreferenced files directly in ``directory``, and its subdirectories."""
+        subdirs = []
+        orphans = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                name = os.path.relpath(entry.path, self.root).replace(os.sep, "/")
+                if name in referenced:
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime <= cutoff:
+                    orphans.append(name)
+        return subdirs, orphans
+
+    def find_orphans(self, referenced, cutoff, workers):
+        orphans = []
+        # Each task lists one directory, so the tree is walked in parallel.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(self.scan, self.root, referenced, cutoff)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    subdirs, found = future.result()
+                    pending.update(pool.submit(self.scan, path, referenced, cutoff) for path in subdirs)
+                    orphans += found
+        return orphans
+
+    def delete(self, names, cutoff):
+        """Delete the files of ``names`` still old and not locked by a writer; return ``[(name, size)]``.
+
+        Files are only removed while holding their advisory lock (see
+        ``core.storage.lock_media``), after re-reading their mtime, so a
+        blob that an upload reused or is writing right now is kept.
+        """
+        deleted = []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM unnest(%s::text[]) AS name WHERE pg_try_advisory_xact_lock(%s, hashtext(name))",
+                    [names, MEDIA_LOCK_CLASS],
+                )
+                locked = [name for (name,) in cursor.fetchall()]
+            for name in locked:
+                path = os.path.join(self.root, name)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_mtime > cutoff:
+                        continue
+                    os.unlink(path)
+                except FileNotFoundError:
+                    continue
+                deleted.append((name, stat.st_size))
+            MediaBlob.objects.filter(name__in=[name for name, _ in deleted]).delete()
+        return deleted
+
+    def handle(self, *args, **options):
+        self.root = os.fspath(settings.MEDIA_ROOT)
+        if not os.path.isdir(self.root):
+            self.stdout.write(f"{self.root} does not exist.")
+            return
+
+        dry_run = options["dry_run"]
+        started = time.monotonic()
+        cutoff = time.time() - options["min_age"] * 60 * 60
+        referenced = self.referenced()
+        orphans = self.find_orphans(referenced, cutoff, max(options["workers"], 1))
+        if orphans and not dry_run:
+            # References read again now that the scan is done: objects saved
+            # while it ran may already use some of the files.
+            referenced = self.referenced()
+            orphans = [name for name in orphans if name not in referenced]
+
+        count = size = 0
+        for offset in range(0, len(orphans), self.DELETE_BATCH):
+            batch = orphans[offset : offset + self.DELETE_BATCH]
+            if dry_run:
+                removed = [(name, os.path.getsize(os.path.join(self.root, name))) for name in batch]
+            else:
+                removed = self.delete(batch, cutoff)
+            for name, file_size in removed:
+                count += 1
+                size += file_size
+                if options["verbosity"] >= 2:
+                    self.stdout.write(name)
+
+        action = "Would delete" if dry_run else "Deleted"
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{action} {count} unreferenced files ({size / 1024 / 1024:.1f} MB); "
+                f"{len(referenced)} referenced, {elapsed:.1f}s."
+            )
+        )
@@ -0,0 +1,31 @@
+import datetime as dt
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import ScheduleRecurrence
+from core.recurrence import expand_recurrences
+
+
+class Command(BaseCommand):
+    help = "Materialize recurring events into schedule days up to the horizon; run daily."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Horizon in days (default: SCHEDULE_RECURRENCE_HORIZON_DAYS).")
+        parser.add_argument("--rule", type=int, action="append", help="Only expand this rule id; repeatable.")
+
+    def handle(self, *args, **options):
+        rules = ScheduleRecurrence.objects.all()
+        if options["rule"]:
+            rules = rules.filter(pk__in=options["rule"])
+        end = None
+        if options["days"] is not None:
+            end = timezone.localdate() + dt.timedelta(days=max(options["days"], 0))
+
+        result = expand_recurrences(rules, end=end)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.created}, updated {result.updated}, deleted {result.deleted} occurrences"
+                f" ({result.kept} kept for bookings)."
+            )
+        )
@@ -0,0 +1,127 @@
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.image_jobs import (
+    claim_jobs,
+    complete_job,
+    fail_job,
+    init_worker,
+    release_jobs,
+    render_job,
+    requeue_stale_jobs,
+    retry_failed_jobs,
+)
+from core.models import ImageJob
+
+# Seconds between sweeps for jobs left running by a worker that crashed.
+REQUEUE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Build queued image renditions in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument("--batch", type=int, default=0, help="Jobs claimed at a time (default: 4 per worker).")
+        parser.add_argument("--poll", type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--max-attempts", type=int, default=3)
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+        parser.add_argument("--retry-failed", action="store_true", help="Queue failed jobs again first.")
+
+    def handle(self, *args, **options):
+        workers = max(options["workers"], 1)
+        batch = options["batch"] or workers * 4
+        if options["retry_failed"]:
+            retry_failed_jobs()
+
+        self.done = self.failed = 0
+        # Jobs still to claim one at a time after a pool crash, so the next
+        # crash is pinned on the job that causes it.
+        solo = 0
+        started = time.monotonic()
+        next_requeue = started
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+        try:
+            while True:
+                if time.monotonic() >= next_requeue:
+                    requeue_stale_jobs()
+                    next_requeue = time.monotonic() + REQUEUE_INTERVAL
+                jobs = claim_jobs(1 if solo else batch)
+                if not jobs:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll"])
+                    continue
+
+                solo = max(solo - 1, 0)
+                lost = self.run_batch(pool, jobs, options["max_attempts"])
+                if lost:
+                    # A worker died (e.g. killed for memory) and took the
+                    # pool down; start a new one.
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+                    if len({job.source for job in lost}) > 1:
+                        solo = len(lost)
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {self.done} images ({self.failed} failed) in {elapsed:.1f}s with {workers} workers."
+            )
+        )
+
+    def run_batch(self, pool, jobs, max_attempts):
+        """Render claimed jobs; return those lost because the pool broke.
+
+        When a single image was lost, the crash is its own: the attempt
+        counts, so an image that always kills its worker ends up failed.
+        Otherwise the culprit is unknown and the lost jobs go back to the
+        queue without counting the attempt, to be rendered one by one.
+        """
+        # Worker processes must not inherit open database sockets:
+        # a child closing its copy would end the parent's session.
+        connections.close_all()
+        # Objects sharing a stored file share one render.
+        jobs_by_source = defaultdict(list)
+        for job in jobs:
+            jobs_by_source[job.source].append(job)
+        futures = {}
+        lost = []
+        for source, same in jobs_by_source.items():
+            try:
+                futures[pool.submit(render_job, same[0].model, same[0].field_name, source)] = same
+            except BrokenProcessPool:
+                lost += same
+        for future in as_completed(futures):
+            try:
+                renditions = future.result()
+            except BrokenProcessPool:
+                lost += futures[future]
+            except Exception as exc:
+                for job in futures[future]:
+                    status = fail_job(job, f"{type(exc).__name__}: {exc}", max_attempts)
+                    if status == ImageJob.StatusChoices.FAILED:
+                        self.failed += 1
+                        self.stderr.write(f"{job}: {exc}")
+            else:
+                for job in futures[future]:
+                    complete_job(job, renditions)
+                    self.done += 1
+        if len({job.source for job in lost}) == 1:
+            for job in lost:
+                status = fail_job(job, "BrokenProcessPool: worker process died", max_attempts)
+                if status == ImageJob.StatusChoices.FAILED:
+                    self.failed += 1
+                    self.stderr.write(f"{job}: worker process died")
+        elif lost:
+            release_jobs(lost)
+            self.stderr.write(f"Worker pool broke; {len(lost)} images queued again.")
+        return lost
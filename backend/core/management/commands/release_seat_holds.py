@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.booking import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Return the seats of expired, unconfirmed event holds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=500, help="Holds released per transaction.")
+        parser.add_argument("--poll", type=float, default=30.0, help="Seconds between sweeps.")
+        parser.add_argument("--once", action="store_true", help="Sweep once and exit.")
+
+    def handle(self, *args, **options):
+        released = 0
+        while True:
+            released += release_expired_holds(batch=max(options["batch"], 1))
+            if options["once"]:
+                break
+            time.sleep(options["poll"])
+        self.stdout.write(self.style.SUCCESS(f"Released {released} expired holds."))
@@ -0,0 +1,173 @@
+import datetime as dt
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from core.models import Article, News, Review, Service, Tariff
+from core.seeding import BATCH_SIZE, TextGenerator, batched, bulk_insert, clear, spread_created_at, touch
+from leads.models import DayScenario, Lead, ScenarioItem, ServiceRequest
+
+# Rows per model at --scale 1.
+BASE_COUNTS = {
+    "articles": 50,
+    "news": 50,
+    "reviews": 200,
+    "leads": 500,
+    "scenarios": 200,
+    "service_requests": 500,
+}
+
+
+class Command(BaseCommand):
+    help = "Generate Russian filler articles, news, reviews and requests for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=1, help="Multiply every default count.")
+        for name, count in BASE_COUNTS.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, help=f"Rows to create (default {count} × scale).")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per INSERT.")
+        parser.add_argument("--clear", action="store_true", help="Delete existing rows of these models first.")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+
+    def handle(self, *args, **options):
+        self.text = TextGenerator(options["seed"])
+        self.rng = self.text.rng
+        self.batch_size = max(options["batch_size"], 1)
+        # Slugs must not collide with an earlier run.
+        self.run = uuid.uuid4().hex[:6]
+        self.today = dt.date.today()
+        counts = {
+            name: options[name] if options[name] is not None else count * max(options["scale"], 1)
+            for name, count in BASE_COUNTS.items()
+        }
+
+        with transaction.atomic():
+            if options["clear"]:
+                clear(ScenarioItem, DayScenario, Lead, ServiceRequest, Review, News, Article)
+
+            created = {
+                "articles": self.seed(Article, self.articles(counts["articles"])),
+                "news": self.seed(News, self.news(counts["news"])),
+                "reviews": self.seed(Review, self.reviews(counts["reviews"])),
+                "leads": self.seed(Lead, self.leads(counts["leads"])),
+                "scenarios": self.seed_scenarios(counts["scenarios"]),
+                "service_requests": self.seed(ServiceRequest, self.service_requests(counts["service_requests"])),
+            }
+            touch("articles", "news", "reviews")
+
+        self.stdout.write(self.style.SUCCESS("Content seeded successfully."))
+        for name, count in created.items():
+            self.stdout.write(f"{name.replace('_', ' ').capitalize()} created: {count}")
+
+    def seed(self, model, objects):
+        last_pk = model.objects.aggregate(value=Max("pk"))["value"] or 0
+        count = bulk_insert(model, objects, self.batch_size)
+        spread_created_at(model.objects.filter(pk__gt=last_pk))
+        return count
+
+    def articles(self, count):
+        for index in range(count):
+            is_video = self.rng.random() < 0.2
+            yield Article(
+                title=self.text.title(),
+                slug=f"article-{self.run}-{index}",
+                preview_description=self.text.sentence(),
+                content="\n\n".join(self.text.paragraph() for _ in range(self.rng.randint(3, 8))),
+                content_type=Article.ContentTypeChoices.VIDEO if is_video else Article.ContentTypeChoices.ARTICLE,
+                video_url=f"https://example.org/video/{self.run}-{index}" if is_video else None,
+                is_published=self.rng.random() < 0.95,
+                published_date=self.text.date_before(self.today, 3 * 365),
+            )
+
+    def news(self, count):
+        for index in range(count):
+            yield News(
+                title=self.text.title(),
+                slug=f"news-{self.run}-{index}",
+                description=self.text.sentence(),
+                image="",
+                content=[self.text.paragraph() for _ in range(self.rng.randint(2, 6))],
+                is_published=self.rng.random() < 0.95,
+                published_date=self.text.date_before(self.today, 3 * 365),
+            )
+
+    def reviews(self, count):
+        for _ in range(count):
+            yield Review(
+                name=self.text.person(),
+                event_name=self.text.event(),
+                rating=self.rng.choices((5, 4, 3, 2, 1), weights=(60, 25, 8, 4, 3))[0],
+                text=self.text.paragraph(self.rng.randint(1, 4)),
+                date=self.text.date_before(self.today, 2 * 365),
+            )
+
+    def leads(self, count):
+        for _ in range(count):
+            yield Lead(
+                name=self.text.person(),
+                contact=self.text.contact(),
+                message=self.text.sentence(),
+                is_processed=self.rng.random() < 0.7,
+            )
+
+    def seed_scenarios(self, count):
+        tariffs = list(Tariff.objects.values_list("service__slug", "slug", "service__title", "title", "price"))
+        if not tariffs:
+            self.stderr.write("No tariffs to build day scenarios from; run seed_services first.")
+            return 0
+
+        last_pk = DayScenario.objects.aggregate(value=Max("pk"))["value"] or 0
+        for numbers in batched(range(count), self.batch_size):
+            scenarios, picks = [], []
+            for _ in numbers:
+                chosen = self.rng.sample(tariffs, min(len(tariffs), self.rng.randint(1, 4)))
+                picks.append(chosen)
+                scenarios.append(
+                    DayScenario(
+                        name=self.text.person(),
+                        contact=self.text.contact(),
+                        date=self.today + dt.timedelta(days=self.rng.randint(-365, 90)),
+                        guests_count=self.rng.randint(1, 10),
+                        comment=self.text.sentence() if self.rng.random() < 0.3 else "",
+                        total_price=Decimal(sum(price for *_, price in chosen)),
+                        is_processed=self.rng.random() < 0.7,
+                    )
+                )
+            DayScenario.objects.bulk_create(scenarios)
+            ScenarioItem.objects.bulk_create(
+                ScenarioItem(
+                    scenario=scenario,
+                    service_slug=service_slug,
+                    tariff_slug=tariff_slug,
+                    title=f"{service_title} - {tariff_title}",
+                    price=price,
+                    quantity=1,
+                )
+                for scenario, chosen in zip(scenarios, picks)
+                for service_slug, tariff_slug, service_title, tariff_title, price in chosen
+            )
+        spread_created_at(DayScenario.objects.filter(pk__gt=last_pk))
+        return count
+
+    def service_requests(self, count):
+        services = list(Service.objects.filter(min_price__isnull=False).values_list("title", "slug", "min_price"))
+        if not services:
+            self.stderr.write("No priced services for service requests; run seed_services first.")
+            return
+        for _ in range(count):
+            title, slug, min_price = self.rng.choice(services)
+            quantity = self.rng.randint(1, 4)
+            yield ServiceRequest(
+                name=self.text.person(),
+                contact=self.text.contact(),
+                service_title=title,
+                service_slug=slug,
+                price=min_price,
+                total_price=min_price * quantity,
+                message=self.text.sentence() if self.rng.random() < 0.5 else "",
+                preferred_date=self.today + dt.timedelta(days=self.rng.randint(-180, 90)),
+                is_processed=self.rng.random() < 0.7,
+            )
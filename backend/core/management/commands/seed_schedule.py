@@ -1,3 +1,4 @@
+import calendar
 import datetime as dt
 import random
 
@@ -5,7 +6,10 @@ from django.core.management.base import BaseCommand
 from django.db import connection
 from django.db import transaction
 
-from core.models import ScheduleDay, ScheduleEvent, Service
+from core.models import ScheduleDay, ScheduleEvent, SeatHold, Service
+from core.recurrence import expand_recurrences
+from core.schedule import add_months
+from core.seeding import BATCH_SIZE, batched, clear, touch
 
 
 EVENT_TEMPLATES = [
@@ -69,99 +73,99 @@ EVENT_TEMPLATES = [
 class Command(BaseCommand):
     help = "Seed schedule days and events using frontend mock structure."
 
+    months_ahead = 8
+    min_events_target = 110
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=1,
+            help="Multiply the seeded months; the extra ones fill the archive before the current month.",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per INSERT.")
+
+    def make_event(self, rng, day_id, start_hour, order):
+        template = rng.choice(EVENT_TEMPLATES)
+        duration_minutes = rng.choice([60, 90, 120])
+        end_total_minutes = start_hour * 60 + duration_minutes
+        return ScheduleEvent(
+            day_id=day_id,
+            service_id=self.services_by_slug.get(template["service_slug"]) if template["service_slug"] else None,
+            title=template["title"],
+            category=template["category"],
+            description=template["description"],
+            time_start=dt.time(start_hour, 0),
+            time_end=dt.time(end_total_minutes // 60, end_total_minutes % 60),
+            price=rng.randint(template["price_min"], template["price_max"]),
+            color=template["color"],
+            order=order,
+        )
+
+    def seed_months(self, rng, first_month, offsets, batch_size):
+        """Insert the days of ``offsets`` months in one batch, then their events; return ``{date: [day_id, load]}``."""
+        days, plan = [], []
+        for month_offset in offsets:
+            first_day = add_months(first_month, month_offset)
+            days_in_month = calendar.monthrange(first_day.year, first_day.month)[1]
+            active_days_count = rng.randint(8, 15)
+            day_numbers = sorted(rng.sample(range(1, days_in_month + 1), min(active_days_count, days_in_month)))
+            for day_number in day_numbers:
+                days.append(ScheduleDay(date=first_day.replace(day=day_number), is_published=True))
+                plan.append((rng.randint(1, 3), rng.randint(8, 15)))
+
+        ScheduleDay.objects.bulk_create(days, batch_size=batch_size)
+        events = [
+            self.make_event(rng, day.pk, min(base_hour + idx * 2, 20), idx)
+            for day, (events_per_day, base_hour) in zip(days, plan)
+            for idx in range(events_per_day)
+        ]
+        ScheduleEvent.objects.bulk_create(events, batch_size=batch_size)
+        return {day.date: [day.pk, events_per_day] for day, (events_per_day, _) in zip(days, plan)}
+
     @transaction.atomic
     def handle(self, *args, **options):
         rng = random.Random(42)
         today = dt.date.today()
-
-        months_ahead = 8
-        min_events_target = 110
+        scale = max(options["scale"], 1)
+        batch_size = max(options["batch_size"], 1)
 
         with connection.cursor() as cursor:
             cursor.execute("SELECT to_regclass('public.core_scheduleitem')")
             if cursor.fetchone()[0]:
                 cursor.execute("DELETE FROM core_scheduleitem")
 
-        ScheduleEvent.objects.all().delete()
-        ScheduleDay.objects.all().delete()
-
-        services_by_slug = {item.slug: item for item in Service.objects.all()}
-        events_by_day = {}
-
-        for month_offset in range(months_ahead):
-            first_day = (today.replace(day=1) + dt.timedelta(days=31 * month_offset)).replace(day=1)
-            year = first_day.year
-            month = first_day.month
-            days_in_month = (first_day.replace(day=28) + dt.timedelta(days=4)).replace(day=1) - dt.timedelta(days=1)
-
-            active_days_count = rng.randint(8, 15)
-            target_size = min(active_days_count, days_in_month.day)
-            day_numbers = sorted(rng.sample(range(1, days_in_month.day + 1), target_size))
-
-            for day_number in day_numbers:
-                day_date = dt.date(year, month, day_number)
-                events_per_day = rng.randint(1, 3)
-                base_hour = rng.randint(8, 15)
-
-                day = ScheduleDay.objects.create(date=day_date, is_published=True)
-                events_by_day[day_date] = 0
-
-                for idx in range(events_per_day):
-                    template = rng.choice(EVENT_TEMPLATES)
-                    start_hour = min(base_hour + idx * 2, 20)
-                    duration_minutes = rng.choice([60, 90, 120])
-                    end_total_minutes = start_hour * 60 + duration_minutes
-                    end_hour = end_total_minutes // 60
-                    end_minutes = end_total_minutes % 60
-                    service = services_by_slug.get(template["service_slug"]) if template["service_slug"] else None
-
-                    ScheduleEvent.objects.create(
-                        day=day,
-                        service=service,
-                        title=template["title"],
-                        category=template["category"],
-                        description=template["description"],
-                        time_start=dt.time(start_hour, 0),
-                        time_end=dt.time(end_hour, end_minutes),
-                        price=rng.randint(template["price_min"], template["price_max"]),
-                        color=template["color"],
-                        order=idx,
-                    )
-                    events_by_day[day_date] += 1
-
-        current_events = sum(events_by_day.values())
-        if current_events < min_events_target:
-            days = sorted(events_by_day.keys())
-            day_cursor = 0
-
-            while current_events < min_events_target and days:
-                day_date = days[day_cursor % len(days)]
-                load = events_by_day[day_date]
-                if load < 3:
-                    template = rng.choice(EVENT_TEMPLATES)
-                    start_hour = 9 + load * 2
-                    duration_minutes = rng.choice([60, 90, 120])
-                    end_total_minutes = start_hour * 60 + duration_minutes
-                    end_hour = end_total_minutes // 60
-                    end_minutes = end_total_minutes % 60
-                    service = services_by_slug.get(template["service_slug"]) if template["service_slug"] else None
-
-                    day = ScheduleDay.objects.get(date=day_date)
-                    ScheduleEvent.objects.create(
-                        day=day,
-                        service=service,
-                        title=template["title"],
-                        category=template["category"],
-                        description=template["description"],
-                        time_start=dt.time(start_hour, 0),
-                        time_end=dt.time(end_hour, end_minutes),
-                        price=rng.randint(template["price_min"], template["price_max"]),
-                        color=template["color"],
-                        order=load,
-                    )
-                    events_by_day[day_date] = load + 1
-                    current_events += 1
-                day_cursor += 1
+        SeatHold.objects.all().delete()
+        clear(ScheduleEvent, ScheduleDay)
+
+        self.services_by_slug = dict(Service.objects.values_list("slug", "id"))
+        first_month = today.replace(day=1)
+        # Roughly BATCH_SIZE events per round trip at ~23 events a month.
+        months_per_batch = max(batch_size // 25, 1)
+
+        upcoming = {}
+        for offsets in batched(range(-self.months_ahead * (scale - 1), self.months_ahead), months_per_batch):
+            seeded = self.seed_months(rng, first_month, offsets, batch_size)
+            if offsets[-1] >= 0:
+                upcoming.update((date, load) for date, load in seeded.items() if date >= first_month)
+
+        # Top up the upcoming months to at least min_events_target events.
+        current_events = sum(load for _, load in upcoming.values())
+        days = sorted(upcoming)
+        extra = []
+        day_cursor = 0
+        while current_events < self.min_events_target and days and day_cursor < len(days) * 3:
+            day_id, load = upcoming[days[day_cursor % len(days)]]
+            if load < 3:
+                extra.append(self.make_event(rng, day_id, 9 + load * 2, load))
+                upcoming[days[day_cursor % len(days)]][1] = load + 1
+                current_events += 1
+            day_cursor += 1
+        ScheduleEvent.objects.bulk_create(extra, batch_size=batch_size)
+
+        # Recurring rules lost their occurrences with the old days.
+        expand_recurrences()
+        touch("schedule")
 
         self.stdout.write(self.style.SUCCESS("Schedule seeded successfully."))
         self.stdout.write(f"Days created: {ScheduleDay.objects.count()}")
@@ -5,11 +5,16 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import connection
 from django.db import transaction
 
-from core.models import Service, Tariff
+from core.models import ScheduleEvent, ScheduleRecurrence, Service, Tariff
+from core.seeding import BATCH_SIZE, bulk_insert, clear, touch
+from core.service_import import import_services, read_service_tree
 
 
 class Command(BaseCommand):
-    help = "Seed services and tariffs from converted frontend services seed data."
+    help = (
+        "Seed services and tariffs from converted frontend services seed data. "
+        "Existing rows are matched by slug and only changes are written, unless --replace is given."
+    )
 
     def _load_seed(self):
         seed_path = Path(__file__).resolve().parents[2] / "data" / "services_seed.json"
@@ -20,46 +25,44 @@ class Command(BaseCommand):
         except json.JSONDecodeError as exc:
             raise CommandError(f"Invalid JSON in {seed_path}: {exc}") from exc
 
-    def _create_service_tree(self, items, parent=None):
-        created_services = 0
-        created_tariffs = 0
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=1,
+            help="Copies of the seed tree; copies after the first get numbered slugs and titles.",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per INSERT with --replace.")
+        parser.add_argument("--dry-run", action="store_true", help="Only print what would change.")
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete every service and tariff and insert the tree anew (new ids, events lose their service).",
+        )
 
-        for item in items:
-            service = Service.objects.create(
-                title=item.get("title", ""),
-                slug=item.get("slug", ""),
-                description=item.get("description", ""),
-                is_category=bool(item.get("is_category", False)),
-                order=int(item.get("order", 0) or 0),
-                parent=parent,
+    def _create_service_tree(self, services, tariffs, batch_size):
+        """Insert the tree one depth level per ``bulk_create``, so parents have ids before their children."""
+        ids = {}
+        for depth in sorted({depth for depth, _, _ in services.values()}):
+            level = [slug for slug, (slug_depth, _, _) in services.items() if slug_depth == depth]
+            created = Service.objects.bulk_create(
+                [
+                    Service(slug=slug, parent_id=ids.get(services[slug][1]), **services[slug][2])
+                    for slug in level
+                ],
+                batch_size=batch_size,
             )
-            created_services += 1
+            ids.update((service.slug, service.pk) for service in created)
 
-            for tariff in item.get("tariffs", []) or []:
-                Tariff.objects.create(
-                    service=service,
-                    title=tariff.get("title", ""),
-                    slug=tariff.get("slug", ""),
-                    description=tariff.get("description", ""),
-                    duration=tariff.get("duration", ""),
-                    price=int(tariff.get("price", 0) or 0),
-                    order=int(tariff.get("order", 0) or 0),
-                )
-                created_tariffs += 1
-
-            child_services, child_tariffs = self._create_service_tree(
-                item.get("children", []) or [],
-                parent=service,
-            )
-            created_services += child_services
-            created_tariffs += child_tariffs
-
-        return created_services, created_tariffs
+        created_tariffs = bulk_insert(
+            Tariff,
+            (Tariff(service_id=ids[service_slug], slug=slug, **fields) for (service_slug, slug), fields in tariffs.items()),
+            batch_size,
+        )
+        return len(ids), created_tariffs
 
     @transaction.atomic
-    def handle(self, *args, **options):
-        seed_data = self._load_seed()
-
+    def replace(self, services, tariffs, batch_size):
         # Keep compatibility with older schedule schema where core_scheduleitem
         # still references core_service via FK and model is not loaded in ORM.
         with connection.cursor() as cursor:
@@ -67,11 +70,39 @@ class Command(BaseCommand):
             if cursor.fetchone()[0]:
                 cursor.execute("UPDATE core_scheduleitem SET service_id = NULL")
 
-        Tariff.objects.all().delete()
-        Service.objects.all().delete()
+        # What Service.delete() would do through SET_NULL, without loading every row.
+        ScheduleEvent.objects.filter(service__isnull=False).update(service=None)
+        ScheduleRecurrence.objects.filter(service__isnull=False).update(service=None)
+        clear(Tariff, Service)
 
-        created_services, created_tariffs = self._create_service_tree(seed_data)
+        created_services, created_tariffs = self._create_service_tree(services, tariffs, batch_size)
+        # bulk_create skips Service.save() and the Tariff signals.
+        Service.rebuild_paths()
+        Service.refresh_tariff_stats()
+        touch("services", "schedule")
 
         self.stdout.write(self.style.SUCCESS("Services seeded successfully."))
         self.stdout.write(f"Services created: {created_services}")
         self.stdout.write(f"Tariffs created: {created_tariffs}")
+
+    def handle(self, *args, **options):
+        try:
+            services, tariffs = read_service_tree(self._load_seed(), max(options["scale"], 1))
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        if options["replace"]:
+            if options["dry_run"]:
+                raise CommandError("--dry-run cannot be combined with --replace.")
+            self.replace(services, tariffs, max(options["batch_size"], 1))
+            return
+
+        summary = import_services(services, tariffs, dry_run=options["dry_run"])
+        if options["dry_run"]:
+            self.stdout.write("Dry run, nothing was written.")
+        elif summary.has_changes:
+            self.stdout.write(self.style.SUCCESS("Services synced successfully."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Services are up to date."))
+        self.stdout.write(f"Services: {summary.services}")
+        self.stdout.write(f"Tariffs: {summary.tariffs}")
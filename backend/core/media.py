@@ -0,0 +1,100 @@
+import re
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+from django.utils.encoding import filepath_to_uri
+from rest_framework import serializers
+
+from .renditions import height_field_name, image_info, meta_field_name, width_field_name
+from .storage import BLOB_DIR
+
+# Names made only of these characters are already valid URL paths.
+_URL_SAFE_NAME = re.compile(r"[A-Za-z0-9/_.~!*()'-]*")
+
+
+@lru_cache
+def media_upload_dirs():
+    """Directories that file fields upload into; only these are served as media."""
+    dirs = {BLOB_DIR}
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField) and isinstance(field.upload_to, str) and field.upload_to:
+                dirs.add(field.upload_to.rstrip("/") + "/")
+    return tuple(sorted(dirs))
+
+
+class MediaURLResolver:
+    """Turn stored media names into URLs with one string concatenation.
+
+    The prefix is ``MEDIA_URL`` when it is absolute (media served from a CDN
+    or a separate host); otherwise it is made absolute once per request, or
+    left relative when there is no request. Names are quoted like
+    ``FileSystemStorage.url`` does.
+    """
+
+    def __init__(self, request=None):
+        media_url = settings.MEDIA_URL
+        self.is_absolute = "://" in media_url or media_url.startswith("//")
+        if not self.is_absolute and request is not None:
+            media_url = request.build_absolute_uri(media_url)
+            self.is_absolute = True
+        self.prefix = media_url
+
+    def url(self, name):
+        if not name:
+            return None
+        if _URL_SAFE_NAME.fullmatch(name) is None:
+            name = filepath_to_uri(name)
+        return self.prefix + name.lstrip("/")
+
+
+def get_media_resolver(request=None):
+    """Return the resolver for ``request``, built once and kept on it."""
+    if request is None:
+        return MediaURLResolver()
+    resolver = getattr(request, "_media_url_resolver", None)
+    if resolver is None:
+        resolver = request._media_url_resolver = MediaURLResolver(request)
+    return resolver
+
+
+class MediaURLField(serializers.Field):
+    """Read-only URL of a file or image field, resolved by ``MediaURLResolver``.
+
+    With ``absolute_only`` it returns ``None`` when only a relative URL can
+    be built, i.e. without a request and without an absolute ``MEDIA_URL``.
+    """
+
+    def __init__(self, absolute_only=False, **kwargs):
+        self.absolute_only = absolute_only
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        resolver = get_media_resolver(self.context.get("request"))
+        if self.absolute_only and not resolver.is_absolute:
+            return None
+        return resolver.url(getattr(value, "name", value))
+
+
+class ImageMetaField(serializers.Field):
+    """Read-only info of the image field ``image_field`` with media URLs.
+
+    Renders ``{"width", "height", "color", "lqip", "srcset"}`` from the
+    ``<field>_width``/``<field>_height`` columns and ``<field>_meta``, where
+    ``srcset`` is ``{"image/webp": "<url> 320w, <url> 640w", ...}`` or
+    ``None`` while renditions are pending. ``None`` when nothing is known yet.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        self.attrs = (meta_field_name(image_field), width_field_name(image_field), height_field_name(image_field))
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        meta, width, height = (getattr(value, attr) for attr in self.attrs)
+        return image_info(meta, width, height, get_media_resolver(self.context.get("request")))
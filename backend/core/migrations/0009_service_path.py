@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+def fill_service_paths(apps, schema_editor):
+    Service = apps.get_model("core", "Service")
+    parents = dict(Service.objects.values_list("pk", "parent_id"))
+    paths = {}
+
+    def resolve(pk):
+        if pk not in paths:
+            parent_id = parents[pk]
+            paths[pk] = (resolve(parent_id) if parent_id else "") + f"{pk}/"
+        return paths[pk]
+
+    rows = list(Service.objects.only("pk"))
+    for row in rows:
+        row.path = resolve(row.pk)
+        row.depth = row.path.count("/") - 1
+    Service.objects.bulk_update(rows, ["path", "depth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_scheduleevent_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_service_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['path'], name='core_service_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
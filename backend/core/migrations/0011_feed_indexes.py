@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_updated_at_contentgeneration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_date', '-created_at', '-id'], name='core_article_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_date', '-created_at', '-id'], name='core_news_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-date', '-created_at', '-id'], name='core_review_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='preview_image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='heroblock',
+            name='avatar_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображения'),
+        ),
+        migrations.AddField(
+            model_name='heroblock',
+            name='background_image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображения'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображения'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='avatar_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='scheduleevent',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображения'),
+        ),
+    ]
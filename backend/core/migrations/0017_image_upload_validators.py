@@ -0,0 +1,44 @@
+# Generated by Django 5.2.11 on 2026-10-18 16:40
+
+import core.ingest
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_mediablob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='preview_image',
+            field=models.ImageField(blank=True, null=True, upload_to='articles/', validators=[core.ingest.validate_image_upload]),
+        ),
+        migrations.AlterField(
+            model_name='heroblock',
+            name='avatar',
+            field=models.ImageField(upload_to='hero/avatar/', validators=[core.ingest.validate_image_upload], verbose_name='Аватар'),
+        ),
+        migrations.AlterField(
+            model_name='heroblock',
+            name='background_image',
+            field=models.ImageField(upload_to='hero/background/', validators=[core.ingest.validate_image_upload], verbose_name='Фоновое изображение'),
+        ),
+        migrations.AlterField(
+            model_name='news',
+            name='image',
+            field=models.ImageField(upload_to='news/', validators=[core.ingest.validate_image_upload], verbose_name='Изображение'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, upload_to='reviews/', validators=[core.ingest.validate_image_upload]),
+        ),
+        migrations.AlterField(
+            model_name='scheduleevent',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='schedule_events/', validators=[core.ingest.validate_image_upload], verbose_name='Изображение'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-18 17:35
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_tariff_stats(apps, schema_editor):
+    Service = apps.get_model("core", "Service")
+    Tariff = apps.get_model("core", "Tariff")
+    tariffs = Tariff.objects.filter(service=OuterRef("pk")).order_by().values("service")
+    Service.objects.update(
+        min_price=Subquery(tariffs.annotate(value=Min("price")).values("value")),
+        tariff_count=Coalesce(Subquery(tariffs.annotate(value=Count("pk")).values("value")), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_image_upload_validators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='min_price',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='tariff_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_tariff_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.11 on 2026-10-18 15:05
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_service_tariff_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('seats', models.PositiveIntegerField(verbose_name='Мест')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='Истекает')),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True, verbose_name='Подтверждено')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+            ],
+            options={
+                'verbose_name': 'Бронь мест',
+                'verbose_name_plural': 'Брони мест',
+            },
+        ),
+        migrations.AddField(
+            model_name='scheduleevent',
+            name='booked',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Забронировано'),
+        ),
+        migrations.AddField(
+            model_name='scheduleevent',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Мест'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduleevent',
+            constraint=models.CheckConstraint(condition=models.Q(('capacity__isnull', True), ('booked__lte', models.F('capacity')), _connector='OR'), name='core_scheduleevent_booked_lte_capacity', violation_error_message='Мест меньше, чем уже забронировано.'),
+        ),
+        migrations.AddField(
+            model_name='seathold',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='core.scheduleevent', verbose_name='Событие'),
+        ),
+        migrations.AddIndex(
+            model_name='seathold',
+            index=models.Index(condition=models.Q(('confirmed_at__isnull', True)), fields=['expires_at'], name='core_seathold_pending_idx'),
+        ),
+    ]
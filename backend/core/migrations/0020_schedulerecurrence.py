@@ -0,0 +1,52 @@
+# Generated by Django 5.2.11 on 2026-10-18 15:50
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_seat_booking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleRecurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='Название')),
+                ('category', models.CharField(max_length=255, verbose_name='Категория')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+                ('time_start', models.TimeField(verbose_name='Начало')),
+                ('time_end', models.TimeField(verbose_name='Окончание')),
+                ('price', models.IntegerField(blank=True, null=True, verbose_name='Цена')),
+                ('capacity', models.PositiveIntegerField(blank=True, null=True, verbose_name='Мест')),
+                ('color', models.CharField(blank=True, max_length=20, verbose_name='Цвет')),
+                ('order', models.PositiveIntegerField(default=0, verbose_name='Порядок')),
+                ('weekdays', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveSmallIntegerField(choices=[(0, 'Понедельник'), (1, 'Вторник'), (2, 'Среда'), (3, 'Четверг'), (4, 'Пятница'), (5, 'Суббота'), (6, 'Воскресенье')]), size=None, verbose_name='Дни недели')),
+                ('interval', models.PositiveSmallIntegerField(default=1, verbose_name='Каждые N недель')),
+                ('starts_on', models.DateField(verbose_name='Начиная с')),
+                ('until', models.DateField(blank=True, null=True, verbose_name='По')),
+                ('exceptions', django.contrib.postgres.fields.ArrayField(base_field=models.DateField(), blank=True, default=list, size=None, verbose_name='Кроме дат')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активно')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.service', verbose_name='Услуга')),
+            ],
+            options={
+                'verbose_name': 'Повторяющееся событие',
+                'verbose_name_plural': 'Повторяющиеся события',
+                'ordering': ['time_start', 'order'],
+            },
+        ),
+        migrations.AddField(
+            model_name='scheduleevent',
+            name='recurrence',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='core.schedulerecurrence', verbose_name='Повторение'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduleevent',
+            constraint=models.UniqueConstraint(condition=models.Q(('recurrence__isnull', False)), fields=('recurrence', 'day'), name='core_scheduleevent_one_occurrence_per_day'),
+        ),
+    ]
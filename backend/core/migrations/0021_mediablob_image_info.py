@@ -0,0 +1,51 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+def fill_blob_image_info(apps, schema_editor):
+    MediaBlob = apps.get_model("core", "MediaBlob")
+    infos = {}
+    for model in apps.get_models():
+        names = {field.name for field in model._meta.concrete_fields}
+        for field in model._meta.concrete_fields:
+            if not isinstance(field, models.ImageField) or f"{field.name}_meta" not in names:
+                continue
+            rows = model._default_manager.filter(**{f"{field.name}_meta__has_key": "renditions"}).values_list(
+                f"{field.name}_meta", f"{field.name}_width", f"{field.name}_height"
+            )
+            for meta, width, height in rows.iterator():
+                if meta.get("source") and not meta.get("pending"):
+                    shared = {key: value for key, value in meta.items() if key != "source"}
+                    infos[meta["source"]] = (shared, width, height)
+    blobs = list(MediaBlob.objects.filter(name__in=infos))
+    for blob in blobs:
+        blob.image_meta, blob.width, blob.height = infos[blob.name]
+    MediaBlob.objects.bulk_update(blobs, ["image_meta", "width", "height"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_schedulerecurrence'),
+        ('pages', '0007_image_upload_validators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота'),
+        ),
+        migrations.AddField(
+            model_name='mediablob',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображения'),
+        ),
+        migrations.AddField(
+            model_name='mediablob',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина'),
+        ),
+        migrations.RunPython(fill_blob_image_info, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_mediablob_image_info'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mediablob',
+            name='core_mediablob_unused_idx',
+        ),
+        migrations.RemoveField(
+            model_name='mediablob',
+            name='refcount',
+        ),
+    ]
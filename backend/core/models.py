@@ -1,6 +1,20 @@
-from django.db import models
+import datetime as dt
+import uuid
+
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.exceptions import ValidationError
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Substr
+from django.utils import timezone
 from django.utils.text import slugify
 
+from .expressions import JSONStringsSearchVector
+from .ingest import validate_image_upload
+from .schedule import WEEKDAY_LABELS
+
 
 class HeroBlock(models.Model):
     title = models.CharField(
@@ -15,13 +29,22 @@ class HeroBlock(models.Model):
     background_image = models.ImageField(
         upload_to="hero/background/",
         verbose_name="Фоновое изображение",
+        validators=[validate_image_upload],
     )
+    background_image_meta = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Версии изображения")
+    background_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина")
+    background_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота")
     avatar = models.ImageField(
         upload_to="hero/avatar/",
         verbose_name="Аватар",
+        validators=[validate_image_upload],
     )
+    avatar_meta = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Версии изображения")
+    avatar_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина")
+    avatar_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота")
     is_active = models.BooleanField(default=True, verbose_name="Активен")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлено")
 
     class Meta:
         verbose_name = "Hero-блок"
@@ -39,18 +62,25 @@ class Review(models.Model):
         FOUR = 4, "4"
         FIVE = 5, "5"
 
-    avatar = models.ImageField(upload_to="reviews/", null=True, blank=True)
+    avatar = models.ImageField(upload_to="reviews/", null=True, blank=True, validators=[validate_image_upload])
+    avatar_meta = models.JSONField(default=dict, blank=True, editable=False)
+    avatar_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    avatar_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     name = models.CharField(max_length=255)
     event_name = models.CharField(max_length=255)
     rating = models.PositiveSmallIntegerField(choices=RatingChoices.choices)
     text = models.TextField()
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
         ordering = ["-date", "-created_at"]
+        indexes = [
+            models.Index(fields=["-date", "-created_at", "-id"], name="core_review_feed_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.event_name})"
@@ -63,7 +93,10 @@ class Article(models.Model):
 
     title = models.CharField(max_length=255)
     slug = models.SlugField(unique=True, blank=True)
-    preview_image = models.ImageField(upload_to="articles/", null=True, blank=True)
+    preview_image = models.ImageField(upload_to="articles/", null=True, blank=True, validators=[validate_image_upload])
+    preview_image_meta = models.JSONField(default=dict, blank=True, editable=False)
+    preview_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    preview_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     preview_description = models.TextField()
     content = models.TextField()
     content_type = models.CharField(max_length=20, choices=ContentTypeChoices.choices)
@@ -71,11 +104,29 @@ class Article(models.Model):
     is_published = models.BooleanField(default=True)
     published_date = models.DateField(verbose_name="Дата публикации")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="russian")
+            + SearchVector("preview_description", weight="B", config="russian")
+            + SearchVector("content", weight="C", config="russian")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Статья / Видео"
         verbose_name_plural = "Статьи и видео"
         ordering = ["-published_date", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["-published_date", "-created_at", "-id"],
+                name="core_article_feed_idx",
+                condition=models.Q(is_published=True),
+            ),
+            GinIndex(fields=["search_vector"], name="core_article_search_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -96,16 +147,38 @@ class News(models.Model):
     title = models.CharField(max_length=255, verbose_name="Заголовок")
     slug = models.SlugField(unique=True, blank=True, verbose_name="Slug")
     description = models.TextField(verbose_name="Краткое описание")
-    image = models.ImageField(upload_to="news/", verbose_name="Изображение")
+    image = models.ImageField(upload_to="news/", verbose_name="Изображение", validators=[validate_image_upload])
+    image_meta = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Версии изображения")
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина")
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота")
     published_date = models.DateField(verbose_name="Дата публикации")
     content = models.JSONField(verbose_name="Контент (абзацы)")
     is_published = models.BooleanField(default=True, verbose_name="Опубликовано")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # jsonb_to_tsvector indexes only the string paragraphs of ``content``.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="russian")
+            + SearchVector("description", weight="B", config="russian")
+            + JSONStringsSearchVector("content", config="russian", weight="C")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Новость"
         verbose_name_plural = "Новости"
         ordering = ["-published_date", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["-published_date", "-created_at", "-id"],
+                name="core_news_feed_idx",
+                condition=models.Q(is_published=True),
+            ),
+            GinIndex(fields=["search_vector"], name="core_news_search_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -136,15 +209,104 @@ class Service(models.Model):
         related_name="children",
         on_delete=models.CASCADE,
     )
+    # Materialized path of primary keys ("1/4/9/"), so a subtree is a single
+    # indexed prefix query. Maintained in save(); descendants are removed by
+    # the CASCADE on parent, so deletes need no bookkeeping.
+    path = models.CharField(max_length=255, blank=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Cheapest tariff and number of tariffs, kept by Tariff signals (see
+    # core.service_index) so pricing a request needs no aggregate.
+    min_price = models.IntegerField(null=True, blank=True, editable=False)
+    tariff_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="russian")
+            + SearchVector("description", weight="B", config="russian")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ["order"]
+        indexes = [
+            models.Index(
+                fields=["path"],
+                name="core_service_path_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            GinIndex(fields=["search_vector"], name="core_service_search_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def clean(self):
+        if self.pk and self.parent_id:
+            parent_path = Service.objects.filter(pk=self.parent_id).values_list("path", flat=True).first()
+            if parent_path and self.path and parent_path.startswith(self.path):
+                raise ValidationError({"parent": "Нельзя вложить услугу в саму себя или в её потомка."})
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._sync_path()
+
+    def _sync_path(self):
+        parent_path = ""
+        if self.parent_id:
+            parent_path = Service.objects.filter(pk=self.parent_id).values_list("path", flat=True).first() or ""
+        path = f"{parent_path}{self.pk}/"
+        depth = path.count("/") - 1
+        if path == self.path and depth == self.depth:
+            return
+
+        old_path, old_depth = self.path, self.depth
+        Service.objects.filter(pk=self.pk).update(path=path, depth=depth)
+        if old_path:
+            Service.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (depth - old_depth),
+            )
+        self.path = path
+        self.depth = depth
+
+    @classmethod
+    def rebuild_paths(cls):
+        """Recompute path/depth for every service, e.g. after bulk_create."""
+        parents = dict(cls.objects.values_list("pk", "parent_id"))
+        rows = list(cls.objects.only("pk", "path", "depth"))
+        paths = {}
+
+        def resolve(pk):
+            if pk not in paths:
+                parent_id = parents[pk]
+                paths[pk] = (resolve(parent_id) if parent_id else "") + f"{pk}/"
+            return paths[pk]
+
+        changed = []
+        for row in rows:
+            path = resolve(row.pk)
+            depth = path.count("/") - 1
+            if row.path != path or row.depth != depth:
+                row.path = path
+                row.depth = depth
+                changed.append(row)
+        cls.objects.bulk_update(changed, ["path", "depth"], batch_size=500)
+        return len(changed)
+
+    @classmethod
+    def refresh_tariff_stats(cls, pks=None):
+        """Recompute min_price/tariff_count for ``pks`` (all services by default) in one UPDATE."""
+        tariffs = Tariff.objects.filter(service=OuterRef("pk")).order_by().values("service")
+        services = cls.objects.all() if pks is None else cls.objects.filter(pk__in=pks)
+        return services.update(
+            min_price=Subquery(tariffs.annotate(value=Min("price")).values("value")),
+            tariff_count=Coalesce(Subquery(tariffs.annotate(value=Count("pk")).values("value")), 0),
+        )
+
 
 class Tariff(models.Model):
     service = models.ForeignKey(Service, related_name="tariffs", on_delete=models.CASCADE)
@@ -166,6 +328,7 @@ class Tariff(models.Model):
 class ScheduleDay(models.Model):
     date = models.DateField(unique=True)
     is_published = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["date"]
@@ -174,6 +337,69 @@ class ScheduleDay(models.Model):
         return self.date.isoformat()
 
 
+class ScheduleRecurrence(models.Model):
+    """Weekly rule for an event repeated on the schedule.
+
+    ``expand_schedule`` (and every save of a rule) materializes its
+    occurrences as ScheduleDay/ScheduleEvent rows up to the horizon; see
+    ``core.recurrence``. Deactivating a rule drops its upcoming
+    occurrences, deleting it keeps them as one-off events.
+    """
+
+    WEEKDAY_CHOICES = list(enumerate(WEEKDAY_LABELS))
+
+    title = models.CharField(max_length=255, verbose_name="Название")
+    category = models.CharField(max_length=255, verbose_name="Категория")
+    description = models.TextField(blank=True, verbose_name="Описание")
+    service = models.ForeignKey(Service, null=True, blank=True, on_delete=models.SET_NULL, verbose_name="Услуга")
+    time_start = models.TimeField(verbose_name="Начало")
+    time_end = models.TimeField(verbose_name="Окончание")
+    price = models.IntegerField(null=True, blank=True, verbose_name="Цена")
+    capacity = models.PositiveIntegerField(null=True, blank=True, verbose_name="Мест")
+    color = models.CharField(max_length=20, blank=True, verbose_name="Цвет")
+    order = models.PositiveIntegerField(default=0, verbose_name="Порядок")
+    weekdays = ArrayField(
+        models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES),
+        verbose_name="Дни недели",
+    )
+    interval = models.PositiveSmallIntegerField(default=1, verbose_name="Каждые N недель")
+    starts_on = models.DateField(verbose_name="Начиная с")
+    until = models.DateField(null=True, blank=True, verbose_name="По")
+    exceptions = ArrayField(models.DateField(), default=list, blank=True, verbose_name="Кроме дат")
+    is_active = models.BooleanField(default=True, verbose_name="Активно")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["time_start", "order"]
+        verbose_name = "Повторяющееся событие"
+        verbose_name_plural = "Повторяющиеся события"
+
+    def __str__(self):
+        return self.title
+
+    def clean(self):
+        if not self.weekdays:
+            raise ValidationError({"weekdays": "Выберите хотя бы один день недели."})
+        if self.interval < 1:
+            raise ValidationError({"interval": "Интервал должен быть не меньше одной недели."})
+        if self.until and self.until < self.starts_on:
+            raise ValidationError({"until": "Дата окончания раньше даты начала."})
+
+    def occurrences(self, start, end):
+        """Dates of the rule within ``start``..``end`` inclusive, exceptions excluded."""
+        first = max(start, self.starts_on)
+        last = min(end, self.until) if self.until else end
+        anchor = self.starts_on - dt.timedelta(days=self.starts_on.weekday())
+        weekdays = set(self.weekdays)
+        exceptions = set(self.exceptions)
+        day = first
+        while day <= last:
+            weeks = (day - anchor).days // 7
+            if day.weekday() in weekdays and weeks % self.interval == 0 and day not in exceptions:
+                yield day
+            day += dt.timedelta(days=1)
+
+
 class ScheduleEvent(models.Model):
     day = models.ForeignKey(
         ScheduleDay,
@@ -194,15 +420,197 @@ class ScheduleEvent(models.Model):
         blank=True,
         null=True,
         verbose_name="Изображение",
+        validators=[validate_image_upload],
     )
+    image_meta = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Версии изображения")
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина")
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота")
     time_start = models.TimeField()
     time_end = models.TimeField()
     price = models.IntegerField(null=True, blank=True)
+    capacity = models.PositiveIntegerField(null=True, blank=True, verbose_name="Мест")
+    booked = models.PositiveIntegerField(default=0, editable=False, verbose_name="Забронировано")
     color = models.CharField(max_length=20, blank=True)
     order = models.PositiveIntegerField(default=0)
+    recurrence = models.ForeignKey(
+        ScheduleRecurrence,
+        null=True,
+        blank=True,
+        related_name="events",
+        on_delete=models.SET_NULL,
+        editable=False,
+        verbose_name="Повторение",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["time_start", "order"]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(capacity__isnull=True) | models.Q(booked__lte=F("capacity")),
+                name="core_scheduleevent_booked_lte_capacity",
+                violation_error_message="Мест меньше, чем уже забронировано.",
+            ),
+            models.UniqueConstraint(
+                fields=["recurrence", "day"],
+                name="core_scheduleevent_one_occurrence_per_day",
+                condition=models.Q(recurrence__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.day.date} {self.title}"
+
+    def clean(self):
+        # ``booked`` is not a form field, so the check constraint is skipped
+        # by validation; compare against the stored count instead.
+        if self.pk and self.capacity is not None:
+            booked = ScheduleEvent.objects.filter(pk=self.pk).values_list("booked", flat=True).first() or 0
+            if self.capacity < booked:
+                raise ValidationError({"capacity": f"Уже забронировано мест: {booked}. Вместимость не может быть меньше."})
+
+    def save(self, *args, **kwargs):
+        # ``booked`` only moves through the conditional UPDATEs in core.booking;
+        # saving an instance loaded earlier must not write back a stale count.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields if not field.primary_key and field.name != "booked"
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def seats_left(self):
+        return seats_left((self.capacity, self.booked))
+
+
+def seats_left(capacity_booked):
+    """Free seats for a ``(capacity, booked)`` pair; ``None`` when the event has no limit."""
+    capacity, booked = capacity_booked
+    return None if capacity is None else max(capacity - booked, 0)
+
+
+class SeatHold(models.Model):
+    """Seats of a ScheduleEvent taken out of ``booked`` for a visitor.
+
+    A hold expires at ``expires_at`` unless a service request confirms it;
+    ``release_seat_holds`` returns expired seats to the event.
+    """
+
+    event = models.ForeignKey(ScheduleEvent, related_name="holds", on_delete=models.CASCADE, verbose_name="Событие")
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    seats = models.PositiveIntegerField(verbose_name="Мест")
+    expires_at = models.DateTimeField(null=True, blank=True, verbose_name="Истекает")
+    confirmed_at = models.DateTimeField(null=True, blank=True, verbose_name="Подтверждено")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
+
+    class Meta:
+        verbose_name = "Бронь мест"
+        verbose_name_plural = "Брони мест"
+        indexes = [
+            models.Index(
+                fields=["expires_at"],
+                name="core_seathold_pending_idx",
+                condition=models.Q(confirmed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} × {self.seats}"
+
+
+class ContentGeneration(models.Model):
+    """Per-namespace change counter shared by all workers through the database.
+
+    Bumped by ``core.signals`` whenever content of the namespace changes; read
+    by ``ConditionalGetMixin`` to derive ETag and Last-Modified.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Поколение контента"
+        verbose_name_plural = "Поколения контента"
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+    @classmethod
+    def bump(cls, *names):
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"""
+                INSERT INTO {cls._meta.db_table} (name, value, updated_at)
+                VALUES (%s, 1, %s)
+                ON CONFLICT (name) DO UPDATE
+                SET value = {cls._meta.db_table}.value + 1, updated_at = EXCLUDED.updated_at
+                """,
+                [(name, now) for name in names],
+            )
+
+
+class ImageJob(models.Model):
+    """Rendition build queued for one image field, run by ``process_images``.
+
+    There is at most one job per image field; re-uploading while a job is
+    queued or running points it at the new file.
+    """
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Выполняется"
+        FAILED = "failed", "Ошибка"
+
+    model = models.CharField(max_length=100, verbose_name="Модель")
+    object_id = models.BigIntegerField(verbose_name="ID объекта")
+    field_name = models.CharField(max_length=100, verbose_name="Поле")
+    source = models.CharField(max_length=255, verbose_name="Файл")
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+        verbose_name="Статус",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попытки")
+    error = models.TextField(blank=True, verbose_name="Ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлено")
+
+    class Meta:
+        verbose_name = "Обработка изображения"
+        verbose_name_plural = "Обработка изображений"
+        constraints = [
+            models.UniqueConstraint(fields=["model", "object_id", "field_name"], name="core_imagejob_target_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["status", "id"], name="core_imagejob_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id}.{self.field_name}"
+
+
+class MediaBlob(models.Model):
+    """One stored file of ``ContentAddressedStorage``.
+
+    Files that no object's file field or renditions reference are deleted,
+    with their rows, by ``collect_media``.
+    """
+
+    name = models.CharField(max_length=255, unique=True, verbose_name="Файл")
+    size = models.BigIntegerField(verbose_name="Размер")
+    # Image info and renditions built for this file, shared by every object
+    # that stores it (see ``core.renditions.known_image_info``).
+    image_meta = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Версии изображения")
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина")
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
+
+    class Meta:
+        verbose_name = "Файл медиа"
+        verbose_name_plural = "Файлы медиа"
+
+    def __str__(self):
+        return self.name
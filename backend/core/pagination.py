@@ -0,0 +1,131 @@
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class ScheduleArchivePagination(CursorPagination):
+    ordering = "-date"
+    page_size = 31
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Cursor pagination over a composite ordering without OFFSET or COUNT.
+
+    DRF's ``CursorPagination`` positions on the first ordering field only and
+    skips ties with OFFSET. Here the opaque cursor carries the value of every
+    ordering field, and the next page is fetched with a keyset predicate, so
+    deep pages cost the same as the first. ``ordering`` must end with a
+    unique field.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.cursor = self.decode_cursor(request)
+        position = self.cursor.position if self.cursor else None
+        reverse = self.cursor.reverse if self.cursor else False
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(field[1:] if field.startswith("-") else f"-{field}" for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.build_keyset_filter(ordering, position))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        return self.page
+
+    def build_keyset_filter(self, ordering, position):
+        names = [field.lstrip("-") for field in ordering]
+        lookups = ["lt" if field.startswith("-") else "gt" for field in ordering]
+
+        after = Q()
+        for index, name in enumerate(names):
+            term = Q(**{f"{name}__{lookups[index]}": position[index]})
+            for prev_name, prev_value in zip(names[:index], position):
+                term &= Q(**{prev_name: prev_value})
+            after |= term
+
+        # Redundant bound on the leading column keeps the predicate index-friendly.
+        lead = Q(**{f"{names[0]}__{lookups[0]}e": position[0]})
+        return lead & after
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.get_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.cursor.position))
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.get_position(self.page[0])))
+
+    def get_position(self, item):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            value = item[name] if isinstance(item, dict) else getattr(item, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return values
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            raw_position = json.loads(tokens["p"][0])
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+            if not isinstance(raw_position, list) or len(raw_position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, raw_position)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message) from None
+
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {"p": json.dumps(cursor.position, separators=(",", ":"))}
+        if cursor.reverse:
+            tokens["r"] = "1"
+        querystring = parse.urlencode(tokens)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+class PublishedCursorPagination(KeysetCursorPagination):
+    ordering = ("-published_date", "-created_at", "-id")
+
+
+class ReviewCursorPagination(KeysetCursorPagination):
+    ordering = ("-date", "-created_at", "-id")
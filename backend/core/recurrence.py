@@ -0,0 +1,118 @@
+import datetime as dt
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import invalidate_on_commit
+from .models import ContentGeneration, ScheduleDay, ScheduleEvent, ScheduleRecurrence
+
+# Advisory lock key serializing expansions.
+EXPANSION_LOCK = 0x7265637572
+
+# Event fields copied from the rule to each occurrence.
+OCCURRENCE_FIELDS = (
+    "title",
+    "category",
+    "description",
+    "service_id",
+    "time_start",
+    "time_end",
+    "price",
+    "capacity",
+    "color",
+    "order",
+)
+
+
+class ExpansionResult(NamedTuple):
+    created: int
+    updated: int
+    deleted: int
+    # Occurrences no longer in a rule that were kept because seats are booked.
+    kept: int
+
+
+def _occurrence_values(rule, booked=0):
+    values = {field: getattr(rule, field) for field in OCCURRENCE_FIELDS}
+    if values["capacity"] is not None:
+        values["capacity"] = max(values["capacity"], booked)
+    return values
+
+
+def expand_recurrences(rules=None, start=None, end=None):
+    """Materialize rule occurrences from ``start`` (today) to ``end`` (the horizon).
+
+    The work is diffed against the occurrences already stored, so a run
+    that changes nothing writes nothing. Otherwise it issues one INSERT of
+    missing days and one INSERT, UPDATE and DELETE of events each, all in
+    one transaction; expansions are serialized, so the counts returned are
+    rows actually written. Occurrences edited by hand after their rule was
+    last saved keep their edits. Occurrences before ``start`` are never
+    touched.
+    """
+    start = start or timezone.localdate()
+    end = end or start + dt.timedelta(days=settings.SCHEDULE_RECURRENCE_HORIZON_DAYS)
+    rules = list(ScheduleRecurrence.objects.all() if rules is None else rules)
+    now = timezone.now()
+
+    wanted = {}
+    for rule in rules:
+        if rule.is_active:
+            for date in rule.occurrences(start, end):
+                wanted[rule.pk, date] = rule
+
+    with transaction.atomic():
+        # One expansion at a time, so the stored occurrences read below stay
+        # accurate and every INSERT really creates its row.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [EXPANSION_LOCK])
+        existing = {
+            (row["recurrence_id"], row["day__date"]): row
+            for row in ScheduleEvent.objects.filter(
+                recurrence__in=[rule.pk for rule in rules],
+                day__date__range=(start, end),
+            ).values("pk", "recurrence_id", "day__date", "booked", "updated_at", *OCCURRENCE_FIELDS)
+        }
+
+        missing = [key for key in wanted if key not in existing]
+        day_ids = {}
+        if missing:
+            dates = sorted({date for _, date in missing})
+            ScheduleDay.objects.bulk_create([ScheduleDay(date=date) for date in dates], ignore_conflicts=True)
+            day_ids = dict(ScheduleDay.objects.filter(date__in=dates).values_list("date", "id"))
+        created = ScheduleEvent.objects.bulk_create(
+            [
+                ScheduleEvent(day_id=day_ids[date], recurrence=rule, **_occurrence_values(rule))
+                for (_, date), rule in ((key, wanted[key]) for key in missing)
+            ]
+        )
+
+        changed = []
+        for key, row in existing.items():
+            rule = wanted.get(key)
+            if rule is None or rule.updated_at <= row["updated_at"]:
+                continue
+            values = _occurrence_values(rule, row["booked"])
+            if any(row[field] != value for field, value in values.items()):
+                changed.append(ScheduleEvent(pk=row["pk"], updated_at=now, **values))
+        ScheduleEvent.objects.bulk_update(changed, [*OCCURRENCE_FIELDS, "updated_at"])
+
+        stale = [row for key, row in existing.items() if key not in wanted]
+        removable = [row["pk"] for row in stale if not row["booked"]]
+        if removable:
+            ScheduleEvent.objects.filter(pk__in=removable).delete()
+
+        if created or changed:
+            # Bulk writes send no signals; bump the schedule namespace like core.signals does.
+            ContentGeneration.bump("schedule")
+            invalidate_on_commit("schedule")
+
+    return ExpansionResult(len(created), len(changed), len(removable), len(stale) - len(removable))
+
+
+def expand_saved_recurrence(sender, instance, raw=False, **kwargs):
+    """post_save: bring the occurrences of an edited rule up to date."""
+    if not raw:
+        expand_recurrences([instance])
@@ -0,0 +1,298 @@
+import base64
+import io
+import logging
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management.base import CommandError
+from django.db import models
+from PIL import Image, ImageFilter, features
+
+from .models import ImageJob, MediaBlob
+
+logger = logging.getLogger(__name__)
+
+# Pillow format name and MIME type per rendition format.
+RENDITION_FORMATS = {
+    "avif": ("AVIF", "image/avif"),
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+
+# Longest side of the blurred inline placeholder.
+LQIP_SIZE = 20
+
+
+def meta_field_name(field_name):
+    return f"{field_name}_meta"
+
+
+def width_field_name(field_name):
+    return f"{field_name}_width"
+
+
+def height_field_name(field_name):
+    return f"{field_name}_height"
+
+
+def rendition_fields(model):
+    """Names of the ImageFields of ``model`` that have a ``<name>_meta`` JSONField."""
+    names = {field.name for field in model._meta.concrete_fields}
+    return [
+        field.name
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.ImageField) and meta_field_name(field.name) in names
+    ]
+
+
+def rendition_models(labels=()):
+    """Models with rendition image fields: all of them, or those named ``app_label.Model`` in ``labels``."""
+    if not labels:
+        return [model for model in apps.get_models() if rendition_fields(model)]
+    selected = []
+    for label in labels:
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError) as exc:
+            raise CommandError(f"Unknown model: {label}") from exc
+        if not rendition_fields(model):
+            raise CommandError(f"{label} has no image fields with renditions.")
+        selected.append(model)
+    return selected
+
+
+def known_image_info(name):
+    """``(meta, width, height)`` already built for the file ``name``, or ``None``.
+
+    With content-addressed storage every copy of an image shares one name,
+    so its info and renditions are built once, kept on its ``MediaBlob`` and
+    reused.
+    """
+    row = (
+        MediaBlob.objects.filter(name=name, image_meta__has_key="renditions")
+        .values_list("image_meta", "width", "height")
+        .first()
+    )
+    if row is None:
+        return None
+    meta, width, height = row
+    return {"source": name, **meta}, width, height
+
+
+def rendition_names(meta):
+    """Stored names of the renditions listed in an image meta dict."""
+    return [name for items in meta.get("renditions", {}).values() for _, name in items]
+
+
+def remember_image_info(meta, width, height):
+    """Keep complete image info on the blob of ``meta["source"]`` for ``known_image_info``."""
+    if "renditions" not in meta or meta.get("pending"):
+        return
+    shared = {key: value for key, value in meta.items() if key != "source"}
+    MediaBlob.objects.filter(name=meta["source"]).update(image_meta=shared, width=width, height=height)
+
+
+def rendition_formats():
+    formats = []
+    for fmt in settings.IMAGE_RENDITION_FORMATS:
+        if fmt == "avif" and not features.check("avif"):
+            fmt = "jpeg"
+        if fmt in RENDITION_FORMATS and fmt not in formats:
+            formats.append(fmt)
+    return formats
+
+
+def rendition_name(name, width, fmt):
+    """``articles/cover.jpg`` -> ``articles/cover.640w.webp``, the name requested from storage.
+
+    ``ContentAddressedStorage`` keeps only the extension and stores the file
+    under ``blobs/`` by content hash; meta records the name it returns.
+    """
+    path = PurePosixPath(name)
+    return str(path.with_name(f"{path.stem}.{width}w.{fmt}"))
+
+
+def rendition_widths(original_width):
+    widths = sorted({min(width, original_width) for width in settings.IMAGE_RENDITION_WIDTHS})
+    return widths or [original_width]
+
+
+def _encode(image, fmt):
+    pillow_format = RENDITION_FORMATS[fmt][0]
+    if fmt == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, pillow_format, quality=settings.IMAGE_RENDITION_QUALITY)
+    return buffer.getvalue()
+
+
+def read_image_info(storage, name):
+    """Size, dominant color and a ~20px blurred placeholder of the image ``name``.
+
+    The size comes from the header; pixels are decoded in draft mode, which
+    lets JPEG decode at a fraction of the full resolution.
+    """
+    with storage.open(name, "rb") as source, Image.open(source) as image:
+        width, height = image.size
+        image.draft("RGB", (LQIP_SIZE * 8, LQIP_SIZE * 8))
+        small = image.convert("RGB")
+        small.thumbnail((LQIP_SIZE * 4, LQIP_SIZE * 4))
+
+    quantized = small.quantize(colors=4)
+    _, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3 : index * 3 + 3]
+
+    placeholder = small.copy()
+    placeholder.thumbnail((LQIP_SIZE, LQIP_SIZE))
+    buffer = io.BytesIO()
+    placeholder.filter(ImageFilter.GaussianBlur(1)).save(buffer, "WEBP", quality=40)
+    return {
+        "width": width,
+        "height": height,
+        "color": f"#{red:02x}{green:02x}{blue:02x}",
+        "lqip": "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii"),
+    }
+
+
+def build_renditions(storage, name):
+    """Write every configured width and format of the image ``name``; return ``{format: [[width, name], ...]}``.
+
+    Widths wider than the original are clamped to it, so small images get a
+    single rendition per format instead of upscaled copies. The names are
+    the ones storage returns, i.e. ``blobs/ab/cd/<hash>.webp`` shared by
+    every object whose image renders to the same bytes.
+    """
+    with storage.open(name, "rb") as source, Image.open(source) as original:
+        original.load()
+        if original.mode not in ("RGB", "RGBA"):
+            original = original.convert("RGBA" if "A" in original.getbands() else "RGB")
+
+        renditions = {}
+        for width in rendition_widths(original.width):
+            height = max(round(original.height * width / original.width), 1)
+            resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+            for fmt in rendition_formats():
+                target = storage.save(rendition_name(name, width, fmt), ContentFile(_encode(resized, fmt)))
+                renditions.setdefault(fmt, []).append([width, target])
+
+    # Sorted like jsonb orders the keys, so fresh and reloaded meta agree.
+    return dict(sorted(renditions.items()))
+
+
+def set_image_info(instance, field_name, meta, width=None, height=None):
+    """Assign meta and size of one image field; return the names of the fields written."""
+    names = [meta_field_name(field_name), width_field_name(field_name), height_field_name(field_name)]
+    for name, value in zip(names, (meta, width, height)):
+        setattr(instance, name, value)
+    return names
+
+
+def refresh_renditions(instance, force=False, queue=False):
+    """Bring the image info of ``instance`` up to date in memory; return the changed field names.
+
+    Info is stale when it was computed for a different file name. Info built
+    for the same file by another object is copied. Otherwise size, color and
+    placeholder are read right away (a cheap reduced decode); renditions are
+    rendered too, or with ``queue`` marked pending and handed to
+    ``process_images`` through ``ImageJob`` rows. A file that cannot be read
+    is recorded without info so saves do not retry it.
+    """
+    changed = []
+    jobs = []
+    for field_name in rendition_fields(type(instance)):
+        field_file = getattr(instance, field_name)
+        meta = getattr(instance, meta_field_name(field_name)) or {}
+        if not field_file:
+            if meta or getattr(instance, width_field_name(field_name)) is not None:
+                changed += set_image_info(instance, field_name, {})
+            continue
+        if not force and meta.get("source") == field_file.name:
+            continue
+
+        name = field_file.name
+        known = known_image_info(name)
+        # Touched so collect_media does not take reused renditions for old orphans.
+        if known is not None and all(field_file.storage.touch(rendition) for rendition in rendition_names(known[0])):
+            changed += set_image_info(instance, field_name, *known)
+            continue
+        try:
+            info = read_image_info(field_file.storage, name)
+            if not queue:
+                info["renditions"] = build_renditions(field_file.storage, name)
+        except (OSError, Image.DecompressionBombError, SyntaxError) as exc:
+            logger.warning("Cannot read image %s: %s", name, exc)
+            changed += set_image_info(instance, field_name, {"source": name})
+            continue
+
+        width, height = info.pop("width"), info.pop("height")
+        meta = {"source": name, **info}
+        remember_image_info(meta, width, height)
+        if queue:
+            meta["pending"] = True
+            jobs.append(
+                ImageJob(
+                    model=instance._meta.label,
+                    object_id=instance.pk,
+                    field_name=field_name,
+                    source=name,
+                )
+            )
+        changed += set_image_info(instance, field_name, meta, width, height)
+
+    queue_image_jobs(jobs)
+    return changed
+
+
+def queue_image_jobs(jobs):
+    """Insert ``ImageJob`` rows, replacing the queued job of the same object field."""
+    if jobs:
+        ImageJob.objects.bulk_create(
+            jobs,
+            update_conflicts=True,
+            unique_fields=["model", "object_id", "field_name"],
+            update_fields=["source", "status", "attempts", "error", "updated_at"],
+        )
+
+
+def update_renditions_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    changed = refresh_renditions(instance, queue=not settings.IMAGE_RENDITIONS_INLINE)
+    if changed:
+        # update() keeps this from re-entering post_save; the save that got
+        # here has already invalidated cached responses.
+        sender._default_manager.filter(pk=instance.pk).update(
+            **{name: getattr(instance, name) for name in changed}
+        )
+
+
+def srcset(renditions, resolver):
+    """``{mime: "<url> 320w, <url> 640w"}`` for stored renditions, or ``None``."""
+    if not renditions:
+        return None
+    return {
+        RENDITION_FORMATS[fmt][1]: ", ".join(f"{resolver.url(name)} {width}w" for width, name in items)
+        for fmt, items in renditions.items()
+    }
+
+
+def image_info(meta, width, height, resolver):
+    """Serialized image info, or ``None`` if nothing is known about the image yet.
+
+    ``srcset`` is ``None`` until renditions are built (e.g. while a job is
+    pending), which tells clients to use the original image URL.
+    """
+    meta = meta or {}
+    sources = srcset(meta.get("renditions"), resolver)
+    if width is None and sources is None:
+        return None
+    return {
+        "width": width,
+        "height": height,
+        "color": meta.get("color"),
+        "lqip": meta.get("lqip"),
+        "srcset": sources,
+    }
@@ -0,0 +1,244 @@
+import calendar
+import datetime as dt
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+MONTH_LABELS = [
+    "Январь",
+    "Февраль",
+    "Март",
+    "Апрель",
+    "Май",
+    "Июнь",
+    "Июль",
+    "Август",
+    "Сентябрь",
+    "Октябрь",
+    "Ноябрь",
+    "Декабрь",
+]
+
+WEEKDAY_LABELS = [
+    "Понедельник",
+    "Вторник",
+    "Среда",
+    "Четверг",
+    "Пятница",
+    "Суббота",
+    "Воскресенье",
+]
+
+
+def month_end(date):
+    return date.replace(day=calendar.monthrange(date.year, date.month)[1])
+
+
+def add_months(date, months):
+    index = date.month - 1 + months
+    year, month = date.year + index // 12, index % 12 + 1
+    return date.replace(year=year, month=month, day=min(date.day, calendar.monthrange(year, month)[1]))
+
+
+def _parse_day(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        value = parse_date(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError({name: "Ожидается дата в формате YYYY-MM-DD."})
+    return value
+
+
+def _parse_month(raw):
+    try:
+        year, month = map(int, raw.split("-"))
+        return dt.date(year, month, 1)
+    except ValueError:
+        raise ValidationError({"month": "Ожидается месяц в формате YYYY-MM."}) from None
+
+
+def get_schedule_window(params):
+    """Resolve ``?month=``, ``?from=`` and ``?to=`` into an inclusive date range.
+
+    Without parameters the window starts today and runs to the end of the
+    month ``SCHEDULE_WINDOW_MONTHS - 1`` months ahead.
+    """
+    if params.get("month"):
+        start = _parse_month(params["month"])
+        return start, month_end(start)
+
+    today = timezone.localdate()
+    start = _parse_day(params, "from") or today
+    end = _parse_day(params, "to")
+    if end is None:
+        end = month_end(add_months(start, max(settings.SCHEDULE_WINDOW_MONTHS, 1) - 1))
+
+    if end < start:
+        raise ValidationError({"to": "Дата окончания раньше даты начала."})
+    if (end - start).days >= settings.SCHEDULE_MAX_WINDOW_DAYS:
+        raise ValidationError({"to": f"Окно не может превышать {settings.SCHEDULE_MAX_WINDOW_DAYS} дней."})
+    return start, end
+
+
+def group_days_by_month(day_items):
+    grouped = {}
+    ordered_keys = []
+
+    for day in day_items:
+        date_raw = day.get("date", "")
+        year, month, _ = map(int, date_raw.split("-"))
+        key = (year, month)
+        if key not in grouped:
+            ordered_keys.append(key)
+            grouped[key] = {
+                "month": f"{MONTH_LABELS[month - 1]} {year}",
+                "year": year,
+                "month_number": month,
+                "days": [],
+            }
+        grouped[key]["days"].append(day)
+
+    return [grouped[key] for key in ordered_keys]
+
+
+def _media_uri_sql(name):
+    """SQL quoting the media name ``name`` like ``filepath_to_uri``.
+
+    Names made only of URL-safe characters (every blob name) are used as
+    they are; otherwise each other character becomes its %XX UTF-8 bytes.
+    """
+    return f"""CASE
+        WHEN {name} ~ '^[A-Za-z0-9/_.~!*()''-]*$' THEN {name}
+        ELSE (
+            SELECT string_agg(
+                CASE
+                    WHEN c.ch ~ '[A-Za-z0-9/_.~!*()''-]' THEN c.ch
+                    ELSE regexp_replace(upper(encode(convert_to(c.ch, 'UTF8'), 'hex')), '(..)', '%%\\1', 'g')
+                END,
+                '' ORDER BY c.i
+            )
+            FROM regexp_split_to_table({name}, '') WITH ORDINALITY AS c(ch, i)
+        )
+    END"""
+
+
+# Builds the same month -> day -> events structure as ScheduleViewSet.list in
+# one statement. json_build_object keeps key order; events are ordered like
+# ScheduleEvent.Meta.ordering.
+SCHEDULE_JSON_SQL = (
+    """
+WITH day_items AS (
+    SELECT
+        d.date,
+        json_build_object(
+            'date', to_char(d.date, 'YYYY-MM-DD'),
+            'weekday', (%(weekdays)s::text[])[EXTRACT(ISODOW FROM d.date)::int],
+            'events', COALESCE(
+                (
+                    SELECT json_agg(
+                        json_build_object(
+                            'id', e.id,
+                            'time_start', to_char(e.time_start, 'HH24:MI'),
+                            'time_end', to_char(e.time_end, 'HH24:MI'),
+                            'title', e.title,
+                            'category', e.category,
+                            'description', e.description,
+                            'price', e.price,
+                            'capacity', e.capacity,
+                            'seats_left', CASE
+                                WHEN e.capacity IS NOT NULL THEN GREATEST(e.capacity - e.booked, 0)
+                            END,
+                            'color', e.color,
+                            'image', CASE
+                                WHEN e.image IS NULL OR e.image = '' THEN NULL
+                                ELSE %(media_prefix)s || {image_uri}
+                            END,
+                            'image_meta', CASE
+                                WHEN e.image_width IS NOT NULL OR e.image_meta -> 'renditions' <> '{}'::jsonb
+                                THEN json_build_object(
+                                    'width', e.image_width,
+                                    'height', e.image_height,
+                                    'color', e.image_meta ->> 'color',
+                                    'lqip', e.image_meta ->> 'lqip',
+                                    'srcset',
+                                    (
+                                        SELECT json_object_agg(
+                                            'image/' || f.fmt,
+                                            (
+                                                SELECT string_agg(
+                                                    %(media_prefix)s || {rendition_uri} || ' ' || (r.item ->> 0) || 'w',
+                                                    ', ' ORDER BY r.ord
+                                                )
+                                                FROM jsonb_array_elements(f.items) WITH ORDINALITY AS r(item, ord)
+                                            )
+                                            ORDER BY f.ord
+                                        )
+                                        FROM jsonb_each(e.image_meta -> 'renditions') WITH ORDINALITY AS f(fmt, items, ord)
+                                    )
+                                )
+                            END
+                        )
+                        ORDER BY e.time_start, e."order", e.id
+                    )
+                    FROM core_scheduleevent e
+                    WHERE e.day_id = d.id
+                ),
+                '[]'::json
+            )
+        ) AS item
+    FROM core_scheduleday d
+    WHERE d.is_published AND d.date BETWEEN %(start)s AND %(end)s
+),
+months AS (
+    SELECT
+        EXTRACT(YEAR FROM date)::int AS year,
+        EXTRACT(MONTH FROM date)::int AS month_number,
+        json_agg(item ORDER BY date) AS days
+    FROM day_items
+    GROUP BY 1, 2
+)
+SELECT COALESCE(
+    json_agg(
+        json_build_object(
+            'month', (%(months)s::text[])[month_number] || ' ' || year,
+            'year', year,
+            'month_number', month_number,
+            'days', days
+        )
+        ORDER BY year, month_number
+    ),
+    '[]'::json
+)::text
+FROM months
+"""
+    .replace("{image_uri}", _media_uri_sql("e.image"))
+    .replace("{rendition_uri}", _media_uri_sql("(r.item ->> 1)"))
+)
+
+
+def render_schedule_json(start, end, media_prefix):
+    """Return the grouped schedule for ``start``..``end`` as a JSON string built by PostgreSQL.
+
+    Image names are appended to ``media_prefix`` quoted like
+    ``MediaURLResolver.url`` does, so legacy names with spaces or Cyrillic
+    letters get the same URLs as on the serializer path.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SCHEDULE_JSON_SQL,
+            {
+                "start": start,
+                "end": end,
+                "media_prefix": media_prefix,
+                "weekdays": WEEKDAY_LABELS,
+                "months": MONTH_LABELS,
+            },
+        )
+        return cursor.fetchone()[0]
@@ -0,0 +1,115 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import CharField, F, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+from pages.models import PageSection
+
+from .models import Article, News, Service
+
+SEARCH_CONFIG = "russian"
+# ts_headline does not escape its input, so fragments are marked with control
+# characters and turned into <mark> only after HTML-escaping.
+START_SEL, STOP_SEL = "\x02", "\x03"
+
+NEWS_TEXT_SQL = """
+    core_news.description || ' ' || CASE
+        WHEN jsonb_typeof(core_news.content) = 'array'
+        THEN array_to_string(ARRAY(SELECT jsonb_array_elements_text(core_news.content)), ' ')
+        ELSE core_news.content #>> '{}'
+    END
+"""
+
+# kind -> (searchable queryset, title, slug, section, headline source)
+SEARCH_SOURCES = {
+    "article": (
+        Article.objects.filter(is_published=True),
+        "title",
+        "slug",
+        None,
+        F("content"),
+    ),
+    "news": (
+        News.objects.filter(is_published=True),
+        "title",
+        "slug",
+        None,
+        RawSQL(NEWS_TEXT_SQL, (), output_field=CharField()),
+    ),
+    "page": (
+        PageSection.objects.filter(page__is_published=True),
+        "page__title",
+        "page__slug",
+        "title",
+        F("text"),
+    ),
+    "service": (
+        Service.objects.filter(is_active=True),
+        "title",
+        "slug",
+        None,
+        F("description"),
+    ),
+}
+
+
+def _snippet(headline):
+    return escape(headline or "").replace(START_SEL, "<mark>").replace(STOP_SEL, "</mark>")
+
+
+def search_content(text, limit=20):
+    """Rank articles, news, page sections and services for ``text``.
+
+    Matching and ranking run in one UNION query over the GIN-indexed
+    ``search_vector`` columns; highlighted snippets are then built only for
+    the returned rows, with one query per content type present.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    ranked = [
+        queryset.filter(search_vector=query)
+        .annotate(
+            kind=Value(kind, output_field=CharField()),
+            rank=SearchRank(F("search_vector"), query),
+        )
+        .values("pk", "kind", "rank")
+        for kind, (queryset, *_) in SEARCH_SOURCES.items()
+    ]
+    top = list(ranked[0].union(*ranked[1:], all=True).order_by("-rank", "kind", "pk")[:limit])
+
+    ids_by_kind = {}
+    for row in top:
+        ids_by_kind.setdefault(row["kind"], []).append(row["pk"])
+
+    details = {}
+    for kind, ids in ids_by_kind.items():
+        queryset, title, slug, section, source = SEARCH_SOURCES[kind]
+        rows = (
+            queryset.filter(pk__in=ids)
+            .annotate(
+                snippet=SearchHeadline(
+                    source,
+                    query,
+                    config=SEARCH_CONFIG,
+                    start_sel=START_SEL,
+                    stop_sel=STOP_SEL,
+                    max_words=30,
+                    min_words=12,
+                    max_fragments=2,
+                )
+            )
+            .values_list("pk", title, slug, section or title, "snippet")
+        )
+        for pk, title_value, slug_value, section_value, snippet in rows:
+            details[(kind, pk)] = {
+                "type": kind,
+                "title": title_value,
+                "slug": slug_value,
+                "section": section_value if section else None,
+                "snippet": _snippet(snippet),
+            }
+
+    return [
+        {**details[(row["kind"], row["pk"])], "rank": round(row["rank"], 6)}
+        for row in top
+        if (row["kind"], row["pk"]) in details
+    ]
@@ -1,5 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 
+from .fast_serializers import CompiledSerializer
+from .media import ImageMetaField, MediaURLField
 from .models import (
     Article,
     HeroBlock,
@@ -7,53 +10,62 @@ from .models import (
     Review,
     ScheduleDay,
     ScheduleEvent,
+    SeatHold,
     Service,
     Tariff,
+    seats_left,
 )
+from .schedule import WEEKDAY_LABELS
 
 
 class HeroBlockSerializer(serializers.ModelSerializer):
-    background_image = serializers.SerializerMethodField()
-    avatar = serializers.SerializerMethodField()
+    background_image = MediaURLField()
+    background_image_meta = ImageMetaField("background_image")
+    avatar = MediaURLField()
+    avatar_meta = ImageMetaField("avatar")
 
     class Meta:
         model = HeroBlock
-        fields = ("id", "title", "description", "background_image", "avatar")
-
-    def _absolute_url(self, media_field):
-        if not media_field:
-            return None
-        request = self.context.get("request")
-        if request is None:
-            return media_field.url
-        return request.build_absolute_uri(media_field.url)
-
-    def get_background_image(self, obj):
-        return self._absolute_url(obj.background_image)
-
-    def get_avatar(self, obj):
-        return self._absolute_url(obj.avatar)
+        fields = (
+            "id",
+            "title",
+            "description",
+            "background_image",
+            "background_image_meta",
+            "avatar",
+            "avatar_meta",
+        )
 
 
 class ReviewSerializer(serializers.ModelSerializer):
+    avatar = MediaURLField()
+    avatar_meta = ImageMetaField("avatar")
+
     class Meta:
         model = Review
-        fields = "__all__"
+        exclude = ("updated_at",)
 
 
 class ArticleSerializer(serializers.ModelSerializer):
+    preview_image = MediaURLField()
+    preview_image_meta = ImageMetaField("preview_image")
+
     class Meta:
         model = Article
-        fields = "__all__"
+        exclude = ("updated_at", "search_vector")
 
 
 class ArticleListSerializer(serializers.ModelSerializer):
+    preview_image = MediaURLField()
+    preview_image_meta = ImageMetaField("preview_image")
+
     class Meta:
         model = Article
         fields = (
             "title",
             "slug",
             "preview_image",
+            "preview_image_meta",
             "preview_description",
             "content_type",
             "published_date",
@@ -62,15 +74,21 @@ class ArticleListSerializer(serializers.ModelSerializer):
 
 
 class NewsSerializer(serializers.ModelSerializer):
+    image = MediaURLField()
+    image_meta = ImageMetaField("image")
+
     class Meta:
         model = News
-        fields = "__all__"
+        exclude = ("updated_at", "search_vector")
 
 
 class NewsListSerializer(serializers.ModelSerializer):
+    image = MediaURLField()
+    image_meta = ImageMetaField("image")
+
     class Meta:
         model = News
-        fields = ("id", "title", "slug", "description", "image", "published_date")
+        fields = ("id", "title", "slug", "description", "image", "image_meta", "published_date")
 
 
 class TariffSerializer(serializers.ModelSerializer):
@@ -81,7 +99,7 @@ class TariffSerializer(serializers.ModelSerializer):
 
 class ServiceSerializer(serializers.ModelSerializer):
     children = serializers.SerializerMethodField()
-    tariffs = TariffSerializer(many=True, read_only=True)
+    tariffs = TariffSerializer(many=True, read_only=True, source="tree_tariffs")
 
     class Meta:
         model = Service
@@ -97,14 +115,30 @@ class ServiceSerializer(serializers.ModelSerializer):
         )
 
     def get_children(self, obj):
-        children = obj.children.all().order_by("order")
-        return ServiceSerializer(children, many=True, context=self.context).data
+        return ServiceSerializer(obj.tree_children, many=True, context=self.context).data
+
+
+class ServiceFlatSerializer(ServiceSerializer):
+    class Meta:
+        model = Service
+        fields = (
+            "id",
+            "parent",
+            "title",
+            "slug",
+            "description",
+            "is_category",
+            "order",
+            "tariffs",
+        )
 
 
 class ScheduleEventSerializer(serializers.ModelSerializer):
     time_start = serializers.TimeField(format="%H:%M")
     time_end = serializers.TimeField(format="%H:%M")
-    image = serializers.SerializerMethodField()
+    image = MediaURLField(absolute_only=True)
+    image_meta = ImageMetaField("image")
+    seats_left = serializers.SerializerMethodField()
 
     class Meta:
         model = ScheduleEvent
@@ -116,15 +150,25 @@ class ScheduleEventSerializer(serializers.ModelSerializer):
             "category",
             "description",
             "price",
+            "capacity",
+            "seats_left",
             "color",
             "image",
+            "image_meta",
         )
 
-    def get_image(self, obj):
-        request = self.context.get("request")
-        if obj.image and request:
-            return request.build_absolute_uri(obj.image.url)
-        return None
+    def get_seats_left(self, obj):
+        return obj.seats_left
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    seats = serializers.IntegerField(min_value=1, max_value=settings.SEAT_HOLD_MAX_SEATS)
+    seats_left = serializers.IntegerField(source="event.seats_left", read_only=True, allow_null=True)
+
+    class Meta:
+        model = SeatHold
+        fields = ("token", "event", "seats", "expires_at", "seats_left")
+        read_only_fields = ("event", "expires_at")
 
 
 class ScheduleDaySerializer(serializers.ModelSerializer):
@@ -136,13 +180,24 @@ class ScheduleDaySerializer(serializers.ModelSerializer):
         fields = ("date", "weekday", "events")
 
     def get_weekday(self, obj):
-        weekdays = [
-            "Понедельник",
-            "Вторник",
-            "Среда",
-            "Четверг",
-            "Пятница",
-            "Суббота",
-            "Воскресенье",
-        ]
-        return weekdays[obj.date.weekday()]
+        return WEEKDAY_LABELS[obj.date.weekday()]
+
+
+# Compiled read paths for the hot list endpoints (see core.fast_serializers).
+REVIEW_ROWS = CompiledSerializer(ReviewSerializer)
+ARTICLE_LIST_ROWS = CompiledSerializer(ArticleListSerializer)
+NEWS_LIST_ROWS = CompiledSerializer(NewsListSerializer)
+TARIFF_ROWS = CompiledSerializer(TariffSerializer)
+SERVICE_ROWS = CompiledSerializer(ServiceSerializer, overrides={"children": None, "tariffs": None})
+SERVICE_FLAT_ROWS = CompiledSerializer(ServiceFlatSerializer, overrides={"tariffs": None})
+SCHEDULE_EVENT_ROWS = CompiledSerializer(
+    ScheduleEventSerializer,
+    overrides={"seats_left": (("capacity", "booked"), lambda request: seats_left)},
+)
+SCHEDULE_DAY_ROWS = CompiledSerializer(
+    ScheduleDaySerializer,
+    overrides={
+        "weekday": ("date", lambda request: lambda date: WEEKDAY_LABELS[date.weekday()]),
+        "events": None,
+    },
+)
@@ -0,0 +1,156 @@
+from typing import NamedTuple
+
+from django.db import transaction
+
+from .models import Service, Tariff
+from .seeding import touch
+
+SERVICE_FIELDS = ("title", "description", "is_category", "order")
+TARIFF_FIELDS = ("title", "description", "duration", "price", "order")
+
+
+class Changes(NamedTuple):
+    created: int
+    updated: int
+    deleted: int
+    unchanged: int
+
+    def __str__(self):
+        return f"{self.created} created, {self.updated} updated, {self.deleted} deleted, {self.unchanged} unchanged"
+
+
+class ImportSummary(NamedTuple):
+    services: Changes
+    tariffs: Changes
+
+    @property
+    def has_changes(self):
+        return any(changes.created or changes.updated or changes.deleted for changes in self)
+
+
+def read_service_tree(items, scale=1):
+    """Flatten seed items into ``{slug: (depth, parent_slug, fields)}`` and ``{(service_slug, slug): fields}``.
+
+    Copies after the first (``scale`` > 1) get numbered slugs and titles.
+    """
+    services, tariffs = {}, {}
+
+    def walk(items, parent_slug, depth, slug_suffix, title_suffix):
+        for item in items:
+            slug = item.get("slug", "") + slug_suffix
+            if slug in services:
+                raise ValueError(f"Duplicate service slug {slug!r}.")
+            services[slug] = (
+                depth,
+                parent_slug,
+                {
+                    "title": item.get("title", "") + title_suffix,
+                    "description": item.get("description", ""),
+                    "is_category": bool(item.get("is_category", False)),
+                    "order": int(item.get("order", 0) or 0),
+                },
+            )
+            for tariff in item.get("tariffs", []) or []:
+                key = (slug, tariff.get("slug", ""))
+                if key in tariffs:
+                    raise ValueError(f"Duplicate tariff slug {key[1]!r} in service {slug!r}.")
+                tariffs[key] = {
+                    "title": tariff.get("title", ""),
+                    "description": tariff.get("description", ""),
+                    "duration": tariff.get("duration", ""),
+                    "price": int(tariff.get("price", 0) or 0),
+                    "order": int(tariff.get("order", 0) or 0),
+                }
+            walk(item.get("children", []) or [], slug, depth + 1, slug_suffix, title_suffix)
+
+    for copy in range(scale):
+        walk(items, None, 0, f"-{copy + 1}" if copy else "", f" {copy + 1}" if copy else "")
+    return services, tariffs
+
+
+def _differs(row, fields):
+    return any(row[name] != value for name, value in fields.items())
+
+
+def import_services(services, tariffs, dry_run=False):
+    """Bring the Service/Tariff tables in line with a flattened tree, matching rows by slug.
+
+    Only new and changed rows are written: one upsert per tree level for
+    services, one for tariffs, and deletes for rows missing from the tree.
+    Primary keys of kept rows never change, so schedule events keep their
+    service. An unchanged tree costs two SELECTs and no writes.
+    """
+    existing = {row["slug"]: row for row in Service.objects.values("id", "slug", "parent_id", *SERVICE_FIELDS)}
+    slug_by_id = {row["id"]: slug for slug, row in existing.items()}
+    ids = {slug: row["id"] for slug, row in existing.items()}
+    existing_tariffs = {
+        (slug_by_id[row["service_id"]], row["slug"]): row
+        for row in Tariff.objects.values("id", "service_id", "slug", *TARIFF_FIELDS)
+    }
+
+    levels = {}
+    for slug, (depth, parent_slug, fields) in services.items():
+        row = existing.get(slug)
+        if row is None or _differs(row, fields) or slug_by_id.get(row["parent_id"]) != parent_slug:
+            levels.setdefault(depth, []).append(slug)
+    changed_services = [slug for level in levels.values() for slug in level]
+    stale_services = [slug for slug in existing if slug not in services]
+
+    changed_tariffs = [
+        key for key, fields in tariffs.items() if key not in existing_tariffs or _differs(existing_tariffs[key], fields)
+    ]
+    # Tariffs of deleted services go with them.
+    stale_tariffs = {key: row for key, row in existing_tariffs.items() if key not in tariffs and key[0] in services}
+
+    created_services = sum(slug not in existing for slug in changed_services)
+    created_tariffs = sum(key not in existing_tariffs for key in changed_tariffs)
+    summary = ImportSummary(
+        Changes(
+            created_services,
+            len(changed_services) - created_services,
+            len(stale_services),
+            len(services) - len(changed_services),
+        ),
+        Changes(
+            created_tariffs,
+            len(changed_tariffs) - created_tariffs,
+            len(stale_tariffs),
+            len(tariffs) - len(changed_tariffs),
+        ),
+    )
+    if dry_run or not summary.has_changes:
+        return summary
+
+    with transaction.atomic():
+        # Parents first, so every level can point at ids of the one above.
+        for depth in sorted(levels):
+            rows = Service.objects.bulk_create(
+                [
+                    Service(slug=slug, parent_id=ids.get(services[slug][1]), **services[slug][2])
+                    for slug in levels[depth]
+                ],
+                update_conflicts=True,
+                unique_fields=["slug"],
+                update_fields=[*SERVICE_FIELDS, "parent", "updated_at"],
+            )
+            ids.update((row.slug, row.pk) for row in rows)
+        # After re-parenting, so no kept service is deleted with an old parent.
+        if stale_services:
+            Service.objects.filter(slug__in=stale_services).delete()
+
+        Tariff.objects.bulk_create(
+            [Tariff(service_id=ids[key[0]], slug=key[1], **tariffs[key]) for key in changed_tariffs],
+            update_conflicts=True,
+            unique_fields=["service", "slug"],
+            update_fields=list(TARIFF_FIELDS),
+        )
+        if stale_tariffs:
+            Tariff.objects.filter(pk__in=[row["id"] for row in stale_tariffs.values()]).delete()
+
+        # bulk_create skips Service.save() and the Tariff signals.
+        if levels:
+            Service.rebuild_paths()
+        if changed_tariffs:
+            Service.refresh_tariff_stats({ids[service_slug] for service_slug, _ in changed_tariffs})
+        touch("services")
+    return summary
@@ -0,0 +1,85 @@
+import threading
+from typing import NamedTuple
+
+from .cache import get_cache_versions
+from .models import Service, Tariff
+
+
+class ServiceSummary(NamedTuple):
+    id: int
+    title: str
+    slug: str
+    min_price: int | None
+
+
+class TariffPrice(NamedTuple):
+    service_title: str
+    tariff_title: str
+    price: int
+
+
+class VersionedIndex:
+    """In-process lookup table rebuilt when the "services" response-cache version moves.
+
+    ``core.signals`` bumps that version after every committed Service or
+    Tariff change, so between changes a lookup is one cache read.
+    Subclasses implement ``build()``.
+    """
+
+    namespace = "services"
+
+    def __init__(self):
+        self._version = None
+        self._table = {}
+        self._lock = threading.Lock()
+
+    def build(self):
+        raise NotImplementedError
+
+    def table(self):
+        version = get_cache_versions((self.namespace,))[self.namespace]
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._table = self.build()
+                    self._version = version
+        return self._table
+
+    def get(self, key):
+        return self.table().get(key)
+
+
+class ServiceIndex(VersionedIndex):
+    """``slug -> ServiceSummary`` table for pricing requests without queries."""
+
+    def build(self):
+        rows = Service.objects.values_list("id", "title", "slug", "min_price")
+        return {row[2]: ServiceSummary(*row) for row in rows}
+
+
+class TariffPriceIndex(VersionedIndex):
+    """``(service_slug, tariff_slug) -> TariffPrice`` table of active services."""
+
+    def build(self):
+        rows = Tariff.objects.filter(service__is_active=True).values_list(
+            "service__slug", "slug", "service__title", "title", "price"
+        )
+        return {(service_slug, slug): TariffPrice(*rest) for service_slug, slug, *rest in rows}
+
+
+service_index = ServiceIndex()
+tariff_prices = TariffPriceIndex()
+
+
+def remember_tariff_service(sender, instance, **kwargs):
+    """pre_save: note the service a tariff belonged to, in case it is moved."""
+    previous = None
+    if not instance._state.adding:
+        previous = Tariff.objects.filter(pk=instance.pk).values_list("service_id", flat=True).first()
+    instance._previous_service_id = previous
+
+
+def refresh_service_tariff_stats(sender, instance, **kwargs):
+    """post_save/post_delete: update min_price/tariff_count of the affected services."""
+    pks = {instance.service_id, instance.__dict__.pop("_previous_service_id", None)} - {None}
+    Service.refresh_tariff_stats(pks)
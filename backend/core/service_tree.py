@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+from .models import Service, Tariff
+
+
+def load_service_nodes(services=None, tariffs=None):
+    """Load services and their tariffs in two queries and link them in memory.
+
+    Every returned service carries ``tree_children`` and ``tree_tariffs``
+    lists, which ``ServiceSerializer`` reads instead of querying relations.
+    Nodes come back ordered by ``order``; children keep that order.
+    """
+    if services is None:
+        services = Service.objects.all()
+    if tariffs is None:
+        tariffs = Tariff.objects.filter(service__in=services.values("pk"))
+
+    nodes = list(services.order_by("order", "id"))
+    by_id = {node.pk: node for node in nodes}
+
+    tariffs_by_service = defaultdict(list)
+    for tariff in tariffs.order_by("order", "id"):
+        tariffs_by_service[tariff.service_id].append(tariff)
+
+    for node in nodes:
+        node.tree_children = []
+        node.tree_tariffs = tariffs_by_service.get(node.pk, [])
+
+    for node in nodes:
+        parent = by_id.get(node.parent_id)
+        if parent is not None:
+            parent.tree_children.append(node)
+
+    return nodes
+
+
+def build_service_tree(services=None, tariffs=None):
+    """Return the root nodes of ``services`` with children linked in memory.
+
+    Services whose parent is not part of ``services`` are treated as roots,
+    so passing a subtree returns its top node.
+    """
+    nodes = load_service_nodes(services, tariffs)
+    ids = {node.pk for node in nodes}
+    return [node for node in nodes if node.parent_id not in ids]
+
+
+def serialize_service_rows(services, service_rows, tariff_rows, request=None, roots_only=True):
+    """Compiled counterpart of ``build_service_tree``/``load_service_nodes``.
+
+    Returns serialized dicts straight from ``.values()`` rows of services and
+    tariffs (two queries), linking ``children`` in memory. ``service_rows``
+    and ``tariff_rows`` are ``CompiledSerializer`` instances.
+    """
+    serialize_tariff = tariff_rows.bind(request)
+    tariffs_by_service = defaultdict(list)
+    tariffs = Tariff.objects.filter(service__in=services.values("pk")).order_by("order", "id")
+    for row in tariff_rows.values(tariffs, "service"):
+        tariffs_by_service[row["service"]].append(serialize_tariff(row))
+
+    serialize_service = service_rows.bind(request)
+    rows = list(service_rows.values(services.order_by("order", "id"), "id", "parent"))
+    by_id = {}
+    for row in rows:
+        row["children"] = []
+        row["tariffs"] = tariffs_by_service.get(row["id"], [])
+        by_id[row["id"]] = row
+    items = [serialize_service(row) for row in rows]
+
+    for row, item in zip(rows, items):
+        parent = by_id.get(row["parent"])
+        if parent is not None:
+            parent["children"].append(item)
+
+    if not roots_only:
+        return items
+    return [item for row, item in zip(rows, items) if row["parent"] not in by_id]
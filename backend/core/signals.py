@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .cache import invalidate_on_commit
+from .ingest import ingest_uploaded_images
+from .models import (
+    Article,
+    ContentGeneration,
+    HeroBlock,
+    News,
+    Review,
+    ScheduleDay,
+    ScheduleEvent,
+    ScheduleRecurrence,
+    Service,
+    Tariff,
+)
+from .renditions import rendition_fields, update_renditions_on_save
+from .recurrence import expand_saved_recurrence
+from .service_index import refresh_service_tariff_stats, remember_tariff_service
+
+CACHE_NAMESPACES = {
+    HeroBlock: ("hero",),
+    Review: ("reviews",),
+    Article: ("articles",),
+    News: ("news",),
+    Service: ("services",),
+    Tariff: ("services",),
+    ScheduleDay: ("schedule",),
+    ScheduleEvent: ("schedule",),
+}
+
+
+# Models registered through ``connect_content_signals``, by every app.
+_content_namespaces = {}
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    namespaces = _content_namespaces[sender]
+    ContentGeneration.bump(*namespaces)
+    invalidate_on_commit(*namespaces)
+
+
+def connect_content_signals(namespaces_by_model):
+    """Wire ``{model: namespaces}`` to cache invalidation and, for image models, ingest and renditions."""
+    _content_namespaces.update(namespaces_by_model)
+    # Connected per model so unrelated models keep Django's fast-path deletes.
+    for model in namespaces_by_model:
+        label = model._meta.label
+        post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"cache-save-{label}")
+        post_delete.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"cache-delete-{label}")
+        if rendition_fields(model):
+            pre_save.connect(ingest_uploaded_images, sender=model, dispatch_uid=f"ingest-{label}")
+            post_save.connect(update_renditions_on_save, sender=model, dispatch_uid=f"renditions-{label}")
+
+
+connect_content_signals(CACHE_NAMESPACES)
+
+pre_save.connect(remember_tariff_service, sender=Tariff, dispatch_uid="tariff-stats-pre-save")
+post_save.connect(refresh_service_tariff_stats, sender=Tariff, dispatch_uid="tariff-stats-save")
+post_delete.connect(refresh_service_tariff_stats, sender=Tariff, dispatch_uid="tariff-stats-delete")
+
+post_save.connect(expand_saved_recurrence, sender=ScheduleRecurrence, dispatch_uid="recurrence-expand")
@@ -0,0 +1,85 @@
+import hashlib
+import os
+import re
+from pathlib import PurePosixPath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+
+# Shared namespace of content-addressed files, whatever field uploaded them.
+BLOB_DIR = "blobs/"
+# Blob names and the "<stem>.<12 hex digits><suffix>" names stored before
+# blobs: the name changes whenever the content does.
+HASHED_NAME = re.compile(r"(?:^|[./])[0-9a-f]{12,64}(\.[A-Za-z0-9]+)?$")
+# First key of the per-file advisory locks shared with collect_media.
+MEDIA_LOCK_CLASS = 0x6D656469
+
+
+def content_digest(content):
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def lock_media(name):
+    """Hold the advisory lock of the media file ``name`` until the current transaction ends.
+
+    ``collect_media`` only deletes a file whose lock it gets, so a file
+    being stored or reused is never removed under its writer.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s, hashtext(%s))", [MEDIA_LOCK_CLASS, name])
+
+
+def is_hashed_name(name):
+    return HASHED_NAME.search(name) is not None
+
+
+def blob_name(digest, suffix):
+    """``blobs/ab/cd/abcd…<32 hex>.jpg`` for a SHA-256 hex digest."""
+    return f"{BLOB_DIR}{digest[:2]}/{digest[2:4]}/{digest[:32]}{suffix.lower()}"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Store each distinct file once, named by the SHA-256 of its content.
+
+    The requested name only contributes its extension, so every field and
+    every rendition shares the ``blobs/`` namespace: uploading bytes that
+    are already stored writes nothing and returns the existing name. Each
+    stored blob gets a ``MediaBlob`` row.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = blob_name(content_digest(content), PurePosixPath(name).suffix)
+        # Inside a caller's transaction the lock is held until the object
+        # using the file is committed.
+        with transaction.atomic(savepoint=False):
+            # A reused blob gets a fresh mtime, so collect_media does not take
+            # it for an old orphan while the object using it is being saved.
+            if not self.touch(name):
+                name = super().save(name, content, max_length=max_length)
+            self.register_blob(name)
+        return name
+
+    def touch(self, name):
+        """Mark the stored file ``name`` as just used; return whether it exists."""
+        with transaction.atomic(savepoint=False):
+            lock_media(name)
+            try:
+                os.utime(self.path(name))
+            except FileNotFoundError:
+                return False
+        return True
+
+    def register_blob(self, name):
+        from .models import MediaBlob
+
+        MediaBlob.objects.get_or_create(name=name, defaults={"size": self.size(name)})
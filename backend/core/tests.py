@@ -1,3 +1,1533 @@
-from django.test import TestCase
+import datetime as dt
+import base64
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import ScopedRateThrottle
+
+from leads.models import Lead
+from pages.models import Page, PageSection
+
+from .media import MediaURLResolver, get_media_resolver
+from .booking import SoldOut, hold_seats, release_expired_holds
+from .image_jobs import read_info_job
+from .models import (
+    Article,
+    ContentGeneration,
+    ImageJob,
+    MediaBlob,
+    News,
+    Review,
+    ScheduleDay,
+    ScheduleEvent,
+    ScheduleRecurrence,
+    SeatHold,
+    Service,
+    Tariff,
+)
+from .recurrence import expand_recurrences
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer
+from .renditions import build_renditions
+from .storage import MEDIA_LOCK_CLASS
+from .serializers import (
+    REVIEW_ROWS,
+    SCHEDULE_EVENT_ROWS,
+    ArticleSerializer,
+    ReviewSerializer,
+    ScheduleEventSerializer,
+)
+
+
+class ContentTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Fixtures reference image files that do not exist; renditions are
+        # skipped for them with a warning.
+        cls.enterClassContext(patch.object(logging.getLogger("core.renditions"), "disabled", True))
+        super().setUpClass()
+
+    def setUp(self):
+        # Responses are cached across requests; start every test cold.
+        cache.clear()
+
+
+def make_service(slug, parent=None, order=0, **kwargs):
+    return Service.objects.create(
+        title=kwargs.pop("title", slug.title()),
+        slug=slug,
+        parent=parent,
+        order=order,
+        **kwargs,
+    )
+
+
+def make_tariff(service, slug, price, order=0):
+    return Tariff.objects.create(
+        service=service,
+        title=slug.title(),
+        slug=slug,
+        description=f"{slug} description",
+        duration="2 часа",
+        price=price,
+        order=order,
+    )
+
+
+class ServiceTreeTests(ContentTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        programs = make_service("programs", order=1, is_category=True, title="Программы")
+        excursions = make_service("excursions", order=0, is_category=True)
+        tea = make_service("tea", parent=programs, order=2, description="Чай")
+        breath = make_service("breath", parent=programs, order=1)
+        moose = make_service("moose", parent=excursions, order=0)
+        evening = make_service("evening", parent=moose, order=0)
+
+        make_tariff(tea, "solo", 3000, order=1)
+        make_tariff(tea, "group", 2500, order=0)
+        make_tariff(breath, "basic", 1800)
+        make_tariff(evening, "walk", 2400)
+        make_tariff(programs, "pass", 9000)
+
+    def reference_tree(self, service):
+        # Mirrors the recursive serializer the tree builder replaced.
+        return {
+            "id": service.id,
+            "title": service.title,
+            "slug": service.slug,
+            "description": service.description,
+            "is_category": service.is_category,
+            "order": service.order,
+            "children": [
+                self.reference_tree(child) for child in service.children.all().order_by("order")
+            ],
+            "tariffs": [
+                {
+                    "id": tariff.id,
+                    "title": tariff.title,
+                    "slug": tariff.slug,
+                    "description": tariff.description,
+                    "duration": tariff.duration,
+                    "price": tariff.price,
+                    "order": tariff.order,
+                }
+                for tariff in service.tariffs.all()
+            ],
+        }
+
+    def test_list_matches_recursive_output(self):
+        expected = [self.reference_tree(root) for root in Service.objects.filter(parent__isnull=True)]
+
+        # Content generation lookup, services, tariffs.
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/services/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+    def test_detail_returns_subtree_by_slug(self):
+        node = Service.objects.get(slug="programs")
+
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/services/programs/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, JSONRenderer().render(self.reference_tree(node)))
+
+    def test_detail_of_nested_service(self):
+        response = self.client.get("/api/services/moose/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["slug"], "moose")
+        self.assertEqual([child["slug"] for child in response.json()["children"]], ["evening"])
+
+    def test_depth_cuts_off_nesting(self):
+        response = self.client.get("/api/services/", {"depth": 0})
+        self.assertEqual([root["children"] for root in response.json()], [[], []])
+
+        response = self.client.get("/api/services/excursions/", {"depth": 1})
+        moose = response.json()["children"][0]
+        self.assertEqual(moose["slug"], "moose")
+        self.assertEqual(moose["children"], [])
+
+    def test_invalid_depth_is_rejected(self):
+        response = self.client.get("/api/services/", {"depth": "-1"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_flat_mode_returns_adjacency_list(self):
+        response = self.client.get("/api/services/excursions/", {"flat": "1"})
+        parents = {item["slug"]: item["parent"] for item in response.json()}
+        ids = {item["slug"]: item["id"] for item in response.json()}
+
+        self.assertEqual(set(parents), {"excursions", "moose", "evening"})
+        self.assertIsNone(parents["excursions"])
+        self.assertEqual(parents["evening"], ids["moose"])
+        self.assertNotIn("children", response.json()[0])
+
+    def test_moving_service_updates_descendant_paths(self):
+        moose = Service.objects.get(slug="moose")
+        moose.parent = Service.objects.get(slug="programs")
+        moose.save()
+
+        evening = Service.objects.get(slug="evening")
+        self.assertEqual(evening.path, f"{moose.path}{evening.pk}/")
+        self.assertEqual(evening.depth, 2)
+        self.assertEqual(Service.rebuild_paths(), 0)
+
+    def test_missing_slug_is_404(self):
+        response = self.client.get("/api/services/unknown/")
+        self.assertEqual(response.status_code, 404)
+
+
+class ScheduleWindowTests(ContentTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        for offset in (-40, -1, 0, 3, 45, 400):
+            day = ScheduleDay.objects.create(date=cls.today + dt.timedelta(days=offset))
+            ScheduleEvent.objects.create(
+                day=day,
+                title="Чайная церемония",
+                category="Авторская программа",
+                time_start=dt.time(10, 0),
+                time_end=dt.time(11, 30),
+                price=3000,
+            )
+        ScheduleDay.objects.create(date=cls.today + dt.timedelta(days=1), is_published=False)
+
+    def listed_dates(self, response):
+        return [day["date"] for month in response.json() for day in month["days"]]
+
+    def test_default_window_starts_today(self):
+        response = self.client.get("/api/schedule/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.listed_dates(response),
+            [(self.today + dt.timedelta(days=offset)).isoformat() for offset in (0, 3, 45)],
+        )
+        first_month = response.json()[0]
+        self.assertEqual(first_month["year"], self.today.year)
+        self.assertEqual(first_month["month_number"], self.today.month)
+
+    def test_explicit_range_and_month(self):
+        start = self.today - dt.timedelta(days=1)
+        response = self.client.get("/api/schedule/", {"from": start.isoformat(), "to": self.today.isoformat()})
+        self.assertEqual(self.listed_dates(response), [start.isoformat(), self.today.isoformat()])
+
+        target = self.today + dt.timedelta(days=400)
+        response = self.client.get("/api/schedule/", {"month": target.strftime("%Y-%m")})
+        self.assertEqual(self.listed_dates(response), [target.isoformat()])
+
+    def test_invalid_window_is_rejected(self):
+        for params in ({"month": "2026-13"}, {"from": "tomorrow"}, {"from": "2026-02-10", "to": "2026-02-01"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/schedule/", params).status_code, 400)
+
+    def test_archive_pages_past_days_newest_first(self):
+        response = self.client.get("/api/schedule/archive/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [day["date"] for day in response.json()["results"]],
+            [(self.today + dt.timedelta(days=offset)).isoformat() for offset in (-1, -40)],
+        )
+        self.assertIn("next", response.json())
+
+
+TEA_RENDITIONS = {
+    "source": "schedule_events/tea.jpg",
+    "color": "#c8783c",
+    "lqip": "data:image/webp;base64,UklGRg==",
+    "renditions": {
+        "jpeg": [[320, "schedule_events/tea.320w.jpeg"]],
+        "webp": [[320, "schedule_events/tea.320w.webp"], [640, "schedule_events/tea.640w.webp"]],
+    },
+}
+
+
+class ScheduleSqlJsonTests(ContentTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        for offset, events in ((0, 2), (1, 0), (35, 3), (70, 1)):
+            day = ScheduleDay.objects.create(date=today + dt.timedelta(days=offset))
+            for index in range(events):
+                ScheduleEvent.objects.create(
+                    day=day,
+                    title=f"Событие «{index}»",
+                    category="Экскурсия",
+                    description="Маршрут у воды" if index else "",
+                    image="schedule_events/tea.jpg" if index == 1 else "",
+                    image_meta=TEA_RENDITIONS if index == 1 else {},
+                    image_width=640 if index == 1 else None,
+                    image_height=427 if index == 1 else None,
+                    time_start=dt.time(9 + index, 30 * (index % 2)),
+                    time_end=dt.time(11 + index, 15),
+                    price=None if index == 2 else 1500 + index,
+                    capacity=None if index == 0 else 5 * index,
+                    color="#E9B949",
+                    order=index,
+                )
+        ScheduleEvent.objects.filter(capacity=5).update(booked=2)
+        ScheduleEvent.objects.filter(capacity=10).update(booked=10)
+        # A legacy upload name that must be percent-encoded in URLs.
+        ScheduleEvent.objects.create(
+            day=ScheduleDay.objects.get(date=today),
+            title="Закат",
+            category="Прогулка",
+            image="schedule_events/фото заката (1).jpg",
+            image_meta={
+                "source": "schedule_events/фото заката (1).jpg",
+                "renditions": {"webp": [[320, "schedule_events/фото заката.320w.webp"]]},
+            },
+            image_width=320,
+            image_height=200,
+            time_start=dt.time(18),
+            time_end=dt.time(19),
+        )
+
+    def test_sql_mode_quotes_media_names_like_the_serializer(self):
+        with self.settings(SCHEDULE_SQL_JSON=True):
+            days = self.client.get("/api/schedule/").json()[0]["days"]
+        (event,) = [event for event in days[0]["events"] if event["title"] == "Закат"]
+        quoted = "http://testserver/media/schedule_events/%D1%84%D0%BE%D1%82%D0%BE%20%D0%B7%D0%B0%D0%BA%D0%B0%D1%82%D0%B0"
+        self.assertEqual(event["image"], f"{quoted}%20(1).jpg")
+        self.assertEqual(event["image_meta"]["srcset"], {"image/webp": f"{quoted}.320w.webp 320w"})
+
+    def test_sql_mode_matches_serializer_output(self):
+        for params in ({}, {"month": timezone.localdate().strftime("%Y-%m")}, {"from": "1990-01-01", "to": "1990-02-01"}):
+            with self.subTest(params=params):
+                with self.settings(SCHEDULE_SQL_JSON=False):
+                    expected = self.client.get("/api/schedule/", params).json()
+                cache.clear()
+                with self.settings(SCHEDULE_SQL_JSON=True), self.assertNumQueries(2):
+                    response = self.client.get("/api/schedule/", params)
+
+                self.assertEqual(response["Content-Type"], "application/json")
+                self.assertEqual(json.loads(response.content), expected)
+
+
+class RecurrenceTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.monday = self.today + dt.timedelta(days=7 - self.today.weekday())
+
+    def make_rule(self, **kwargs):
+        return ScheduleRecurrence.objects.create(
+            title="Беговой клуб",
+            category="Спорт",
+            time_start=dt.time(8),
+            time_end=dt.time(9),
+            price=1200,
+            weekdays=kwargs.pop("weekdays", [0, 2]),
+            starts_on=kwargs.pop("starts_on", self.monday),
+            **kwargs,
+        )
+
+    def occurrence_dates(self, rule):
+        return list(rule.events.order_by("day__date").values_list("day__date", flat=True))
+
+    def test_rule_expands_weekly_with_interval_until_and_exceptions(self):
+        rule = self.make_rule(
+            interval=2,
+            until=self.monday + dt.timedelta(days=40),
+            exceptions=[self.monday + dt.timedelta(days=14)],
+        )
+
+        self.assertEqual(
+            self.occurrence_dates(rule),
+            [self.monday + dt.timedelta(days=offset) for offset in (0, 2, 16, 28, 30)],
+        )
+        self.assertEqual(ScheduleDay.objects.count(), 5)
+        self.assertEqual(expand_recurrences(), (0, 0, 0, 0))
+
+    def test_a_year_is_expanded_in_a_handful_of_statements(self):
+        ScheduleDay.objects.create(date=self.monday, is_published=False)
+        rule = self.make_rule(weekdays=[0, 1, 2, 3, 4, 5, 6], is_active=False)
+        rule.is_active = True
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            # Rule UPDATE, then in one savepoint: expansion lock, occurrences
+            # SELECT, days INSERT + SELECT, events INSERT and the generation bump.
+            with self.assertNumQueries(9):
+                rule.save()
+        self.assertTrue(callbacks)
+
+        self.assertEqual(ScheduleEvent.objects.count(), 366 - (self.monday - self.today).days)
+        # Existing days keep their state.
+        self.assertFalse(ScheduleDay.objects.get(date=self.monday).is_published)
+        with self.assertNumQueries(4):
+            self.assertEqual(expand_recurrences([rule]), (0, 0, 0, 0))
+
+    def test_reexpansion_only_touches_changed_occurrences(self):
+        rule = self.make_rule(until=self.monday + dt.timedelta(days=20), capacity=10)
+        first, second, *_ = rule.events.order_by("day__date")
+        ScheduleEvent.objects.filter(pk=first.pk).update(booked=8)
+        edited = rule.events.order_by("day__date")[2]
+        edited.title = "Забег на 10 км"
+        edited.save()
+
+        rule.refresh_from_db()
+        rule.weekdays = [2, 4]
+        rule.capacity = 5
+        rule.save()
+
+        events = {event.day.date: event for event in rule.events.select_related("day")}
+        # Monday occurrences leave the rule, except the one with booked seats.
+        self.assertEqual((events[first.day.date].capacity, events[first.day.date].booked), (10, 8))
+        self.assertNotIn(self.monday + dt.timedelta(days=7), events)
+        self.assertEqual(
+            sorted(date.weekday() for date in events if date != first.day.date),
+            [2, 2, 2, 4, 4, 4],
+        )
+        self.assertTrue(all(event.capacity == 5 for date, event in events.items() if date != first.day.date))
+        self.assertEqual(second.day.date.weekday(), 2)
+        self.assertEqual(events[second.day.date].capacity, 5)
+
+
+class SeedCommandTests(ContentTestCase):
+    def test_seed_commands_scale_and_keep_derived_data(self):
+        out = io.StringIO()
+        call_command("seed_services", "--replace", "--scale", "2", "--batch-size", "5", stdout=out)
+        call_command("seed_schedule", "--scale", "2", stdout=out)
+        call_command("seed_content", "--scale", "1", "--leads", "30", "--batch-size", "7", stdout=out)
+
+        services = Service.objects.count()
+        self.assertEqual(services % 2, 0)
+        self.assertEqual(Service.objects.filter(slug__endswith="-2").count(), services // 2)
+        child = Service.objects.filter(parent__isnull=False).select_related("parent").first()
+        self.assertEqual(child.path, f"{child.parent.path}{child.pk}/")
+        self.assertFalse(Service.objects.filter(tariffs__isnull=False, min_price__isnull=True).exists())
+
+        today = timezone.localdate()
+        self.assertTrue(ScheduleDay.objects.filter(date__lt=today.replace(day=1)).exists())
+        self.assertGreaterEqual(ScheduleEvent.objects.filter(day__date__gte=today.replace(day=1)).count(), 110)
+        self.assertIn("Leads created: 30", out.getvalue())
+        self.assertEqual(Article.objects.count(), 50)
+        self.assertGreater(len({created.date() for created in Review.objects.values_list("created_at", flat=True)}), 1)
+
+        call_command("seed_content", "--clear", "--articles", "5", "--leads", "0", stdout=out)
+        self.assertEqual(Article.objects.count(), 5)
+        self.assertFalse(Lead.objects.exists())
+
+
+class ServiceImportTests(ContentTestCase):
+    def sync(self, *args):
+        out = io.StringIO()
+        call_command("seed_services", *args, stdout=out)
+        return out.getvalue()
+
+    def test_unchanged_seed_writes_nothing(self):
+        self.sync()
+
+        with CaptureQueriesContext(connection) as queries:
+            output = self.sync()
+
+        self.assertIn("Services are up to date.", output)
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all(query["sql"].startswith("SELECT") for query in queries))
+
+    def test_only_differences_are_written_and_ids_are_kept(self):
+        self.sync()
+        moose = Service.objects.get(slug="ekskursiya-v-bratstvo-losey")
+        ids = dict(Service.objects.values_list("slug", "pk"))
+        day = ScheduleDay.objects.create(date=timezone.localdate())
+        event = ScheduleEvent.objects.create(
+            day=day, service=moose, title="Лоси", category="Экскурсия", time_start=dt.time(10), time_end=dt.time(12)
+        )
+        Service.objects.filter(pk=moose.pk).update(title="Старое название")
+        tariff = moose.tariffs.order_by("order").first()
+        Tariff.objects.filter(pk=tariff.pk).update(price=1)
+        Tariff.objects.create(service=moose, title="Лишний", slug="extra", price=10)
+        make_service("obsolete")
+
+        output = self.sync()
+
+        self.assertIn("Services: 0 created, 1 updated, 1 deleted, 12 unchanged", output)
+        self.assertIn("Tariffs: 0 created, 1 updated, 1 deleted, 21 unchanged", output)
+        self.assertEqual(dict(Service.objects.values_list("slug", "pk")), ids)
+        moose.refresh_from_db()
+        self.assertEqual(moose.title, "Экскурсия в Братство лосей")
+        self.assertEqual(moose.min_price, min(moose.tariffs.values_list("price", flat=True)))
+        self.assertFalse(Tariff.objects.filter(slug="extra").exists())
+        event.refresh_from_db()
+        self.assertEqual(event.service_id, moose.pk)
+
+    def test_new_subtrees_get_parents_and_paths(self):
+        self.sync()
+
+        output = self.sync("--scale", "2")
+
+        self.assertIn("Services: 13 created, 0 updated, 0 deleted, 13 unchanged", output)
+        for service in Service.objects.filter(slug__endswith="-2", parent__isnull=False).select_related("parent"):
+            self.assertTrue(service.parent.slug.endswith("-2"))
+            self.assertEqual(service.path, f"{service.parent.path}{service.pk}/")
+
+
+class ServiceTariffStatsTests(ContentTestCase):
+    def test_tariff_changes_update_min_price_and_count(self):
+        tea = make_service("tea")
+        sauna = make_service("sauna")
+        solo = make_tariff(tea, "solo", 3000)
+        make_tariff(tea, "group", 1800)
+
+        def stats():
+            return list(Service.objects.filter(pk__in=[tea.pk, sauna.pk]).order_by("slug").values_list("min_price", "tariff_count"))
+
+        self.assertEqual(stats(), [(None, 0), (1800, 2)])
+        solo.price = 1500
+        solo.save()
+        self.assertEqual(stats(), [(None, 0), (1500, 2)])
+        solo.service = sauna
+        solo.save()
+        self.assertEqual(stats(), [(1500, 1), (1800, 1)])
+        solo.delete()
+        self.assertEqual(stats(), [(None, 0), (1800, 1)])
+
+
+class ResponseCacheTests(ContentTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.service = make_service("tea", title="Чайная церемония")
+        make_tariff(cls.service, "solo", 3000)
+
+    def test_hit_serves_without_queries(self):
+        first = self.client.get("/api/services/")
+
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/services/")
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Content-Type"], first["Content-Type"])
+
+    def test_key_includes_query_and_host(self):
+        self.client.get("/api/services/")
+
+        with self.assertNumQueries(3):
+            self.client.get("/api/services/", {"depth": 0})
+        with self.settings(ALLOWED_HOSTS=["testserver", "example.org"]), self.assertNumQueries(3):
+            self.client.get("/api/services/", HTTP_HOST="example.org")
+
+    def test_save_and_delete_invalidate_namespace(self):
+        self.client.get("/api/services/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.tariffs.get().delete()
+
+        response = self.client.get("/api/services/")
+        self.assertEqual(response.json()[0]["tariffs"], [])
+
+    def test_other_namespaces_stay_cached(self):
+        self.client.get("/api/services/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(name="Анна", event_name="Чай", rating=5, text="Тепло", date=dt.date(2026, 1, 1))
+
+        with self.assertNumQueries(0):
+            self.client.get("/api/services/")
+
+
+class ConditionalGetTests(ContentTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.service = make_service("tea", title="Чайная церемония")
+
+    def test_matching_etag_returns_304_without_serializing(self):
+        first = self.client.get("/api/services/")
+        self.assertIn("ETag", first)
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/services/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_cached_response_revalidates_without_queries(self):
+        first = self.client.get("/api/services/")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/services/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_produces_new_validators(self):
+        first = self.client.get("/api/services/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+
+        response = self.client.get("/api/services/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertIn("Last-Modified", response)
+
+    def test_etag_varies_with_query(self):
+        first = self.client.get("/api/services/")
+        response = self.client.get("/api/services/", {"depth": 0}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+
+class KeysetPaginationTests(ContentTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(7):
+            News.objects.create(
+                title=f"Новость {index}",
+                description="Кратко",
+                image="news/cover.jpg",
+                published_date=dt.date(2026, 3, 1) + dt.timedelta(days=index // 3),
+                content=["Абзац"],
+            )
+        News.objects.create(
+            title="Черновик",
+            description="",
+            image="news/cover.jpg",
+            published_date=dt.date(2026, 3, 9),
+            content=[],
+            is_published=False,
+        )
+
+    def test_walks_all_pages_without_offset_or_count(self):
+        expected = list(
+            News.objects.filter(is_published=True)
+            .order_by("-published_date", "-created_at", "-id")
+            .values_list("slug", flat=True)
+        )
+        seen, pages = [], []
+        url = "/api/news/?page_size=3"
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                payload = self.client.get(url).json()
+                pages.append(payload)
+                seen.extend(item["slug"] for item in payload["results"])
+                url = payload["next"]
+
+        self.assertEqual(seen, expected)
+        self.assertIsNone(pages[0]["previous"])
+        sql = " ".join(query["sql"] for query in queries.captured_queries).upper()
+        self.assertNotIn("OFFSET", sql)
+        self.assertNotIn("COUNT(", sql)
+
+        previous = self.client.get(pages[-1]["previous"]).json()
+        self.assertEqual(previous["results"], pages[-2]["results"])
+
+    def test_next_links_reach_rows_past_the_default_page(self):
+        # The frontend list clients follow ``next`` with the largest page size.
+        for index in range(30):
+            News.objects.create(
+                title=f"Архив {index}",
+                description="",
+                image="news/cover.jpg",
+                published_date=dt.date(2025, 1, 1),
+                content=[],
+            )
+        expected = News.objects.filter(is_published=True).count()
+        self.assertGreater(expected, 20)
+
+        first = self.client.get("/api/news/").json()
+        self.assertEqual(len(first["results"]), 20)
+        seen, url = [], first["next"]
+        seen.extend(item["slug"] for item in first["results"])
+        while url:
+            payload = self.client.get(url).json()
+            seen.extend(item["slug"] for item in payload["results"])
+            url = payload["next"]
+        self.assertEqual(len(set(seen)), expected)
+
+        payload = self.client.get("/api/news/", {"page_size": 100}).json()
+        self.assertEqual(len(payload["results"]), expected)
+        self.assertIsNone(payload["next"])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get("/api/news/", {"cursor": "bm90LWEtY3Vyc29y"})
+        self.assertEqual(response.status_code, 404)
+
+
+class SearchTests(ContentTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Article.objects.create(
+            title="Прогулки на лошадях",
+            slug="horse-rides",
+            preview_description="Конные маршруты по берегу",
+            content="Инструктор подберёт спокойную лошадь <b>для новичков</b> & детей.",
+            content_type=Article.ContentTypeChoices.ARTICLE,
+            published_date=dt.date(2026, 3, 1),
+        )
+        News.objects.create(
+            title="Открытие сезона",
+            slug="season-opening",
+            description="Праздник у воды",
+            image="news/cover.jpg",
+            published_date=dt.date(2026, 3, 2),
+            content=["Первый абзац", "Катание на лошади для всей семьи"],
+        )
+        page = Page.objects.create(title="Конный двор", slug="stable")
+        PageSection.objects.create(page=page, title="Конюшня", text="Наши лошади живут в просторной конюшне.")
+        make_service("horses", title="Верховая езда", description="Занятия на лошадях для детей")
+        make_service("sauna", title="Баня", description="Русская баня на дровах")
+        Article.objects.create(
+            title="Черновик про лошадей",
+            preview_description="",
+            content="лошадь",
+            content_type=Article.ContentTypeChoices.ARTICLE,
+            published_date=dt.date(2026, 3, 3),
+            is_published=False,
+        )
+
+    def test_matches_word_forms_across_content_types(self):
+        response = self.client.get("/api/search/", {"q": "лошадь"})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+
+        self.assertEqual(
+            sorted((item["type"], item["slug"]) for item in results),
+            [
+                ("article", "horse-rides"),
+                ("news", "season-opening"),
+                ("page", "stable"),
+                ("service", "horses"),
+            ],
+        )
+        self.assertEqual([item["rank"] for item in results], sorted((item["rank"] for item in results), reverse=True))
+        page = next(item for item in results if item["type"] == "page")
+        self.assertEqual((page["title"], page["section"]), ("Конный двор", "Конюшня"))
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        results = self.client.get("/api/search/", {"q": "новичков"}).json()["results"]
+        self.assertEqual(len(results), 1)
+        snippet = results[0]["snippet"]
+        self.assertIn("<mark>новичков</mark>", snippet)
+        self.assertIn("&amp;", snippet)
+        self.assertNotIn("<b>", snippet)
+
+    def test_short_query_is_rejected(self):
+        response = self.client.get("/api/search/", {"q": " л "})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("q", response.json())
+
+
+class CompiledSerializerTests(ContentTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(5):
+            Review.objects.create(
+                avatar="reviews/anna.jpg" if index % 2 else "",
+                name=f"Гость {index}",
+                event_name="Лосиная ферма",
+                rating=index + 1,
+                text="Спасибо!",
+                date=dt.date(2026, 5, 1) + dt.timedelta(days=index // 2),
+            )
+            Article.objects.create(
+                title=f"Статья {index}",
+                slug=f"article-{index}",
+                preview_image="articles/cover.jpg" if index % 2 else None,
+                preview_description="Анонс",
+                content="Текст",
+                content_type=Article.ContentTypeChoices.VIDEO if index == 3 else Article.ContentTypeChoices.ARTICLE,
+                published_date=dt.date(2026, 4, 1) + dt.timedelta(days=index // 2),
+            )
+            News.objects.create(
+                title=f"Новость {index}",
+                slug=f"news-{index}",
+                description="Кратко",
+                image="news/cover.jpg",
+                published_date=dt.date(2026, 4, 2),
+                content=["Абзац"],
+            )
+
+        root = make_service("root", is_category=True)
+        child = make_service("child", parent=root, description="Описание")
+        make_service("leaf", parent=child, order=1)
+        make_tariff(child, "basic", 1800)
+        make_tariff(root, "pass", 9000, order=1)
+
+        today = timezone.localdate()
+        for offset in (-3, 0, 2):
+            day = ScheduleDay.objects.create(date=today + dt.timedelta(days=offset))
+            for index in range(2):
+                ScheduleEvent.objects.create(
+                    day=day,
+                    title=f"Событие {index}",
+                    category="Экскурсия",
+                    image="schedule_events/tea.jpg" if index else "",
+                    time_start=dt.time(9 + index, 5),
+                    time_end=dt.time(12, 0),
+                    price=None if index else 500,
+                    order=index,
+                )
+
+    def fetch(self, url, fast):
+        cache.clear()
+        with self.settings(FAST_SERIALIZERS=fast):
+            return self.client.get(url)
+
+    def test_endpoints_are_byte_identical(self):
+        urls = [
+            "/api/reviews/?page_size=2",
+            "/api/articles/?page_size=2",
+            "/api/news/?page_size=3",
+            "/api/services/",
+            "/api/services/?flat=1",
+            "/api/services/root/",
+            "/api/services/child/?depth=0",
+            "/api/schedule/",
+            "/api/schedule/archive/",
+        ]
+        while urls:
+            url = urls.pop()
+            with self.subTest(url=url):
+                expected = self.fetch(url, fast=False)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.fetch(url, fast=True)
+
+                # The compiled path selects only serialized columns.
+                self.assertNotIn("updated_at", queries.captured_queries[-1]["sql"])
+
+                self.assertEqual(expected.status_code, 200)
+                self.assertEqual(response.content, expected.content)
+                payload = expected.json()
+                if isinstance(payload, dict) and payload.get("next"):
+                    urls.append(payload["next"])
+
+    def test_compiled_rows_match_serializer_without_request(self):
+        cases = [
+            (ReviewSerializer, REVIEW_ROWS, Review.objects.all()),
+            (ScheduleEventSerializer, SCHEDULE_EVENT_ROWS, ScheduleEvent.objects.all()),
+        ]
+        for serializer_class, compiled, queryset in cases:
+            with self.subTest(serializer=serializer_class.__name__):
+                expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+                rendered = JSONRenderer().render(compiled.many(compiled.values(queryset)))
+                self.assertEqual(rendered, expected)
+
+
+class ORJSONRendererTests(TestCase):
+    def test_matches_drf_renderer(self):
+        moscow = dt.timezone(dt.timedelta(hours=3))
+        data = {
+            "text": "Чайная «церемония» строка ",
+            "lazy": gettext_lazy("Ожидается дата"),
+            "date": dt.date(2026, 5, 1),
+            "time": dt.time(9, 30),
+            "utc": dt.datetime(2026, 5, 1, 9, 30, 15, 120000, tzinfo=dt.timezone.utc),
+            "local": dt.datetime(2026, 5, 1, 9, 30, tzinfo=moscow),
+            "price": Decimal("1500.50"),
+            "nested": [(1, 2.5, None, True), {"empty": []}],
+            "choice": Review.RatingChoices.FIVE,
+            1: "non-string key",
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_and_big_integers_fall_back(self):
+        data = {"value": 2**70}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            ORJSONRenderer().render({"a": 1}, "application/json; indent=4"),
+            JSONRenderer().render({"a": 1}, "application/json; indent=4"),
+        )
+
+    def test_parser(self):
+        body = JSONRenderer().render({"name": "Анна", "items": [1, 2.5]})
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), {"name": "Анна", "items": [1, 2.5]})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"value": NaN}'))
+
+
+class MediaURLTests(ContentTestCase):
+    def test_resolver_matches_storage_urls(self):
+        request = RequestFactory().get("/api/news/")
+        resolver = get_media_resolver(request)
+        self.assertIs(get_media_resolver(request), resolver)
+
+        for name in ("news/cover.jpg", "news/обложка лета.jpg", "news/a&b (1).png", ""):
+            with self.subTest(name=name):
+                expected = request.build_absolute_uri(default_storage.url(name)) if name else None
+                self.assertEqual(resolver.url(name), expected)
+
+        self.assertEqual(MediaURLResolver().url("news/cover.jpg"), "/media/news/cover.jpg")
+
+    def test_absolute_media_url_moves_images_to_media_host(self):
+        News.objects.create(
+            title="Новость",
+            slug="cdn",
+            description="",
+            image="news/cover.jpg",
+            published_date=dt.date(2026, 3, 1),
+            content=[],
+        )
+        day = ScheduleDay.objects.create(date=timezone.localdate())
+        ScheduleEvent.objects.create(
+            day=day,
+            title="Событие",
+            category="Экскурсия",
+            image="schedule_events/tea.jpg",
+            time_start=dt.time(10, 0),
+            time_end=dt.time(11, 0),
+        )
+
+        with self.settings(MEDIA_URL="https://cdn.example.org/media/"):
+            news = self.client.get("/api/news/").json()["results"][0]
+            events = ScheduleEventSerializer(ScheduleEvent.objects.all(), many=True).data
+
+        self.assertEqual(news["image"], "https://cdn.example.org/media/news/cover.jpg")
+        self.assertEqual(events[0]["image"], "https://cdn.example.org/media/schedule_events/tea.jpg")
+        # Without a request or an absolute MEDIA_URL event images stay hidden, as before.
+        self.assertIsNone(ScheduleEventSerializer(ScheduleEvent.objects.all(), many=True).data[0]["image"])
+
+
+def make_image(width, height, mode="RGBA", name="cover.png", image_format="PNG"):
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), (200, 120, 40, 255)[: len(mode)]).save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class RenditionTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(
+            self.settings(
+                MEDIA_ROOT=media_root,
+                IMAGE_RENDITION_WIDTHS=[100, 200],
+                IMAGE_RENDITION_FORMATS=["webp", "avif"],
+                IMAGE_RENDITIONS_INLINE=True,
+            )
+        )
+
+    def make_article(self, slug="with-image", **kwargs):
+        return Article.objects.create(
+            title="Статья",
+            slug=slug,
+            preview_description="Анонс",
+            content="Текст",
+            content_type=Article.ContentTypeChoices.ARTICLE,
+            published_date=dt.date(2026, 5, 1),
+            **kwargs,
+        )
+
+    def test_upload_builds_clamped_widths(self):
+        article = self.make_article(preview_image=make_image(150, 90))
+        article.refresh_from_db()
+
+        meta = article.preview_image_meta
+        self.assertEqual(meta["source"], article.preview_image.name)
+        self.assertEqual(
+            {fmt: [width for width, _ in items] for fmt, items in meta["renditions"].items()},
+            {"avif": [100, 150], "webp": [100, 150]},
+        )
+        self.assertTrue(all(name.endswith(".webp") for _, name in meta["renditions"]["webp"]))
+        small_webp = meta["renditions"]["webp"][0][1]
+        with Image.open(default_storage.path(small_webp)) as rendition:
+            self.assertEqual(rendition.size, (100, 60))
+
+        item = self.client.get("/api/articles/").json()["results"][0]
+        self.assertEqual(
+            item["preview_image_meta"]["srcset"]["image/webp"],
+            ", ".join(f"http://testserver/media/{name} {width}w" for width, name in meta["renditions"]["webp"]),
+        )
+
+    def test_shared_image_is_stored_and_rendered_once(self):
+        with patch("core.renditions.build_renditions", wraps=build_renditions) as build:
+            first = self.make_article(preview_image=make_image(150, 90, name="a.png"))
+            second = self.make_article(slug="copy", preview_image=make_image(150, 90, name="b.png"))
+
+        build.assert_called_once()
+        self.assertEqual(second.preview_image.name, first.preview_image.name)
+        self.assertEqual(second.preview_image_meta, first.preview_image_meta)
+        blob = MediaBlob.objects.get(name=first.preview_image.name)
+        self.assertEqual((blob.width, blob.height), (150, 90))
+        self.assertEqual(blob.image_meta["renditions"], first.preview_image_meta["renditions"])
+
+    def test_upload_stores_size_color_and_placeholder(self):
+        article = self.make_article(preview_image=make_image(150, 90))
+        article.refresh_from_db()
+
+        self.assertEqual((article.preview_image_width, article.preview_image_height), (150, 90))
+        info = self.client.get("/api/articles/").json()["results"][0]["preview_image_meta"]
+        self.assertEqual((info["width"], info["height"], info["color"]), (150, 90, "#c87828"))
+        self.assertTrue(info["lqip"].startswith("data:image/webp;base64,"))
+        data = info["lqip"].split(",", 1)[1]
+        with Image.open(io.BytesIO(base64.b64decode(data))) as placeholder:
+            self.assertEqual(placeholder.size, (20, 12))
+
+    def test_changed_and_cleared_images_update_meta(self):
+        article = self.make_article(preview_image=make_image(300, 300, mode="RGB", name="first.png"))
+        article.preview_image = make_image(120, 60, name="second.png")
+        article.save()
+        article.refresh_from_db()
+        self.assertEqual(article.preview_image_meta["source"], article.preview_image.name)
+        self.assertEqual(article.preview_image_width, 120)
+
+        article.preview_image = None
+        article.save()
+        article.refresh_from_db()
+        self.assertEqual(article.preview_image_meta, {})
+        self.assertIsNone(article.preview_image_width)
+        self.assertIsNone(ArticleSerializer(article).data["preview_image_meta"])
+
+    def test_backfill_command(self):
+        article = self.make_article(preview_image=make_image(150, 90))
+        Article.objects.filter(pk=article.pk).update(preview_image_meta={})
+
+        out = io.StringIO()
+        call_command("build_renditions", "--model", "core.Article", stdout=out)
+        article.refresh_from_db()
+
+        self.assertIn("core.Article: 1 updated", out.getvalue())
+        self.assertEqual(len(article.preview_image_meta["renditions"]["webp"]), 2)
+
+class UploadIngestTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(self.settings(MEDIA_ROOT=media_root, IMAGE_RENDITION_WIDTHS=[64], IMAGE_RENDITIONS_INLINE=True))
+
+    make_article = RenditionTests.make_article
+
+    def make_jpeg(self, width, height, orientation=1):
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        buffer = io.BytesIO()
+        Image.new("RGB", (width, height), (30, 90, 160)).save(buffer, "JPEG", exif=exif)
+        return SimpleUploadedFile("photo.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+    def test_large_upload_is_downscaled_before_storing(self):
+        with self.settings(IMAGE_MAX_EDGE=500):
+            article = self.make_article(preview_image=self.make_jpeg(2000, 800))
+
+        with Image.open(article.preview_image.path) as stored:
+            self.assertEqual((stored.format, stored.size), ("JPEG", (500, 200)))
+        self.assertEqual((article.preview_image_width, article.preview_image_height), (500, 200))
+
+    def test_exif_orientation_is_applied(self):
+        article = self.make_article(preview_image=self.make_jpeg(40, 20, orientation=6))
+
+        with Image.open(article.preview_image.path) as stored:
+            self.assertEqual(stored.size, (20, 40))
+            self.assertNotIn(0x0112, stored.getexif())
+
+    def test_small_upload_is_stored_unchanged(self):
+        upload = make_image(60, 40)
+        article = self.make_article(preview_image=upload)
+
+        upload.seek(0)
+        with article.preview_image.open("rb") as stored:
+            self.assertEqual(stored.read(), upload.read())
+
+    def test_header_validation(self):
+        cases = (
+            (SimpleUploadedFile("notes.png", b"not an image"), "invalid_image"),
+            (make_image(4, 4, mode="P", name="anim.gif", image_format="GIF"), "invalid_image_format"),
+        )
+        for upload, code in cases:
+            with self.subTest(code=code):
+                article = Article(title="Статья", slug="invalid", preview_image=upload)
+                with self.assertRaises(ValidationError) as raised:
+                    article.full_clean(exclude=["preview_description", "content", "content_type", "published_date"])
+                self.assertEqual(raised.exception.error_dict["preview_image"][0].code, code)
+        with self.settings(IMAGE_UPLOAD_MAX_PIXELS=100), self.assertRaises(ValidationError):
+            Article(title="Статья", slug="huge", preview_image=make_image(20, 20)).full_clean(
+                exclude=["preview_description", "content", "content_type", "published_date"]
+            )
+
+
+class MediaServingTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(self.settings(MEDIA_ROOT=media_root))
+        self.name = default_storage.save("news/photo.png", make_image(8, 8))
+
+    def test_uploads_get_content_hashed_names(self):
+        self.assertRegex(self.name, r"^blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{32}\.png$")
+        self.assertEqual(default_storage.save("articles/other.PNG", make_image(8, 8)), self.name)
+        self.assertNotEqual(default_storage.save("news/photo.png", make_image(9, 8)), self.name)
+        self.assertEqual(MediaBlob.objects.filter(name=self.name).count(), 1)
+
+    def test_hashed_files_are_immutable(self):
+        response = self.client.get(f"/media/{self.name}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+
+    def test_accel_redirect_hands_the_transfer_to_nginx(self):
+        with self.settings(MEDIA_ACCEL_REDIRECT=True):
+            response = self.client.get(f"/media/{self.name}")
+
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.name}")
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response.content, b"")
+
+    def test_rejects_paths_outside_upload_dirs(self):
+        media_root = Path(settings.MEDIA_ROOT)
+        (media_root / "news").mkdir()
+        for stray in ("stray.png", "news/.hidden.png"):
+            (media_root / stray).write_bytes(b"png")
+        for path in ("stray.png", "news/.hidden.png", "blobs/../stray.png", "news/missing.png", "news/"):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(f"/media/{path}").status_code, 404)
+        self.assertEqual(self.client.post(f"/media/{self.name}").status_code, 405)
+
+
+class CollectMediaTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(self.settings(MEDIA_ROOT=media_root, IMAGE_RENDITION_WIDTHS=[64], IMAGE_RENDITIONS_INLINE=True))
+
+    def age(self, *names):
+        old = dt.datetime(2026, 1, 1).timestamp()
+        for name in names:
+            os.utime(default_storage.path(name), (old, old))
+
+    def test_deletes_only_old_unreferenced_files(self):
+        news = News.objects.create(
+            title="Новость",
+            slug="current-image",
+            description="",
+            image=make_image(120, 80, name="old.png"),
+            published_date=dt.date(2026, 3, 1),
+            content=[],
+        )
+        previous = [news.image.name] + [name for items in news.image_meta["renditions"].values() for _, name in items]
+        news.image = make_image(100, 80, name="new.png")
+        news.save()
+        current = [news.image.name] + [name for items in news.image_meta["renditions"].values() for _, name in items]
+        fresh = default_storage.save("news/fresh.png", make_image(9, 9))
+        self.age(*previous, *current)
+
+        out = io.StringIO()
+        call_command("collect_media", "--dry-run", "--verbosity", "2", stdout=out)
+        self.assertIn(f"Would delete {len(previous)} unreferenced files", out.getvalue())
+        self.assertTrue(all(default_storage.exists(name) for name in previous))
+
+        call_command("collect_media", "--workers", "3", stdout=io.StringIO())
+        self.assertFalse(any(default_storage.exists(name) for name in previous))
+        self.assertTrue(all(default_storage.exists(name) for name in (*current, fresh)))
+        self.assertFalse(MediaBlob.objects.filter(name__in=previous).exists())
+
+
+    def test_reused_orphan_is_kept(self):
+        orphan = default_storage.save("news/orphan.png", make_image(120, 80))
+        self.age(orphan)
+
+        news = News.objects.create(
+            title="Новость",
+            slug="reused-image",
+            description="",
+            image=make_image(120, 80, name="again.png"),
+            published_date=dt.date(2026, 3, 1),
+            content=[],
+        )
+        # As if the references were read just before the upload.
+        with patch("core.management.commands.collect_media.Command.referenced", return_value=set()):
+            call_command("collect_media", stdout=io.StringIO())
+
+        self.assertEqual(news.image.name, orphan)
+        self.assertTrue(default_storage.exists(orphan))
+
+
+    def test_files_in_use_are_kept(self):
+        referenced = default_storage.save("news/referenced.png", make_image(10, 10))
+        # Written directly: files saved through storage stay locked by this test's transaction.
+        locked = "locked.png"
+        Path(settings.MEDIA_ROOT, locked).write_bytes(b"png")
+        orphan = default_storage.save("news/orphan.png", make_image(12, 10))
+        self.age(referenced, locked, orphan)
+
+        writer = connections.create_connection("default")
+        self.addCleanup(writer.close)
+        with writer.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s, hashtext(%s))", [MEDIA_LOCK_CLASS, locked])
+        # The first read misses a reference committed while the tree is scanned.
+        with patch(
+            "core.management.commands.collect_media.Command.referenced", side_effect=[set(), {referenced}]
+        ):
+            call_command("collect_media", stdout=io.StringIO())
+
+        self.assertTrue(default_storage.exists(referenced))
+        self.assertTrue(default_storage.exists(locked))
+        self.assertFalse(default_storage.exists(orphan))
+
+
+def crash_once(model_label, field_name, source):
+    """``render_job`` whose worker dies on the first call, like one killed for memory."""
+    marker = Path(settings.MEDIA_ROOT) / "crashed"
+    if not marker.exists():
+        marker.touch()
+        os._exit(1)
+    return build_renditions(default_storage, source)
+
+
+def counting_read_info(model_label, field_name, source):
+    """``read_info_job`` that logs each read to a file in MEDIA_ROOT."""
+    with open(Path(settings.MEDIA_ROOT) / "reads", "a") as log:
+        log.write(f"{source}\n")
+    return read_info_job(model_label, field_name, source)
+
+
+def crash_always(model_label, field_name, source):
+    """``render_job`` for an image whose worker dies every time."""
+    os._exit(1)
+
+
+class ImageWorkerTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(
+            self.settings(MEDIA_ROOT=media_root, IMAGE_RENDITION_WIDTHS=[64], IMAGE_RENDITIONS_INLINE=False)
+        )
+
+    def make_news(self, slug, image):
+        return News.objects.create(
+            title="Новость",
+            slug=slug,
+            description="",
+            image=image,
+            published_date=dt.date(2026, 3, 1),
+            content=[],
+        )
+
+    def test_queued_images_fall_back_until_the_pool_builds_them(self):
+        items = [self.make_news(f"news-{index}", make_image(120, 80, name=f"n{index}.png")) for index in range(3)]
+
+        self.assertEqual(ImageJob.objects.filter(status=ImageJob.StatusChoices.PENDING).count(), 3)
+        listed = self.client.get("/api/news/").json()["results"]
+        # Size and placeholder are known right away; srcset waits for the pool.
+        self.assertTrue(all(item["image"] and item["image_meta"]["srcset"] is None for item in listed))
+        self.assertEqual({item["image_meta"]["width"] for item in listed}, {120})
+
+        out = io.StringIO()
+        call_command("process_images", "--once", "--workers", "2", stdout=out)
+
+        self.assertIn("Processed 3 images (0 failed)", out.getvalue())
+        self.assertFalse(ImageJob.objects.exists())
+        for news in items:
+            news.refresh_from_db()
+            self.assertNotIn("pending", news.image_meta)
+            self.assertEqual([width for width, _ in news.image_meta["renditions"]["webp"]], [64])
+        listed = self.client.get("/api/news/").json()["results"]
+        self.assertTrue(all(item["image_meta"]["srcset"]["image/webp"].endswith(" 64w") for item in listed))
+
+    def test_unreadable_image_fails_after_max_attempts(self):
+        news = self.make_news("broken", make_image(120, 80, name="broken.png"))
+        with open(news.image.path, "wb") as image:
+            image.write(b"not an image")
+
+        err = io.StringIO()
+        call_command(
+            "process_images", "--once", "--workers", "1", "--max-attempts", "1", stdout=io.StringIO(), stderr=err
+        )
+
+        job = ImageJob.objects.get()
+        self.assertEqual((job.status, job.object_id), (ImageJob.StatusChoices.FAILED, news.pk))
+        self.assertIn(str(job), err.getvalue())
+
+    def test_broken_pool_requeues_jobs_without_an_attempt(self):
+        first = self.make_news("crash", make_image(120, 80))
+        second = self.make_news("bystander", make_image(120, 80, mode="RGB"))
+
+        out, err = io.StringIO(), io.StringIO()
+        with patch("core.management.commands.process_images.render_job", crash_once):
+            call_command(
+                "process_images", "--once", "--workers", "1", "--max-attempts", "1", stdout=out, stderr=err
+            )
+
+        self.assertIn("2 images queued again", err.getvalue())
+        self.assertIn("Processed 2 images (0 failed)", out.getvalue())
+        self.assertFalse(ImageJob.objects.exists())
+        for news in (first, second):
+            news.refresh_from_db()
+            self.assertEqual([width for width, _ in news.image_meta["renditions"]["webp"]], [64])
+
+    def test_image_that_kills_its_worker_fails(self):
+        news = self.make_news("poison", make_image(120, 80))
+
+        out, err = io.StringIO(), io.StringIO()
+        with patch("core.management.commands.process_images.render_job", crash_always):
+            call_command(
+                "process_images", "--once", "--workers", "1", "--max-attempts", "2", stdout=out, stderr=err
+            )
+
+        self.assertIn("Processed 0 images (1 failed)", out.getvalue())
+        job = ImageJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (ImageJob.StatusChoices.FAILED, 2))
+        self.assertEqual(job.object_id, news.pk)
+        self.assertIn("worker process died", job.error)
+
+    def test_image_info_backfill_keeps_renditions(self):
+        with self.settings(IMAGE_RENDITIONS_INLINE=True):
+            article = Article.objects.create(
+                title="Статья",
+                slug="with-image",
+                preview_description="Анонс",
+                content="Текст",
+                content_type=Article.ContentTypeChoices.ARTICLE,
+                published_date=dt.date(2026, 5, 1),
+                preview_image=make_image(150, 90),
+            )
+        renditions = article.preview_image_meta["renditions"]
+        Article.objects.filter(pk=article.pk).update(
+            preview_image_meta={"source": article.preview_image.name, "renditions": renditions},
+            preview_image_width=None,
+            preview_image_height=None,
+        )
+
+        out = io.StringIO()
+        call_command("backfill_image_info", "--model", "core.Article", "--workers", "2", stdout=out)
+        article.refresh_from_db()
+
+        self.assertIn("core.Article: 1 updated", out.getvalue())
+        self.assertEqual((article.preview_image_width, article.preview_image_height), (150, 90))
+        self.assertEqual(article.preview_image_meta["renditions"], renditions)
+        self.assertEqual(article.preview_image_meta["color"], "#c87828")
+
+
+    def test_image_info_backfill_reads_each_image_once(self):
+        articles = [
+            Article.objects.create(
+                title="Статья",
+                slug=f"legacy-{index}",
+                preview_description="Анонс",
+                content="Текст",
+                content_type=Article.ContentTypeChoices.ARTICLE,
+                published_date=dt.date(2026, 5, 1),
+                preview_image=make_image(150, 90, mode=mode),
+            )
+            for index, mode in enumerate(("RGB", "RGBA"))
+        ]
+        ImageJob.objects.all().delete()
+        Article.objects.update(preview_image_meta={}, preview_image_width=None, preview_image_height=None)
+
+        with (
+            patch("core.management.commands.backfill_image_info.read_info_job", counting_read_info),
+            patch("core.renditions.read_image_info") as read_in_parent,
+        ):
+            call_command("backfill_image_info", "--model", "core.Article", "--workers", "2", stdout=io.StringIO())
+
+        reads = (Path(settings.MEDIA_ROOT) / "reads").read_text().split()
+        self.assertEqual(sorted(reads), sorted(article.preview_image.name for article in articles))
+        read_in_parent.assert_not_called()
+        for article in articles:
+            article.refresh_from_db()
+            self.assertEqual(article.preview_image_meta["source"], article.preview_image.name)
+            self.assertTrue(article.preview_image_meta["pending"])
+            self.assertEqual(article.preview_image_width, 150)
+        self.assertEqual(
+            set(ImageJob.objects.values_list("object_id", flat=True)), {article.pk for article in articles}
+        )
+
+
+class SeatBookingTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        day = ScheduleDay.objects.create(date=timezone.localdate() + dt.timedelta(days=3))
+        self.event = ScheduleEvent.objects.create(
+            day=day,
+            title="Чайная церемония",
+            category="Чай",
+            time_start=dt.time(12),
+            time_end=dt.time(13),
+            capacity=10,
+        )
+
+    def hold(self, seats=1):
+        return self.client.post(f"/api/schedule-events/{self.event.pk}/holds/", {"seats": seats}, "application/json")
+
+    def seats_left(self):
+        (event,) = self.client.get("/api/schedule/").json()[0]["days"][0]["events"]
+        return event["seats_left"]
+
+    def test_concurrent_holds_never_overbook(self):
+        threads = 40
+        barrier = threading.Barrier(threads)
+        results = []
+
+        def take_seat():
+            try:
+                barrier.wait()
+                try:
+                    hold_seats(self.event.pk, 1)
+                except SoldOut:
+                    results.append(False)
+                else:
+                    results.append(True)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=take_seat) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual((results.count(True), results.count(False)), (10, 30))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.booked, 10)
+        self.assertEqual(SeatHold.objects.count(), 10)
+
+    def test_hold_is_confirmed_only_for_its_service_and_seats(self):
+        tea = make_service("tea")
+        make_tariff(tea, "ceremony", 1800)
+        other = make_service("breath")
+        make_tariff(other, "basic", 1500)
+        ScheduleEvent.objects.filter(pk=self.event.pk).update(service=tea)
+        hold = hold_seats(self.event.pk, 2)
+
+        def request(slug, quantity):
+            return self.client.post(
+                "/api/service-requests/",
+                {
+                    "name": "Анна",
+                    "contact": "@anna",
+                    "service_slug": slug,
+                    "quantity": quantity,
+                    "hold": str(hold.token),
+                },
+                "application/json",
+            )
+
+        response = request("breath", 2)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("hold", response.json())
+        response = request("tea", 1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("quantity", response.json())
+        hold.refresh_from_db()
+        self.assertIsNone(hold.confirmed_at)
+
+        self.assertEqual(request("tea", 2).status_code, 201)
+
+    def test_hold_does_not_lock_the_schedule_generation(self):
+        def generation():
+            return ContentGeneration.objects.get(name="schedule").value
+
+        def lock_generation():
+            # Another hold's bump would have to take this row lock.
+            try:
+                with transaction.atomic():
+                    list(ContentGeneration.objects.select_for_update(nowait=True).filter(name="schedule"))
+            except DatabaseError as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        before = generation()
+        errors = []
+        with transaction.atomic():
+            hold_seats(self.event.pk, 1)
+            worker = threading.Thread(target=lock_generation)
+            worker.start()
+            worker.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(generation(), before + 1)
+
+    def test_holds_update_the_schedule_and_sold_out_is_a_conflict(self):
+        self.assertEqual(self.seats_left(), 10)
+
+        response = self.hold(seats=8)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["seats_left"], 2)
+        self.assertEqual(self.seats_left(), 2)
+
+        response = self.hold(seats=3)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.delete(f"/api/seat-holds/{SeatHold.objects.get().token}/").status_code, 204)
+        self.assertEqual(self.seats_left(), 10)
+
+    def test_admin_saves_do_not_overwrite_booked_seats(self):
+        stale = ScheduleEvent.objects.get(pk=self.event.pk)
+        hold_seats(self.event.pk, 4)
+
+        stale.title = "Чайная церемония у воды"
+        stale.save()
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.title, self.event.booked), ("Чайная церемония у воды", 4))
+
+    def test_capacity_cannot_drop_below_booked_seats(self):
+        hold_seats(self.event.pk, 4)
+        self.event.capacity = 3
+
+        with self.assertRaises(ValidationError) as raised:
+            self.event.full_clean()
+        self.assertIn("capacity", raised.exception.error_dict)
+        self.event.capacity = 4
+        self.event.full_clean()
+
+    def test_holds_are_capped_and_throttled(self):
+        self.assertEqual(self.hold(seats=settings.SEAT_HOLD_MAX_SEATS + 1).status_code, 400)
+        cache.clear()
+        with patch.dict(ScopedRateThrottle.THROTTLE_RATES, {"seat_holds": "2/min"}):
+            statuses = [self.hold().status_code for _ in range(3)]
+        self.assertEqual(statuses, [201, 201, 429])
+
+    def test_expired_holds_are_released_and_cannot_be_confirmed(self):
+        service = make_service("tea")
+        make_tariff(service, "ceremony", 1800)
+        ScheduleEvent.objects.filter(pk=self.event.pk).update(service=service)
+        kept = hold_seats(self.event.pk, 3)
+        expired = hold_seats(self.event.pk, 5, ttl=0)
+
+        def request(hold):
+            return self.client.post(
+                "/api/service-requests/",
+                {
+                    "name": "Анна",
+                    "contact": "@anna",
+                    "service_slug": "tea",
+                    "quantity": hold.seats,
+                    "hold": str(hold.token),
+                },
+                "application/json",
+            )
+
+        self.assertEqual(request(expired).status_code, 410)
+        self.assertEqual(request(kept).status_code, 201)
+        kept.refresh_from_db()
+        self.assertIsNone(kept.expires_at)
+        self.assertEqual(kept.service_request.name, "Анна")
+
+        out = io.StringIO()
+        call_command("release_seat_holds", "--once", stdout=out)
+
+        self.assertIn("Released 1 expired holds.", out.getvalue())
+        self.assertEqual(list(SeatHold.objects.values_list("pk", flat=True)), [kept.pk])
+        self.assertEqual(self.seats_left(), 7)
+        self.assertEqual(release_expired_holds(), 0)
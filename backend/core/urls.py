@@ -9,6 +9,9 @@ from .views import (
     NewsListAPIView,
     ReviewViewSet,
     ScheduleViewSet,
+    SeatHoldAPIView,
+    SeatHoldCreateAPIView,
+    SearchAPIView,
     ServiceViewSet,
 )
 
@@ -23,5 +26,8 @@ urlpatterns = [
     path("articles/<slug:slug>/", ArticleDetailAPIView.as_view(), name="articles-detail"),
     path("news/", NewsListAPIView.as_view(), name="news-list"),
     path("news/<slug:slug>/", NewsDetailAPIView.as_view(), name="news-detail"),
+    path("search/", SearchAPIView.as_view(), name="search"),
+    path("schedule-events/<int:pk>/holds/", SeatHoldCreateAPIView.as_view(), name="seat-hold-create"),
+    path("seat-holds/<uuid:token>/", SeatHoldAPIView.as_view(), name="seat-hold-detail"),
     path("", include(router.urls)),
 ]
@@ -1,9 +1,43 @@
+import mimetypes
+import os
+import posixpath
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.utils.encoding import filepath_to_uri
+from django.views import static
+from django.views.decorators.http import require_safe
 from rest_framework import generics, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
-from .models import Article, HeroBlock, News, Review, ScheduleDay, Service
+from .booking import cancel_hold, hold_seats
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .fast_serializers import CompiledListMixin
+from .media import get_media_resolver, media_upload_dirs
+from .models import Article, HeroBlock, News, Review, ScheduleDay, ScheduleEvent, Service
+from .pagination import PublishedCursorPagination, ReviewCursorPagination, ScheduleArchivePagination
+from .schedule import get_schedule_window, group_days_by_month, render_schedule_json
+from .search import search_content
 from .serializers import (
+    ARTICLE_LIST_ROWS,
+    NEWS_LIST_ROWS,
+    REVIEW_ROWS,
+    SCHEDULE_DAY_ROWS,
+    SCHEDULE_EVENT_ROWS,
+    SERVICE_FLAT_ROWS,
+    SERVICE_ROWS,
+    TARIFF_ROWS,
     ArticleListSerializer,
     ArticleSerializer,
     HeroBlockSerializer,
@@ -11,11 +45,17 @@ from .serializers import (
     NewsSerializer,
     ReviewSerializer,
     ScheduleDaySerializer,
+    SeatHoldSerializer,
+    ServiceFlatSerializer,
     ServiceSerializer,
 )
+from .service_tree import build_service_tree, load_service_nodes, serialize_service_rows
+from .storage import is_hashed_name
+
 
+class HeroBlockAPIView(CachedResponseMixin, ConditionalGetMixin, APIView):
+    cache_namespaces = ("hero",)
 
-class HeroBlockAPIView(APIView):
     def get(self, request):
         hero = HeroBlock.objects.filter(is_active=True).order_by("-created_at").first()
         if hero is None:
@@ -28,41 +68,128 @@ class HeroBlockAPIView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class ReviewViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    CompiledListMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    cache_namespaces = ("reviews",)
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    compiled_serializer = REVIEW_ROWS
+    pagination_class = ReviewCursorPagination
 
 
-class ArticleListAPIView(generics.ListAPIView):
+class ArticleListAPIView(CachedResponseMixin, ConditionalGetMixin, CompiledListMixin, generics.ListAPIView):
+    cache_namespaces = ("articles",)
     queryset = Article.objects.filter(is_published=True)
     serializer_class = ArticleListSerializer
+    compiled_serializer = ARTICLE_LIST_ROWS
+    pagination_class = PublishedCursorPagination
 
 
-class ArticleDetailAPIView(generics.RetrieveAPIView):
+class ArticleDetailAPIView(CachedResponseMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+    cache_namespaces = ("articles",)
     queryset = Article.objects.filter(is_published=True)
     serializer_class = ArticleSerializer
     lookup_field = "slug"
 
 
-class NewsListAPIView(generics.ListAPIView):
+class NewsListAPIView(CachedResponseMixin, ConditionalGetMixin, CompiledListMixin, generics.ListAPIView):
+    cache_namespaces = ("news",)
     queryset = News.objects.filter(is_published=True)
     serializer_class = NewsListSerializer
+    compiled_serializer = NEWS_LIST_ROWS
+    pagination_class = PublishedCursorPagination
 
 
-class NewsDetailAPIView(generics.RetrieveAPIView):
+class NewsDetailAPIView(CachedResponseMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+    cache_namespaces = ("news",)
     queryset = News.objects.filter(is_published=True)
     serializer_class = NewsSerializer
     lookup_field = "slug"
 
 
-class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Service.objects.filter(parent__isnull=True).prefetch_related("children", "tariffs")
+class SearchAPIView(CachedResponseMixin, ConditionalGetMixin, APIView):
+    cache_namespaces = ("articles", "news", "pages", "services")
+
+    def get(self, request):
+        text = request.query_params.get("q", "").strip()
+        if len(text) < 2:
+            raise ValidationError({"q": "Введите не меньше двух символов."})
+        return Response({"query": text, "results": search_content(text)})
+
+
+class ServiceViewSet(CachedResponseMixin, ConditionalGetMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespaces = ("services",)
+    queryset = Service.objects.all()
     serializer_class = ServiceSerializer
+    compiled_serializer = SERVICE_ROWS
+    lookup_field = "slug"
+
+    def get_depth(self):
+        raw = self.request.query_params.get("depth")
+        if raw in (None, ""):
+            return None
+        try:
+            depth = int(raw)
+        except ValueError:
+            depth = -1
+        if depth < 0:
+            raise ValidationError({"depth": "Ожидается неотрицательное целое число."})
+        return depth
+
+    def is_flat(self):
+        return self.request.query_params.get("flat", "").strip().lower() in {"1", "true", "yes", "on"}
 
+    def tree_response(self, services, many=True):
+        if self.use_compiled_serializer():
+            flat = self.is_flat()
+            items = serialize_service_rows(
+                services,
+                SERVICE_FLAT_ROWS if flat else SERVICE_ROWS,
+                TARIFF_ROWS,
+                self.request,
+                roots_only=not flat,
+            )
+            return Response(items if many or flat else items[0])
+
+        if self.is_flat():
+            nodes = load_service_nodes(services)
+            return Response(ServiceFlatSerializer(nodes, many=True, context=self.get_serializer_context()).data)
+
+        roots = build_service_tree(services)
+        if many:
+            return Response(self.get_serializer(roots, many=True).data)
+        return Response(self.get_serializer(roots[0]).data)
+
+    def list(self, request, *args, **kwargs):
+        services = Service.objects.all()
+        depth = self.get_depth()
+        if depth is not None:
+            services = services.filter(depth__lte=depth)
+        return self.tree_response(services)
 
-class ScheduleViewSet(viewsets.ReadOnlyModelViewSet):
+    def retrieve(self, request, *args, **kwargs):
+        node = self.get_object()
+        services = Service.objects.filter(path__startswith=node.path)
+        depth = self.get_depth()
+        if depth is not None:
+            services = services.filter(depth__lte=node.depth + depth)
+        return self.tree_response(services, many=False)
+
+
+class ScheduleViewSet(CachedResponseMixin, ConditionalGetMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespaces = ("schedule",)
     queryset = ScheduleDay.objects.filter(is_published=True).prefetch_related("events").order_by("date")
     serializer_class = ScheduleDaySerializer
+    compiled_serializer = SCHEDULE_DAY_ROWS
+
+    def get_cache_key_extra(self, request):
+        # The default window and the archive both move with the current date.
+        return timezone.localdate().isoformat()
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -70,40 +197,100 @@ class ScheduleViewSet(viewsets.ReadOnlyModelViewSet):
         return context
 
     def list(self, request, *args, **kwargs):
-        days = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(days, many=True)
-        day_items = serializer.data
-
-        month_labels = [
-            "Январь",
-            "Февраль",
-            "Март",
-            "Апрель",
-            "Май",
-            "Июнь",
-            "Июль",
-            "Август",
-            "Сентябрь",
-            "Октябрь",
-            "Ноябрь",
-            "Декабрь",
-        ]
-
-        grouped = {}
-        ordered_keys = []
-
-        for day in day_items:
-            date_raw = day.get("date", "")
-            year, month, _ = map(int, date_raw.split("-"))
-            key = (year, month)
-            if key not in grouped:
-                ordered_keys.append(key)
-                grouped[key] = {
-                    "month": f"{month_labels[month - 1]} {year}",
-                    "year": year,
-                    "month_number": month,
-                    "days": [],
-                }
-            grouped[key]["days"].append(day)
-
-        return Response([grouped[key] for key in ordered_keys])
+        start, end = get_schedule_window(request.query_params)
+        if settings.SCHEDULE_SQL_JSON:
+            return HttpResponse(
+                render_schedule_json(start, end, get_media_resolver(request).prefix),
+                content_type="application/json",
+            )
+
+        days = self.filter_queryset(self.get_queryset()).filter(date__range=(start, end))
+        return Response(group_days_by_month(self.serialize_days(self.day_rows(days))))
+
+    @action(detail=False, pagination_class=ScheduleArchivePagination)
+    def archive(self, request, *args, **kwargs):
+        days = self.filter_queryset(self.get_queryset()).filter(date__lt=timezone.localdate())
+        page = self.paginate_queryset(self.day_rows(days))
+        return self.get_paginated_response(self.serialize_days(page))
+
+    def day_rows(self, days):
+        """Days as ``.values()`` rows on the compiled path, as instances otherwise."""
+        if not self.use_compiled_serializer():
+            return days
+        return SCHEDULE_DAY_ROWS.values(days.prefetch_related(None), "id")
+
+    def serialize_days(self, days):
+        if not self.use_compiled_serializer():
+            return self.get_serializer(days, many=True).data
+
+        days = list(days)
+        serialize_event = SCHEDULE_EVENT_ROWS.bind(self.request)
+        events = ScheduleEvent.objects.filter(day_id__in=[day["id"] for day in days])
+        events_by_day = defaultdict(list)
+        for row in SCHEDULE_EVENT_ROWS.values(events, "day"):
+            events_by_day[row["day"]].append(serialize_event(row))
+        for day in days:
+            day["events"] = events_by_day[day["id"]]
+        return SCHEDULE_DAY_ROWS.many(days, self.request)
+
+
+class SeatHoldCreateAPIView(generics.CreateAPIView):
+    """Hold seats of a schedule event until ``expires_at``; a service request confirms the hold."""
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    serializer_class = SeatHoldSerializer
+    # Holds take seats from everyone else until they expire.
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = "seat_holds"
+
+    def perform_create(self, serializer):
+        serializer.instance = hold_seats(self.kwargs["pk"], serializer.validated_data["seats"])
+
+
+class SeatHoldAPIView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def delete(self, request, token):
+        cancel_hold(token)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@require_safe
+def serve_media(request, path):
+    """Check a media request in Django and leave the transfer to nginx.
+
+    Only existing files inside the upload directories are served; dotfiles,
+    traversal and strays in ``MEDIA_ROOT`` are 404s. With
+    ``MEDIA_ACCEL_REDIRECT`` the response is an empty ``X-Accel-Redirect``
+    to nginx's internal media location, so the worker is free as soon as
+    the checks pass. Content-hashed names are cached as immutable.
+    """
+    name = posixpath.normpath(path).lstrip("/")
+    if (
+        name != path
+        or any(part.startswith(".") for part in name.split("/"))
+        or not name.startswith(media_upload_dirs())
+    ):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation as exc:
+        raise Http404 from exc
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        content_type = mimetypes.guess_type(name)[0]
+        response = HttpResponse(content_type=content_type or "application/octet-stream")
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + filepath_to_uri(name)
+    else:
+        response = static.serve(request, name, document_root=settings.MEDIA_ROOT)
+
+    if is_hashed_name(name):
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_MAX_AGE, immutable=True)
+    else:
+        # Files uploaded before names were hashed: cache briefly.
+        patch_cache_control(response, public=True, max_age=60 * 60)
+    return response
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import DayScenario, Lead, ScenarioItem, ServiceRequest
+from .models import DayScenario, Lead, Notification, ScenarioItem, ServiceRequest
 
 
 @admin.action(description="Отметить как обработанные")
@@ -39,3 +39,11 @@ class ServiceRequestAdmin(admin.ModelAdmin):
     search_fields = ("name", "contact", "service_title", "service_slug", "message")
     ordering = ("-created_at",)
     actions = (mark_as_processed,)
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "status", "attempts", "next_attempt_at", "created_at")
+    list_filter = ("status", "kind")
+    readonly_fields = ("kind", "object_id", "text", "attempts", "error", "created_at")
+    ordering = ("-created_at",)
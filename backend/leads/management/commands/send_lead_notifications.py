@@ -0,0 +1,36 @@
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from leads.models import Notification
+from leads.outbox import OutboxSender, TelegramClient
+
+
+class Command(BaseCommand):
+    help = "Deliver queued lead notifications to Telegram."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=50, help="Notifications claimed at a time.")
+        parser.add_argument("--poll", type=float, default=settings.LEADS_NOTIFY_POLL, help="Seconds between polls.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds between messages to the chat.")
+        parser.add_argument("--once", action="store_true", help="Exit once nothing is due.")
+        parser.add_argument("--retry-failed", action="store_true", help="Queue failed notifications again first.")
+
+    def handle(self, *args, **options):
+        if not settings.TELEGRAM_TOKEN or not settings.TELEGRAM_CHAT_ID:
+            raise CommandError("TELEGRAM_TOKEN and TELEGRAM_CHAT_ID must be set.")
+        if options["retry_failed"]:
+            Notification.objects.filter(status=Notification.StatusChoices.FAILED).update(
+                status=Notification.StatusChoices.PENDING,
+                attempts=0,
+            )
+
+        sender = OutboxSender(
+            TelegramClient(settings.TELEGRAM_TOKEN, settings.TELEGRAM_CHAT_ID, settings.TELEGRAM_API_URL),
+            batch=max(options["batch"], 1),
+            interval=options["interval"],
+            max_attempts=settings.LEADS_NOTIFY_MAX_ATTEMPTS,
+        )
+        # async_to_sync keeps ORM calls on this thread and its connection.
+        sent, failed = async_to_sync(sender.run)(poll=options["poll"], once=options["once"])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} notifications ({failed} failed)."))
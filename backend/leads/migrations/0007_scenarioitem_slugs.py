@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0006_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scenarioitem',
+            name='service_slug',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='scenarioitem',
+            name='tariff_slug',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-18 15:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_seat_booking'),
+        ('leads', '0007_scenarioitem_slugs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicerequest',
+            name='seat_hold',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='service_request', to='core.seathold', verbose_name='Бронь мест'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Lead(models.Model):
@@ -42,6 +43,8 @@ class ScenarioItem(models.Model):
         related_name="items",
         on_delete=models.CASCADE,
     )
+    service_slug = models.CharField(max_length=255, blank=True)
+    tariff_slug = models.CharField(max_length=255, blank=True)
     title = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=12, decimal_places=2)
     quantity = models.IntegerField(default=1)
@@ -63,6 +66,14 @@ class ServiceRequest(models.Model):
     total_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     message = models.TextField(blank=True)
     preferred_date = models.DateField(null=True, blank=True)
+    seat_hold = models.OneToOneField(
+        "core.SeatHold",
+        null=True,
+        blank=True,
+        related_name="service_request",
+        on_delete=models.SET_NULL,
+        verbose_name="Бронь мест",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     is_processed = models.BooleanField(default=False)
 
@@ -73,3 +84,45 @@ class ServiceRequest(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.service_title}"
+
+
+class Notification(models.Model):
+    """Telegram message in the outbox, written in the transaction that created its request.
+
+    ``send_lead_notifications`` delivers due rows and deletes them; rows
+    that keep failing end up ``failed`` with the last error.
+    """
+
+    class KindChoices(models.TextChoices):
+        LEAD = "lead", "Заявка"
+        DAY_SCENARIO = "day_scenario", "Сценарий дня"
+        SERVICE_REQUEST = "service_request", "Заявка на услугу"
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        FAILED = "failed", "Ошибка"
+
+    kind = models.CharField(max_length=20, choices=KindChoices.choices, verbose_name="Тип")
+    object_id = models.BigIntegerField(verbose_name="ID заявки")
+    text = models.TextField(verbose_name="Текст")
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+        verbose_name="Статус",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попытки")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Следующая попытка")
+    error = models.TextField(blank=True, verbose_name="Ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = "Уведомление"
+        verbose_name_plural = "Уведомления"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="leads_notification_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}"
@@ -0,0 +1,78 @@
+from django.utils.html import escape
+
+from .models import DayScenario, Lead, Notification, ServiceRequest
+
+# Longest user-supplied value copied into a message; keeps every
+# notification well under Telegram's 4096-character limit.
+FIELD_LIMIT = 600
+
+
+def _value(value):
+    text = str(value).strip()
+    if len(text) > FIELD_LIMIT:
+        text = text[: FIELD_LIMIT - 1] + "…"
+    return escape(text)
+
+
+def _lines(title, fields):
+    lines = [f"<b>{escape(title)}</b>"]
+    lines += [f"{label}: {_value(value)}" for label, value in fields if value not in (None, "")]
+    return "\n".join(lines)
+
+
+def _price(value):
+    return f"{value:.2f} ₽" if value is not None else None
+
+
+def lead_text(lead):
+    return _lines(
+        "Новая заявка",
+        (("Имя", lead.name), ("Контакт", lead.contact), ("Сообщение", lead.message)),
+    )
+
+
+def day_scenario_text(scenario):
+    items = "; ".join(
+        f"{item.title} × {item.quantity} — {_price(item.price)}" for item in scenario.items.order_by("pk")
+    )
+    return _lines(
+        "Сценарий дня",
+        (
+            ("Имя", scenario.name),
+            ("Контакт", scenario.contact),
+            ("Дата", scenario.date.strftime("%d.%m.%Y")),
+            ("Гостей", scenario.guests_count),
+            ("Программа", items),
+            ("Итого", _price(scenario.total_price)),
+            ("Комментарий", scenario.comment),
+        ),
+    )
+
+
+def service_request_text(request):
+    return _lines(
+        "Заявка на услугу",
+        (
+            ("Услуга", request.service_title),
+            ("Имя", request.name),
+            ("Контакт", request.contact),
+            ("Дата", request.preferred_date.strftime("%d.%m.%Y") if request.preferred_date else None),
+            ("Бронь", f"{request.seat_hold.event} × {request.seat_hold.seats}" if request.seat_hold else None),
+            ("Цена", _price(request.price)),
+            ("Итого", _price(request.total_price)),
+            ("Сообщение", request.message),
+        ),
+    )
+
+
+NOTIFICATION_KINDS = {
+    Lead: (Notification.KindChoices.LEAD, lead_text),
+    DayScenario: (Notification.KindChoices.DAY_SCENARIO, day_scenario_text),
+    ServiceRequest: (Notification.KindChoices.SERVICE_REQUEST, service_request_text),
+}
+
+
+def enqueue_notification(instance):
+    """Queue the Telegram message for a new request; call inside its transaction."""
+    kind, render = NOTIFICATION_KINDS[type(instance)]
+    return Notification.objects.create(kind=kind, object_id=instance.pk, text=render(instance))
@@ -0,0 +1,185 @@
+import asyncio
+import datetime as dt
+import json
+import logging
+import random
+import urllib.error
+import urllib.request
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects longer messages.
+MESSAGE_LIMIT = 4096
+# A claimed row is due again after this long if the sender dies mid-send.
+CLAIM_LEASE = dt.timedelta(minutes=5)
+BACKOFF_BASE = 5
+BACKOFF_MAX = 60 * 60
+
+
+class TelegramError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TelegramClient:
+    """Minimal Bot API client; requests run in a thread so the event loop stays free."""
+
+    def __init__(self, token, chat_id, api_url="https://api.telegram.org", timeout=10):
+        self.url = f"{api_url.rstrip('/')}/bot{token}/"
+        self.chat_id = chat_id
+        self.timeout = timeout
+
+    def _call(self, method, payload):
+        request = urllib.request.Request(
+            self.url + method,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = json.load(response)
+        except urllib.error.HTTPError as exc:
+            try:
+                body = json.load(exc)
+            except ValueError:
+                body = {}
+            raise TelegramError(
+                body.get("description") or f"HTTP {exc.code}",
+                retry_after=body.get("parameters", {}).get("retry_after"),
+            ) from exc
+        except (OSError, ValueError) as exc:
+            raise TelegramError(str(exc)) from exc
+        if not body.get("ok"):
+            raise TelegramError(body.get("description") or "Telegram API error")
+        return body.get("result")
+
+    async def send_message(self, text):
+        payload = {"chat_id": self.chat_id, "text": text, "parse_mode": "HTML", "disable_web_page_preview": True}
+        return await asyncio.to_thread(self._call, "sendMessage", payload)
+
+
+def digests(notifications, limit=MESSAGE_LIMIT):
+    """Pack notifications into as few messages as fit in ``limit``; yield ``(text, notifications)``."""
+    group, size = [], 0
+    for notification in notifications:
+        length = len(notification.text) + 2
+        if group and size + length > limit - 40:
+            yield _digest_text(group), group
+            group, size = [], 0
+        group.append(notification)
+        size += length
+    if group:
+        yield _digest_text(group), group
+
+
+def _digest_text(group):
+    if len(group) == 1:
+        return group[0].text
+    return f"<b>Новых заявок: {len(group)}</b>\n\n" + "\n\n".join(item.text for item in group)
+
+
+def backoff(attempts, retry_after=None):
+    """Exponential delay with jitter, never shorter than Telegram's ``retry_after``."""
+    delay = min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+    delay *= random.uniform(0.75, 1.25)
+    return dt.timedelta(seconds=max(delay, retry_after or 0))
+
+
+def claim_notifications(limit):
+    """Lease up to ``limit`` due notifications; concurrent senders skip each other's rows."""
+    now = timezone.now()
+    with transaction.atomic():
+        notifications = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status=Notification.StatusChoices.PENDING, next_attempt_at__lte=now)
+            .order_by("id")[:limit]
+        )
+        if notifications:
+            Notification.objects.filter(pk__in=[item.pk for item in notifications]).update(
+                attempts=F("attempts") + 1,
+                next_attempt_at=now + CLAIM_LEASE,
+            )
+    for item in notifications:
+        item.attempts += 1
+    return notifications
+
+
+def mark_sent(notifications):
+    Notification.objects.filter(pk__in=[item.pk for item in notifications]).delete()
+
+
+def mark_failed(notifications, error, max_attempts, retry_after=None):
+    now = timezone.now()
+    for item in notifications:
+        status = Notification.StatusChoices.PENDING
+        if item.attempts >= max_attempts:
+            status = Notification.StatusChoices.FAILED
+        Notification.objects.filter(pk=item.pk).update(
+            status=status,
+            error=str(error),
+            next_attempt_at=now + backoff(item.attempts, retry_after),
+        )
+
+
+def release(notifications, retry_after=None):
+    """Make claimed but unsent rows due again without counting an attempt."""
+    Notification.objects.filter(pk__in=[item.pk for item in notifications]).update(
+        attempts=F("attempts") - 1,
+        next_attempt_at=timezone.now() + dt.timedelta(seconds=retry_after or 0),
+    )
+
+
+class OutboxSender:
+    """Drain the notification outbox into one Telegram chat.
+
+    Everything due at once is coalesced into digests, messages go out one
+    at a time ``interval`` seconds apart (Telegram throttles bursts to a
+    chat), and a failed send backs off exponentially per row.
+    """
+
+    def __init__(self, client, batch=50, interval=1.0, max_attempts=10):
+        self.client = client
+        self.batch = batch
+        self.interval = interval
+        self.max_attempts = max_attempts
+
+    async def drain_once(self):
+        """Send one batch; return ``(sent, failed)`` notification counts."""
+        notifications = await sync_to_async(claim_notifications)(self.batch)
+        sent = failed = 0
+        groups = list(digests(notifications))
+        for index, (text, group) in enumerate(groups):
+            if index:
+                await asyncio.sleep(self.interval)
+            try:
+                await self.client.send_message(text)
+            except TelegramError as exc:
+                logger.warning("Telegram notification failed: %s", exc)
+                await sync_to_async(mark_failed)(group, exc, self.max_attempts, exc.retry_after)
+                rest = [item for _, later in groups[index + 1 :] for item in later]
+                if rest:
+                    await sync_to_async(release)(rest, exc.retry_after)
+                failed += len(group)
+                break
+            await sync_to_async(mark_sent)(group)
+            sent += len(group)
+        return sent, failed
+
+    async def run(self, poll=5.0, once=False):
+        sent = failed = 0
+        while True:
+            batch_sent, batch_failed = await self.drain_once()
+            sent += batch_sent
+            failed += batch_failed
+            if batch_sent + batch_failed == 0 or batch_failed:
+                if once:
+                    return sent, failed
+                await asyncio.sleep(poll)
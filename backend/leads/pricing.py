@@ -0,0 +1,28 @@
+from decimal import Decimal
+
+from rest_framework import serializers
+
+from core.service_index import tariff_prices
+
+
+def price_items(items):
+    """Price scenario items against the tariff table; return ``(items, total)``.
+
+    Each item needs ``service_slug``, ``tariff_slug`` and ``quantity``; the
+    returned copies also carry the authoritative ``title`` and ``price``.
+    One dict lookup per item, no queries once the table is warm.
+    """
+    table = tariff_prices.table()
+    priced, errors, total = [], [], Decimal(0)
+    for item in items:
+        tariff = table.get((item["service_slug"], item["tariff_slug"]))
+        if tariff is None:
+            errors.append({"tariff_slug": ["Тариф не найден."]})
+            continue
+        errors.append({})
+        price = Decimal(tariff.price)
+        priced.append({**item, "title": f"{tariff.service_title} - {tariff.tariff_title}", "price": price})
+        total += price * item["quantity"]
+    if any(errors):
+        raise serializers.ValidationError({"items": errors})
+    return priced, total.quantize(Decimal("0.01"))
@@ -1,11 +1,12 @@
 from decimal import Decimal
 
-from django.db.models import Min
 from rest_framework import serializers
 
-from core.models import Service
+from core.booking import confirm_hold
+from core.service_index import service_index
 
 from .models import DayScenario, Lead, ScenarioItem, ServiceRequest
+from .pricing import price_items
 
 
 class LeadSerializer(serializers.ModelSerializer):
@@ -17,11 +18,27 @@ class LeadSerializer(serializers.ModelSerializer):
 class ScenarioItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScenarioItem
-        fields = ("title", "price", "quantity")
+        fields = ("service_slug", "tariff_slug", "title", "price", "quantity")
+        read_only_fields = ("title", "price")
+        extra_kwargs = {
+            "service_slug": {"required": True, "allow_blank": False},
+            "tariff_slug": {"required": True, "allow_blank": False},
+            "quantity": {"min_value": 1, "default": 1},
+        }
+
+
+class DayScenarioQuoteSerializer(serializers.Serializer):
+    items = ScenarioItemSerializer(many=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    def validate(self, attrs):
+        attrs["items"], attrs["total_price"] = price_items(attrs["items"])
+        return attrs
 
 
 class DayScenarioSerializer(serializers.ModelSerializer):
     items = ScenarioItemSerializer(many=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
 
     class Meta:
         model = DayScenario
@@ -35,6 +52,16 @@ class DayScenarioSerializer(serializers.ModelSerializer):
             "items",
         )
 
+    def validate(self, attrs):
+        items, total = price_items(attrs["items"])
+        submitted = attrs.get("total_price")
+        if submitted is not None and submitted != total:
+            raise serializers.ValidationError(
+                {"total_price": f"Стоимость изменилась, актуальная сумма: {total:.2f} ₽."}
+            )
+        attrs["items"], attrs["total_price"] = items, total
+        return attrs
+
     def create(self, validated_data):
         items_data = validated_data.pop("items", [])
         scenario = DayScenario.objects.create(**validated_data)
@@ -48,6 +75,7 @@ class ServiceRequestSerializer(serializers.ModelSerializer):
     quantity = serializers.IntegerField(required=False, min_value=1, write_only=True, default=1)
     price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    hold = serializers.UUIDField(required=False, write_only=True)
 
     class Meta:
         model = ServiceRequest
@@ -61,23 +89,23 @@ class ServiceRequestSerializer(serializers.ModelSerializer):
             "quantity",
             "message",
             "preferred_date",
+            "hold",
         )
         read_only_fields = ("service_title", "price", "total_price")
 
     def create(self, validated_data):
-        service_slug = validated_data.get("service_slug", "")
-        service = Service.objects.filter(slug=service_slug).first()
+        service = service_index.get(validated_data.get("service_slug", ""))
         if service is None:
             raise serializers.ValidationError({"service_slug": "Услуга не найдена."})
 
         quantity = validated_data.pop("quantity", 1)
-        raw_price = getattr(service, "price", None)
-        if raw_price is None:
-            raw_price = service.tariffs.aggregate(min_price=Min("price")).get("min_price")
-        if raw_price is None:
+        hold = validated_data.pop("hold", None)
+        if service.min_price is None:
             raise serializers.ValidationError({"service_slug": "Для услуги не задана стоимость."})
+        if hold is not None:
+            validated_data["seat_hold"] = confirm_hold(hold, service.id, quantity)
 
-        price = Decimal(raw_price)
+        price = Decimal(service.min_price)
         validated_data["service_title"] = service.title
         validated_data["service_slug"] = service.slug
         validated_data["price"] = price
@@ -0,0 +1,239 @@
+import datetime as dt
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Service, Tariff
+
+from .models import DayScenario, Lead, Notification
+
+
+class FakeTelegram(ThreadingHTTPServer):
+    """Local stand-in for the Bot API: records sendMessage calls, answers from ``responses``."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeTelegramHandler)
+        self.messages = []
+        self.responses = []
+        self.thread = threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status, body = self.server.responses.pop(0) if self.server.responses else (200, {"ok": True, "result": {}})
+        if status == 200:
+            self.server.messages.append((self.path, payload))
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        self.telegram = FakeTelegram()
+        self.addCleanup(self.telegram.stop)
+        self.enterContext(
+            self.settings(TELEGRAM_TOKEN="test-token", TELEGRAM_CHAT_ID="42", TELEGRAM_API_URL=self.telegram.url)
+        )
+
+    def send(self):
+        out = io.StringIO()
+        call_command("send_lead_notifications", "--once", "--interval", "0", stdout=out)
+        return out.getvalue()
+
+    def post_lead(self, name="Анна", message="Хочу на чайную церемонию"):
+        return self.client.post("/api/leads/", {"name": name, "contact": "+7 900", "message": message}, "application/json")
+
+    def test_requests_are_queued_without_contacting_telegram(self):
+        self.assertEqual(self.post_lead(message="<b>срочно</b>").status_code, 201)
+        with self.captureOnCommitCallbacks(execute=True):
+            service = Service.objects.create(title="Баня", slug="banya")
+            Tariff.objects.create(service=service, title="Час", slug="hour", duration="1 час", price=2500)
+        response = self.client.post(
+            "/api/service-requests/",
+            {"name": "Олег", "contact": "@oleg", "service_slug": "banya", "quantity": 2},
+            "application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(self.telegram.messages, [])
+        lead, request = Notification.objects.all()
+        self.assertEqual((lead.kind, lead.object_id), ("lead", Lead.objects.get().pk))
+        self.assertIn("&lt;b&gt;срочно&lt;/b&gt;", lead.text)
+        self.assertIn("Итого: 5000.00 ₽", request.text)
+
+    def test_service_request_is_priced_without_queries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            service = Service.objects.create(title="Баня", slug="banya")
+            for slug, price in (("day", 9000), ("hour", 2500)):
+                Tariff.objects.create(service=service, title=slug, slug=slug, price=price)
+        self.client.post("/api/service-requests/", {"name": "Олег", "contact": "@oleg", "service_slug": "banya"})
+
+        # Savepoint, the request INSERT, the outbox INSERT, release.
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                "/api/service-requests/",
+                {"name": "Ольга", "contact": "@olga", "service_slug": "banya", "quantity": 2},
+            )
+        self.assertEqual((response.data["price"], response.data["total_price"]), ("2500.00", "5000.00"))
+
+    def test_failed_request_leaves_no_notification(self):
+        response = self.client.post("/api/service-requests/", {"name": "Олег", "contact": "@oleg", "service_slug": "none"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_single_notification_is_sent_as_is(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            service = Service.objects.create(title="Прогулка", slug="walk")
+            Tariff.objects.create(service=service, title="Час", slug="hour", price=2500)
+        self.client.post(
+            "/api/day-scenarios/",
+            {
+                "name": "Ира",
+                "contact": "ira@example.org",
+                "date": "2026-07-04",
+                "guests_count": 3,
+                "total_price": "7500.00",
+                "items": [{"service_slug": "walk", "tariff_slug": "hour", "quantity": 3}],
+            },
+            "application/json",
+        )
+
+        self.assertIn("Sent 1 notifications (0 failed)", self.send())
+        (path, payload), = self.telegram.messages
+        self.assertEqual(path, "/bottest-token/sendMessage")
+        self.assertEqual((payload["chat_id"], payload["parse_mode"]), ("42", "HTML"))
+        self.assertIn("Прогулка - Час × 3 — 2500.00 ₽", payload["text"])
+        self.assertEqual(DayScenario.objects.count(), 1)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_burst_is_coalesced_into_a_digest(self):
+        for index in range(5):
+            self.post_lead(name=f"Гость {index}")
+
+        self.send()
+
+        (_, payload), = self.telegram.messages
+        self.assertTrue(payload["text"].startswith("<b>Новых заявок: 5</b>"))
+        self.assertEqual(payload["text"].count("Новая заявка"), 5)
+
+    def test_failures_back_off_and_retry(self):
+        self.post_lead()
+        self.telegram.responses = [(429, {"ok": False, "description": "Too Many Requests", "parameters": {"retry_after": 30}})]
+
+        self.assertIn("Sent 0 notifications (1 failed)", self.send())
+        notification = Notification.objects.get()
+        self.assertEqual((notification.status, notification.attempts), ("pending", 1))
+        self.assertIn("Too Many Requests", notification.error)
+        self.assertGreaterEqual(notification.next_attempt_at, timezone.now() + dt.timedelta(seconds=29))
+
+        self.send()
+        self.assertEqual(self.telegram.messages, [])
+
+        Notification.objects.update(next_attempt_at=timezone.now())
+        self.send()
+        self.assertEqual(len(self.telegram.messages), 1)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_gives_up_after_max_attempts(self):
+        self.post_lead()
+        self.telegram.responses = [(400, {"ok": False, "description": "Bad Request: chat not found"})]
+
+        with self.settings(LEADS_NOTIFY_MAX_ATTEMPTS=1):
+            self.send()
+
+        self.assertEqual(Notification.objects.get().status, "failed")
+
+
+class DayScenarioQuoteTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            banya = Service.objects.create(title="Баня", slug="banya")
+            Tariff.objects.create(service=banya, title="Час", slug="hour", price=2500)
+            tea = Service.objects.create(title="Чай", slug="tea")
+            Tariff.objects.create(service=tea, title="Церемония", slug="ceremony", price=1200)
+            hidden = Service.objects.create(title="Скрыто", slug="hidden", is_active=False)
+            Tariff.objects.create(service=hidden, title="Час", slug="hour", price=100)
+        self.items = [
+            {"service_slug": "banya", "tariff_slug": "hour", "quantity": 2},
+            {"service_slug": "tea", "tariff_slug": "ceremony"},
+        ]
+
+    def quote(self, items):
+        return self.client.post("/api/day-scenarios/quote/", {"items": items}, "application/json")
+
+    def create(self, **data):
+        payload = {"name": "Ира", "contact": "@ira", "date": "2026-07-04", "guests_count": 2, "items": self.items}
+        return self.client.post("/api/day-scenarios/", {**payload, **data}, "application/json")
+
+    def test_quote_is_priced_without_queries(self):
+        self.quote(self.items)
+
+        with self.assertNumQueries(0):
+            response = self.quote(self.items * 20)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_price"], "124000.00")
+        self.assertEqual(
+            [(item["title"], item["price"], item["quantity"]) for item in response.data["items"][:2]],
+            [("Баня - Час", "2500.00", 2), ("Чай - Церемония", "1200.00", 1)],
+        )
+
+    def test_unknown_and_inactive_tariffs_are_rejected(self):
+        response = self.quote(self.items + [{"service_slug": "hidden", "tariff_slug": "hour"}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["items"][2], {"tariff_slug": ["Тариф не найден."]})
+
+    def test_prices_follow_tariff_changes(self):
+        self.quote(self.items)
+        with self.captureOnCommitCallbacks(execute=True):
+            Tariff.objects.get(slug="ceremony").delete()
+            tariff = Tariff.objects.get(service__slug="banya")
+            tariff.price = 3000
+            tariff.save()
+
+        response = self.quote(self.items[:1])
+
+        self.assertEqual(response.data["total_price"], "6000.00")
+        self.assertEqual(self.quote(self.items).status_code, 400)
+
+    def test_create_uses_server_prices(self):
+        response = self.create(total_price="6200.00")
+
+        self.assertEqual(response.status_code, 201)
+        scenario = DayScenario.objects.get()
+        self.assertEqual(scenario.total_price, 6200)
+        self.assertEqual(
+            list(scenario.items.order_by("pk").values_list("tariff_slug", "title", "price")),
+            [("hour", "Баня - Час", 2500), ("ceremony", "Чай - Церемония", 1200)],
+        )
+
+    def test_create_rejects_a_stale_total(self):
+        response = self.create(total_price="100.00")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("6200.00", response.data["total_price"][0])
+        self.assertFalse(DayScenario.objects.exists())
@@ -1,9 +1,15 @@
 from django.urls import path
 
-from .views import DayScenarioCreateAPIView, LeadCreateAPIView, ServiceRequestCreateAPIView
+from .views import (
+    DayScenarioCreateAPIView,
+    DayScenarioQuoteAPIView,
+    LeadCreateAPIView,
+    ServiceRequestCreateAPIView,
+)
 
 urlpatterns = [
     path("leads/", LeadCreateAPIView.as_view(), name="lead-create"),
+    path("day-scenarios/quote/", DayScenarioQuoteAPIView.as_view(), name="day-scenario-quote"),
     path("day-scenarios/", DayScenarioCreateAPIView.as_view(), name="day-scenario-create"),
     path("service-requests/", ServiceRequestCreateAPIView.as_view(), name="service-request-create"),
 ]
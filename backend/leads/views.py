@@ -1,26 +1,56 @@
+from django.db import transaction
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 
 from .models import DayScenario, Lead, ServiceRequest
-from .serializers import DayScenarioSerializer, LeadSerializer, ServiceRequestSerializer
+from .notifications import enqueue_notification
+from .serializers import (
+    DayScenarioQuoteSerializer,
+    DayScenarioSerializer,
+    LeadSerializer,
+    ServiceRequestSerializer,
+)
 
 
-class LeadCreateAPIView(generics.CreateAPIView):
-    queryset = Lead.objects.all()
-    serializer_class = LeadSerializer
+class NotifyingCreateAPIView(generics.CreateAPIView):
+    """Create a request and queue its Telegram notification in the same transaction.
+
+    Delivery happens later in ``send_lead_notifications``, so the response
+    never waits for Telegram.
+    """
+
     permission_classes = [AllowAny]
     authentication_classes = []
 
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            enqueue_notification(serializer.save())
+
+
+class LeadCreateAPIView(NotifyingCreateAPIView):
+    queryset = Lead.objects.all()
+    serializer_class = LeadSerializer
 
-class DayScenarioCreateAPIView(generics.CreateAPIView):
+
+class DayScenarioCreateAPIView(NotifyingCreateAPIView):
     queryset = DayScenario.objects.all()
     serializer_class = DayScenarioSerializer
+
+
+class DayScenarioQuoteAPIView(generics.GenericAPIView):
+    """Price a day scenario without saving it; the same prices are enforced on create."""
+
     permission_classes = [AllowAny]
     authentication_classes = []
+    serializer_class = DayScenarioQuoteSerializer
 
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.data)
 
-class ServiceRequestCreateAPIView(generics.CreateAPIView):
+
+class ServiceRequestCreateAPIView(NotifyingCreateAPIView):
     queryset = ServiceRequest.objects.all()
     serializer_class = ServiceRequestSerializer
-    permission_classes = [AllowAny]
-    authentication_classes = []
@@ -5,3 +5,6 @@ class PagesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pages"
     verbose_name = "Страницы"
+
+    def ready(self):
+        from . import signals  # noqa: F401
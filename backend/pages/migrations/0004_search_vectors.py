@@ -0,0 +1,24 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0003_seed_more_pages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagesection',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='russian', weight='A'), '||', django.contrib.postgres.search.SearchVector('text', config='russian', weight='B'), django.contrib.postgres.search.SearchConfig('russian')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='pagesection',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='pages_section_search_idx'),
+        ),
+    ]
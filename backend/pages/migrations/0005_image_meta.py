@@ -0,0 +1,28 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0004_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='hero_image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображения'),
+        ),
+        migrations.AddField(
+            model_name='pagegalleryimage',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображения'),
+        ),
+        migrations.AddField(
+            model_name='pagesection',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображения'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.11 on 2026-10-18 16:40
+
+import core.ingest
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0006_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='page',
+            name='hero_image',
+            field=models.ImageField(blank=True, null=True, upload_to='pages/hero/', validators=[core.ingest.validate_image_upload], verbose_name='Hero-изображение'),
+        ),
+        migrations.AlterField(
+            model_name='pagegalleryimage',
+            name='image',
+            field=models.ImageField(upload_to='pages/gallery/', validators=[core.ingest.validate_image_upload], verbose_name='Изображение'),
+        ),
+        migrations.AlterField(
+            model_name='pagesection',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='pages/sections/', validators=[core.ingest.validate_image_upload], verbose_name='Изображение'),
+        ),
+    ]
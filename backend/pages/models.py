@@ -1,5 +1,9 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
+from core.ingest import validate_image_upload
+
 
 class Page(models.Model):
     title = models.CharField(max_length=255, verbose_name="Заголовок")
@@ -10,7 +14,11 @@ class Page(models.Model):
         blank=True,
         null=True,
         verbose_name="Hero-изображение",
+        validators=[validate_image_upload],
     )
+    hero_image_meta = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Версии изображения")
+    hero_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина")
+    hero_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота")
     is_published = models.BooleanField(default=True, verbose_name="Опубликовано")
     order = models.IntegerField(default=0, verbose_name="Порядок")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
@@ -39,13 +47,28 @@ class PageSection(models.Model):
         blank=True,
         null=True,
         verbose_name="Изображение",
+        validators=[validate_image_upload],
     )
+    image_meta = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Версии изображения")
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина")
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота")
     order = models.IntegerField(default=0, verbose_name="Порядок")
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="russian")
+            + SearchVector("text", weight="B", config="russian")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Секция страницы"
         verbose_name_plural = "Секции страниц"
         ordering = ["order", "id"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="pages_section_search_idx"),
+        ]
 
     def __str__(self):
         return f"{self.page.title}: {self.title}"
@@ -58,7 +81,10 @@ class PageGalleryImage(models.Model):
         on_delete=models.CASCADE,
         verbose_name="Страница",
     )
-    image = models.ImageField(upload_to="pages/gallery/", verbose_name="Изображение")
+    image = models.ImageField(upload_to="pages/gallery/", verbose_name="Изображение", validators=[validate_image_upload])
+    image_meta = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Версии изображения")
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина")
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота")
     order = models.IntegerField(default=0, verbose_name="Порядок")
 
     class Meta:
@@ -1,42 +1,31 @@
 from rest_framework import serializers
 
+from core.media import ImageMetaField, MediaURLField
+
 from .models import Page, PageGalleryImage, PageSection
 
 
 class PageSectionSerializer(serializers.ModelSerializer):
-    image = serializers.SerializerMethodField()
+    image = MediaURLField()
+    image_meta = ImageMetaField("image")
 
     class Meta:
         model = PageSection
-        fields = ("title", "text", "image", "order")
-
-    def get_image(self, obj):
-        request = self.context.get("request")
-        if not obj.image:
-            return None
-        if request is None:
-            return obj.image.url
-        return request.build_absolute_uri(obj.image.url)
+        fields = ("title", "text", "image", "image_meta", "order")
 
 
 class PageGalleryImageSerializer(serializers.ModelSerializer):
-    image = serializers.SerializerMethodField()
+    image = MediaURLField()
+    image_meta = ImageMetaField("image")
 
     class Meta:
         model = PageGalleryImage
-        fields = ("image", "order")
-
-    def get_image(self, obj):
-        request = self.context.get("request")
-        if not obj.image:
-            return None
-        if request is None:
-            return obj.image.url
-        return request.build_absolute_uri(obj.image.url)
+        fields = ("image", "image_meta", "order")
 
 
 class PageSerializer(serializers.ModelSerializer):
-    hero_image = serializers.SerializerMethodField()
+    hero_image = MediaURLField()
+    hero_image_meta = ImageMetaField("hero_image")
     sections = PageSectionSerializer(many=True, read_only=True)
     gallery = PageGalleryImageSerializer(many=True, read_only=True)
 
@@ -47,14 +36,7 @@ class PageSerializer(serializers.ModelSerializer):
             "slug",
             "subtitle",
             "hero_image",
+            "hero_image_meta",
             "sections",
             "gallery",
         )
-
-    def get_hero_image(self, obj):
-        request = self.context.get("request")
-        if not obj.hero_image:
-            return None
-        if request is None:
-            return obj.hero_image.url
-        return request.build_absolute_uri(obj.hero_image.url)
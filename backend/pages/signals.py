@@ -0,0 +1,11 @@
+from core.signals import connect_content_signals
+
+from .models import Page, PageGalleryImage, PageSection
+
+CACHE_NAMESPACES = {
+    Page: ("pages",),
+    PageSection: ("pages",),
+    PageGalleryImage: ("pages",),
+}
+
+connect_content_signals(CACHE_NAMESPACES)
@@ -1,10 +1,14 @@
 from rest_framework import generics
 
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin
+
 from .models import Page
 from .serializers import PageSerializer
 
 
-class PageDetailView(generics.RetrieveAPIView):
+class PageDetailView(CachedResponseMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+    cache_namespaces = ("pages",)
     serializer_class = PageSerializer
     lookup_field = "slug"
     queryset = (
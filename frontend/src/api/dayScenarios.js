@@ -1,8 +1,24 @@
 const API_ORIGIN = (import.meta.env.VITE_API_URL || "").replace(/\/$/, "")
 const DAY_SCENARIOS_ENDPOINT = `${API_ORIGIN}/api/day-scenarios/`
+const DAY_SCENARIO_QUOTE_ENDPOINT = `${DAY_SCENARIOS_ENDPOINT}quote/`
 
-export async function createDayScenario(payload) {
-  const response = await fetch(DAY_SCENARIOS_ENDPOINT, {
+const firstErrorMessage = (value) => {
+  if (typeof value === "string") return value
+  if (Array.isArray(value)) {
+    for (const item of value) {
+      const message = firstErrorMessage(item)
+      if (message) return message
+    }
+    return ""
+  }
+  if (value && typeof value === "object") {
+    return firstErrorMessage(Object.values(value))
+  }
+  return ""
+}
+
+async function postScenario(endpoint, payload, defaultMessage) {
+  const response = await fetch(endpoint, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
@@ -12,15 +28,9 @@ export async function createDayScenario(payload) {
   })
 
   if (!response.ok) {
-    let message = "Не удалось отправить сценарий. Попробуйте снова."
+    let message = defaultMessage
     try {
-      const errorData = await response.json()
-      if (errorData && typeof errorData === "object") {
-        const firstError = Object.values(errorData).find((value) => Array.isArray(value) && value.length > 0)
-        if (Array.isArray(firstError)) {
-          message = String(firstError[0])
-        }
-      }
+      message = firstErrorMessage(await response.json()) || message
     } catch (parseError) {
       // Keep default message when error body is not JSON.
     }
@@ -29,3 +39,11 @@ export async function createDayScenario(payload) {
 
   return await response.json()
 }
+
+export async function quoteDayScenario(items) {
+  return postScenario(DAY_SCENARIO_QUOTE_ENDPOINT, { items }, "Не удалось рассчитать стоимость.")
+}
+
+export async function createDayScenario(payload) {
+  return postScenario(DAY_SCENARIOS_ENDPOINT, payload, "Не удалось отправить сценарий. Попробуйте снова.")
+}
@@ -8,6 +8,28 @@ const toAbsoluteUrl = (value) => {
   return `${API_ORIGIN}${raw.startsWith("/") ? "" : "/"}${raw}`
 }
 
+// Lists are cursor-paginated: follow `next` until every page is read.
+const fetchAllPages = async (endpoint, errorMessage) => {
+  const items = []
+  let url = `${endpoint}?page_size=100`
+  while (url) {
+    const response = await fetch(url, {
+      headers: { Accept: "application/json" },
+    })
+
+    if (!response.ok) {
+      throw new Error(`${errorMessage}: ${response.status}`)
+    }
+
+    const payload = await response.json()
+    if (Array.isArray(payload)) return payload
+    if (!Array.isArray(payload?.results)) break
+    items.push(...payload.results)
+    url = payload.next || null
+  }
+  return items
+}
+
 const normalizeNews = (item) => ({
   id: item?.id ?? null,
   title: String(item?.title || ""),
@@ -19,18 +41,7 @@ const normalizeNews = (item) => ({
 })
 
 export const getNewsList = async () => {
-  const response = await fetch(NEWS_ENDPOINT, {
-    headers: { Accept: "application/json" },
-  })
-
-  if (!response.ok) {
-    throw new Error(`news list request failed: ${response.status}`)
-  }
-
-  const payload = await response.json()
-  const items = Array.isArray(payload) ? payload : payload?.results
-  if (!Array.isArray(items)) return []
-
+  const items = await fetchAllPages(NEWS_ENDPOINT, "news list request failed")
   return items.map(normalizeNews)
 }
 
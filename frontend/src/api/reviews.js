@@ -8,19 +8,30 @@ const toAbsoluteUrl = (value) => {
   return `${API_ORIGIN}${raw.startsWith("/") ? "" : "/"}${raw}`
 }
 
-export const getReviews = async () => {
-  const response = await fetch(REVIEWS_ENDPOINT, {
-    headers: { Accept: "application/json" },
-  })
+// Lists are cursor-paginated: follow `next` until every page is read.
+const fetchAllPages = async (endpoint, errorMessage) => {
+  const items = []
+  let url = `${endpoint}?page_size=100`
+  while (url) {
+    const response = await fetch(url, {
+      headers: { Accept: "application/json" },
+    })
 
-  if (!response.ok) {
-    throw new Error(`reviews request failed: ${response.status}`)
-  }
+    if (!response.ok) {
+      throw new Error(`${errorMessage}: ${response.status}`)
+    }
 
-  const payload = await response.json()
-  const items = Array.isArray(payload) ? payload : payload?.results
-  if (!Array.isArray(items)) return []
+    const payload = await response.json()
+    if (Array.isArray(payload)) return payload
+    if (!Array.isArray(payload?.results)) break
+    items.push(...payload.results)
+    url = payload.next || null
+  }
+  return items
+}
 
+export const getReviews = async () => {
+  const items = await fetchAllPages(REVIEWS_ENDPOINT, "reviews request failed")
   return items.map((item, index) => ({
     id: item?.id ?? `review-${index}`,
     name: String(item?.name || ""),
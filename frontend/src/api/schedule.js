@@ -1,8 +1,13 @@
 const API_ORIGIN = (import.meta.env.VITE_API_URL || "").replace(/\/$/, "")
 const SCHEDULE_ENDPOINT = `${API_ORIGIN}/api/schedule/`
 
-export async function getSchedule() {
-  const res = await fetch(SCHEDULE_ENDPOINT)
+// params: { month: "YYYY-MM" } or { from: "YYYY-MM-DD", to: "YYYY-MM-DD" };
+// without params the API returns the upcoming window starting today.
+export async function getSchedule(params = {}) {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value != null && value !== "")
+  ).toString()
+  const res = await fetch(query ? `${SCHEDULE_ENDPOINT}?${query}` : SCHEDULE_ENDPOINT)
   if (!res.ok) {
     throw new Error("Failed to load schedule")
   }